@@ -0,0 +1,97 @@
+"""
+Run the offline benchmark suite and compare it against the stored baseline.
+
+Exits with status 1 when a benchmark is slower than its baseline by more
+than the regression threshold.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsletter.benchmarks import (
+    BASELINE_FILE,
+    POOL_PROCESSES,
+    REPEAT,
+    compare,
+    format_time,
+    load_baseline,
+    pool_speedup,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extraction, rendering, rollup and transcoding offline")
+    parser.add_argument('--only', metavar='TEXT', help='Only run benchmarks whose name contains TEXT')
+    parser.add_argument('--repeat', type=int, default=REPEAT,
+                        help=f"Measurements per benchmark, keeping the fastest (default: {REPEAT})")
+    parser.add_argument('--threshold', type=float,
+                        help="Fraction slower than the baseline that fails, e.g. 0.25 "
+                             "(default: the baseline's own threshold)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f"Store the results as the new baseline in {os.path.relpath(BASELINE_FILE)}")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+
+def check_pool(results) -> bool:
+    """Report the parse pool's speed-up over inline parsing; False if it should have won and didn't"""
+    speedup = pool_speedup(results)
+    if speedup is None:
+        return True
+    cpus = os.cpu_count() or 1
+    if cpus < 2:
+        print(f"\n📊 Parse pool: {speedup:.2f}x inline with {POOL_PROCESSES} processes on 1 CPU "
+              f"(it can only win with more cores)")
+        return True
+    status = '✅' if speedup > 1 else '❌'
+    print(f"\n{status} Parse pool: {speedup:.2f}x inline with {POOL_PROCESSES} processes on {cpus} CPUs")
+    return speedup > 1
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("⏱️  Running benchmarks (offline)...")
+    results = run_benchmarks(args.only, args.repeat)
+    pool_ok = check_pool(results)
+
+    if args.save_baseline:
+        save_baseline(results, partial=bool(args.only))
+        print(f"\n✅ Saved {len(results)} results as the baseline")
+        if not pool_ok:
+            print("⚠️  The parse pool was no faster than inline parsing on this machine")
+        return
+
+    baseline = load_baseline()
+    if baseline is None:
+        print("\n⚠️  No baseline yet; run with --save-baseline to record one")
+        return
+
+    print("\n📊 Compared with the baseline")
+    rows = compare(results, baseline, args.threshold)
+    for row in rows:
+        if row['baseline'] is None:
+            status, change = '🆕', 'no baseline'
+        else:
+            status = '❌' if row['regressed'] else '✅'
+            change = f"{(row['ratio'] - 1) * 100:+.1f}% vs {format_time(row['baseline'])}"
+        print(f"  {status} {row['name']:<32} {format_time(row['seconds']):>10}  {change}")
+
+    regressed = [row['name'] for row in rows if row['regressed']]
+    if regressed:
+        print(f"\n❌ {len(regressed)} regression(s): {', '.join(regressed)}")
+        sys.exit(1)
+    if not pool_ok:
+        print("\n❌ The parse pool was no faster than inline parsing")
+        sys.exit(1)
+    print("\n✨ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Crawl whole listings and designer pages, every page deep, into the model
+catalog without holding the results in memory.
+
+With --queue the crawl goes through a durable job queue instead, which
+crawl_worker.py processes (on this machine or others) can help with.
+"""
+import argparse
+
+from newsletter.crawl import BATCH_SIZE, DEFAULT_MAX_PAGES, DEFAULT_RATE, run_crawl
+from newsletter.jobqueue import open_queue
+from newsletter.sections import SECTIONS, get_section
+from newsletter.showcase import SectionError, read_source_urls, today_str, validate_url
+from newsletter.workers import queue_path, run_queued_crawl
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Page through listings and designer pages into the catalog")
+    parser.add_argument('urls', nargs='*', help='Listing or designer page URLs to crawl')
+    parser.add_argument('--sections', default='',
+                        help=f"Comma-separated sections whose listing or designer pages to crawl "
+                             f"(available: {', '.join(SECTIONS)})")
+    parser.add_argument('--date', default=today_str(),
+                        help='Crawl date as YYYYMMDD, recorded as the models\' last_seen (default: today)')
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"Most pages to fetch per URL (default: {DEFAULT_MAX_PAGES})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"Maximum requests per minute (default: {DEFAULT_RATE})")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"Models per catalog transaction (default: {BATCH_SIZE})")
+    parser.add_argument('--queue', nargs='?', const='', metavar='URL',
+                        help='Crawl through a job queue that crawl_worker.py processes share: a SQLite file '
+                             '(default: .cache/crawl_queue-<date>.sqlite3) or redis://host:port/db')
+    parser.add_argument('--thumbnails', action='store_true',
+                        help='With --queue, also fetch every model page and transcode its thumbnail')
+    args = parser.parse_args(argv)
+
+    args.sections = [name.strip() for name in args.sections.split(',') if name.strip()]
+    unknown = [name for name in args.sections if name not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+    invalid = [url for url in args.urls if not validate_url(url)]
+    if invalid:
+        parser.error(f"not a thangs.com URL: {', '.join(invalid)}")
+    if not args.urls and not args.sections:
+        parser.error("give URLs to crawl or --sections")
+    if args.rate <= 0 or args.max_pages < 1 or args.batch_size < 1:
+        parser.error("--rate, --max-pages and --batch-size must be positive")
+    if args.thumbnails and args.queue is None:
+        parser.error("--thumbnails needs --queue")
+    if args.queue == '':
+        args.queue = queue_path(args.date)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    urls = list(args.urls)
+    for name in args.sections:
+        section = get_section(name)
+        if section['source'] == 'listing':
+            urls.append(section['listing_url'])
+        else:
+            try:
+                urls.extend(read_source_urls(section))
+            except SectionError as e:
+                print(f"❌ {name}: {e}")
+
+    urls = list(dict.fromkeys(urls))
+    if args.queue is None:
+        run_crawl(urls, args.date, max_pages=args.max_pages, rate=args.rate, batch_size=args.batch_size)
+        return
+
+    print(f"🗂️  Crawling through the queue at {args.queue}; start crawl_worker.py --queue {args.queue} to help")
+    queue = open_queue(args.queue)
+    try:
+        run_queued_crawl(queue, urls, args.date, max_pages=args.max_pages, rate=args.rate,
+                         batch_size=args.batch_size, thumbnails=args.thumbnails)
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Work on a crawl that crawl_catalog.py --queue seeded: lease fetch, parse and
+transcode jobs from its queue until it drains.
+
+Run it on as many machines as the crawl should be spread over (with a
+redis:// queue), or with --processes for several workers on this one.
+"""
+import argparse
+import multiprocessing
+
+from newsletter.crawl import DEFAULT_RATE
+from newsletter.jobqueue import LEASE_SECONDS, open_queue
+from newsletter.showcase import today_str
+from newsletter.workers import JOB_KINDS, queue_path, run_worker
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Process jobs of a queued catalog crawl")
+    parser.add_argument('--queue', default='',
+                        help='The crawl\'s queue: a SQLite file or redis://host:port/db '
+                             '(default: .cache/crawl_queue-<today>.sqlite3)')
+    parser.add_argument('--kinds', default=','.join(JOB_KINDS),
+                        help=f"Comma-separated job kinds to take (default: {','.join(JOB_KINDS)})")
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes to run (default: 1)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"Maximum requests per minute per process (default: {DEFAULT_RATE})")
+    parser.add_argument('--lease', type=float, default=LEASE_SECONDS,
+                        help=f"Seconds a job may run before another worker takes it over (default: {LEASE_SECONDS})")
+    parser.add_argument('--wait', action='store_true',
+                        help='Keep waiting for jobs when the queue is empty instead of exiting')
+    args = parser.parse_args(argv)
+
+    args.kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+    unknown = [kind for kind in args.kinds if kind not in JOB_KINDS]
+    if unknown or not args.kinds:
+        parser.error(f"unknown job kind(s): {', '.join(unknown)} (available: {', '.join(JOB_KINDS)})")
+    if args.rate <= 0 or args.lease <= 0 or args.processes < 1:
+        parser.error("--rate, --lease and --processes must be positive")
+    if args.queue.startswith('memory://'):
+        parser.error("a memory:// queue can't be shared with another process")
+    args.queue = args.queue or queue_path(today_str())
+    return args
+
+
+def work(args) -> None:
+    queue = open_queue(args.queue)
+    try:
+        stats = run_worker(queue, args.kinds, rate=args.rate, lease_seconds=args.lease, wait=args.wait)
+    finally:
+        queue.close()
+    print(f"✅ Worker done: {stats['done']} jobs ({stats['failed']} failed attempts)")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print(f"👷 {args.processes} worker(s) on {args.queue} taking {', '.join(args.kinds)} jobs")
+    if args.processes == 1:
+        work(args)
+        return
+    processes = [multiprocessing.Process(target=work, args=(args,)) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
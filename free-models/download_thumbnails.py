@@ -1,4 +1,5 @@
 import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
@@ -6,6 +7,10 @@ import time
 import csv
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsletter import assets, buildcache, canonical
+
 def create_img_folder():
     """Create dated img folder if it doesn't exist"""
     # Create folder with date format YYYYMMDD
@@ -15,12 +20,6 @@ def create_img_folder():
         os.makedirs(folder_path)
     return folder_path
 
-def get_model_name_from_url(url):
-    """Extract model name from URL for filename"""
-    path = urlparse(url).path
-    model_name = path.split('/')[-1].split('-')[0]  # Get the last part of the path before the ID
-    return model_name
-
 def download_image(image_url, filename):
     """Download image from URL and save it locally"""
     try:
@@ -36,6 +35,20 @@ def download_image(image_url, filename):
         print(f"Error downloading {image_url}: {e}")
         return False
 
+def download_name(url, extension):
+    """Temporary file name a thumbnail is downloaded under, before its content is known"""
+    thangs_id = canonical.model_id(url)
+    stem = str(thangs_id) if thangs_id is not None else 'model'
+    return f".{stem}.download{(extension or assets.DEFAULT_EXTENSION).lower()}"
+
+def finalize(path, url):
+    """Move a downloaded thumbnail to its asset name (model ID and content hash) in the same folder"""
+    digest = buildcache.file_digest(path)
+    target = os.path.join(os.path.dirname(path), assets.asset_name(url, digest, os.path.splitext(path)[1]))
+    if target != path:
+        os.replace(path, target)
+    return target
+
 def process_model_page(url):
     """Visit model page and extract thumbnail image"""
     try:
@@ -85,19 +98,17 @@ def main():
     for i, url in enumerate(links, 1):
         print(f"Processing {i}/{len(links)}: {url}")
         
-        # Get model name for filename
-        model_name = get_model_name_from_url(url)
-        
         # Get thumbnail URL
         thumbnail_url = process_model_page(url)
         
         if thumbnail_url:
-            # Create filename
-            file_extension = os.path.splitext(urlparse(thumbnail_url).path)[1] or '.jpg'
-            filename = os.path.join(img_folder, f"{model_name}{file_extension}")
+            # Download under a temporary name, then name it after the model ID and content hash
+            file_extension = os.path.splitext(urlparse(thumbnail_url).path)[1]
+            filename = os.path.join(img_folder, download_name(url, file_extension))
             
             # Download image
             if download_image(thumbnail_url, filename):
+                filename = finalize(filename, url)
                 print(f"Successfully downloaded: {filename}")
                 # Add to CSV
                 with open(csv_filename, 'a', newline='') as csvfile:
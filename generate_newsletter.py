@@ -0,0 +1,97 @@
+"""
+Generate the whole newsletter in one process: every selected section runs
+concurrently, then the rollup combines their HTML blobs.
+"""
+import argparse
+import sys
+
+from newsletter.sections import DEFAULT_SECTIONS, SECTIONS
+from newsletter.showcase import STAGE_WORKERS, parse_stage_workers
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate every newsletter section and the combined showcase")
+    parser.add_argument('--sections', default=','.join(DEFAULT_SECTIONS),
+                        help=f"Comma-separated sections to run (default: {','.join(DEFAULT_SECTIONS)}; "
+                             f"available: {', '.join(SECTIONS)})")
+    parser.add_argument('--tenants', metavar='FILE',
+                        help="Build every newsletter defined in this JSON file instead, sharing one crawl "
+                             "(see newsletter/tenants.py)")
+    parser.add_argument('--date', help='Run date as YYYYMMDD, used for output filenames (default: today)')
+    parser.add_argument('--limit', type=int, help='Keep at most this many models per section')
+    parser.add_argument('--workers', type=int, help='Sections to run at once (default: all)')
+    parser.add_argument('--stage-workers', type=parse_stage_workers, metavar='STAGE=N,...',
+                        help=f"Worker threads per thumbnail pipeline stage in each section (default: "
+                             f"{','.join(f'{k}={v}' for k, v in STAGE_WORKERS.items())})")
+    parser.add_argument('--force', action='store_true', help='Rebuild every stage even if its inputs are unchanged')
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted run for this date, skipping the work it finished")
+    parser.add_argument('--no-csv', action='store_true',
+                        help="Only record runs in the catalog, without exporting dated CSVs")
+    parser.add_argument('--no-rollup', action='store_true', help="Don't combine the blobs afterwards")
+    parser.add_argument('--allocate', action='store_true',
+                        help="Collect every section's candidates first and show each model in only one section")
+    parser.add_argument('--delta', action='store_true',
+                        help="Only process the models that changed since each section's last run, reusing the rest")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="Write a Chrome trace of the run to FILE, viewable in chrome://tracing or "
+                             "Perfetto (or set NEWSLETTER_TRACE)")
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help="Profile each section and the rollup, writing cProfile stats and collapsed "
+                             "stacks to DIR (default: profiles/DATE)")
+    args = parser.parse_args(argv)
+
+    args.sections = [name.strip() for name in args.sections.split(',') if name.strip()]
+    unknown = [name for name in args.sections if name not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("🚀 Starting Newsletter Generation Process")
+    print("========================================")
+
+    # Imported after argument parsing so --help stays instant
+    from newsletter import profiling, tracing
+    from newsletter.orchestrator import print_completion, run_newsletter
+    from newsletter.showcase import today_str
+
+    groups = None
+    if args.tenants:
+        from newsletter.tenants import load_tenants
+
+        try:
+            tenants = load_tenants(args.tenants)
+        except (OSError, ValueError) as e:
+            print(f"❌ Couldn't load tenants: {e}")
+            sys.exit(1)
+        groups = {tenant['name']: tenant['sections'] for tenant in tenants}
+        args.sections = [name for tenant in tenants for name in tenant['sections']]
+        print(f"🏢 Building {len(tenants)} newsletters: {', '.join(groups)}")
+
+    profile_dir = profiling.profile_dir(args.profile, args.date or today_str())
+    with tracing.tracing_to(tracing.trace_path(args.trace)), profiling.profiling_to(profile_dir):
+        results = run_newsletter(
+            args.sections,
+            date_str=args.date,
+            force=args.force,
+            limit=args.limit,
+            max_workers=args.workers,
+            rollup=not args.no_rollup,
+            stage_workers=args.stage_workers,
+            resume=args.resume,
+            export_csv=not args.no_csv,
+            allocate=args.allocate,
+            delta=args.delta,
+            groups=groups,
+        )
+    print_completion(results)
+    if not any(result['ok'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
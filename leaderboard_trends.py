@@ -0,0 +1,43 @@
+"""
+Show which models are climbing a listing section's leaderboard fastest,
+from the ranking snapshots stored in the catalog.
+"""
+import argparse
+import math
+import sys
+
+from newsletter.sections import SECTIONS, get_section
+from newsletter.trends import DEFAULT_WINDOW_DAYS, NEW_DAYS, leaderboard_trends, riser_order
+
+LISTING_SECTIONS = [name for name, config in SECTIONS.items() if config['source'] == 'listing']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report leaderboard risers from the catalog's snapshots")
+    parser.add_argument('section', choices=LISTING_SECTIONS)
+    parser.add_argument('--top', type=int, default=20, help='Models to show (default: 20)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW_DAYS,
+                        help=f"Days of history the velocity is fitted over (default: {DEFAULT_WINDOW_DAYS})")
+    parser.add_argument('--new-days', type=int, default=NEW_DAYS,
+                        help=f"Models first listed within this many days are flagged new (default: {NEW_DAYS})")
+    args = parser.parse_args(argv)
+
+    source = get_section(args.section)['listing_url']
+    trends = leaderboard_trends(source, args.window, args.new_days)
+    if trends is None:
+        print(f"❌ No leaderboard snapshots for {args.section} yet")
+        sys.exit(1)
+
+    print(f"📈 Fastest risers on {source}")
+    print(f"  {'Thangs ID':>10}  {'Rank':>4}  {'Δ':>4}  {'Places/day':>10}  New")
+    for index in riser_order(trends)[:args.top]:
+        delta = trends['delta'][index]
+        velocity = trends['velocity'][index]
+        delta_text = '-' if math.isnan(delta) else f"{delta:+.0f}"
+        velocity_text = '-' if math.isnan(velocity) else f"{velocity:+.2f}"
+        print(f"  {trends['ids'][index]:>10}  {trends['rank'][index]:>4.0f}  {delta_text:>4}  "
+              f"{velocity_text:>10}  {'🆕' if trends['new'][index] else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Inspect and maintain the SQLite model catalog: backfill it from the dated
+CSVs written before it existed, export a run as CSV, look things up, or
+rename thumbnails written under the old file names.
+"""
+import argparse
+import os
+import sys
+
+from newsletter import assets, catalog
+from newsletter.sections import SECTIONS, get_section
+from newsletter.showcase import image_csv_name, section_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the model catalog")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="Backfill the catalog from existing image and links CSVs")
+    import_parser.add_argument('--sections', default=','.join(SECTIONS),
+                               help='Comma-separated sections to import (default: all)')
+
+    export_parser = commands.add_parser('export', help="Export a run's image manifest as its dated CSV")
+    export_parser.add_argument('section', choices=list(SECTIONS))
+    export_parser.add_argument('--date', help="Run date as YYYYMMDD (default: the section's latest run)")
+
+    latest_parser = commands.add_parser('latest', help="Show a section's latest run")
+    latest_parser.add_argument('section', choices=list(SECTIONS))
+
+    image_parser = commands.add_parser('image', help="Show the most recent image stored for a model")
+    image_parser.add_argument('model', help='Model URL or numeric Thangs ID')
+
+    migrate_parser = commands.add_parser(
+        'migrate-assets', help="Rename old thumbnails to <model ID>-<content hash> names and rewrite their manifests")
+    migrate_parser.add_argument('--sections', default=','.join(SECTIONS),
+                                help='Comma-separated sections to migrate (default: all)')
+    migrate_parser.add_argument('--keep-originals', action='store_true',
+                                help='Copy instead of renaming, so already-sent newsletters keep their images')
+    migrate_parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        for name in [name.strip() for name in args.sections.split(',') if name.strip()]:
+            section = get_section(name)
+            imported = catalog.import_csv_history(section)
+            snapshots = catalog.import_snapshot_history(section)
+            print(f"✅ {name}: imported {imported} runs and {snapshots} leaderboard snapshots")
+
+    elif args.command == 'export':
+        run = catalog.get_run(args.section, args.date)
+        if not run:
+            print(f"❌ No catalog run for {args.section} {args.date or ''}".rstrip())
+            sys.exit(1)
+        section = get_section(args.section)
+        csv_filename = image_csv_name(section, run['date'])
+        catalog.export_manifest_csv(catalog.run_manifest(run['id']), section_path(section, csv_filename))
+        print(f"📄 Exported {os.path.join(args.section, csv_filename)}")
+
+    elif args.command == 'latest':
+        run = catalog.get_run(args.section)
+        if not run:
+            print(f"❌ No catalog run for {args.section}")
+            sys.exit(1)
+        rows = catalog.run_manifest(run['id'])
+        print(f"🗂️  {args.section}: {run['date']} with {len(rows)} models")
+
+    elif args.command == 'image':
+        image = catalog.image_for_model(args.model)
+        if not image:
+            print(f"❌ No image stored for {args.model}")
+            sys.exit(1)
+        print(f"🖼️  {image['section']}/{image['path']} ({image['date']}, sha256 {image['sha256']})")
+
+    elif args.command == 'migrate-assets':
+        for name in [name.strip() for name in args.sections.split(',') if name.strip()]:
+            counts = assets.migrate_section(get_section(name), args.keep_originals, args.dry_run)
+            verb = 'would rename' if args.dry_run else 'renamed'
+            print(f"✅ {name}: {verb} {counts['files']} files ({counts['rows']} manifest rows, "
+                  f"{counts['images']} catalog images, {counts['html']} HTML files rewritten)")
+            if counts['shared']:
+                print(f"⚠️  {counts['shared']} old files were shared by several models; each now has its own copy")
+            if counts['missing']:
+                print(f"⚠️  {counts['missing']} images referenced by the manifests are missing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Shared building blocks for the Thangs newsletter section generators"""
+import os
+
+# Root of the repository (the folder holding generate_newsletter.sh)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
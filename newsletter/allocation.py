@@ -0,0 +1,123 @@
+"""
+Global allocation of candidate models to sections.
+
+Each section picks from its own source, so left alone the same model can
+turn up in premium-designs, one-off and print-on-demand in one newsletter.
+allocate() takes every section's scored candidates and assigns each model
+to at most one section: the best-scoring (section, model) pairs are taken
+first, a model goes to the section that values it most, and a section whose
+candidate was taken by another falls through to its next one until its
+quota is full.
+
+A section can only lose a candidate to a model another section took, so it
+never needs more than K = sum of all quotas candidates. Each stream is cut
+down to its top K with a bounded min-heap while it is read (O(n log K) over
+n candidates), and only those S * K survivors are merged, which keeps the
+allocation fast for catalogs of tens of thousands of candidates.
+"""
+import heapq
+import itertools
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from newsletter import canonical
+
+
+def top_candidates(candidates: Iterable[Dict], k: int,
+                   key: Callable[[str], str] = canonical.model_key) -> List[Tuple[float, int, Dict]]:
+    """
+    The k best-scoring candidates of one stream, one per model
+
+    Args:
+        candidates: Dicts with 'url' and 'score', in the section's own
+            preference order (which breaks ties; a model listed again later
+            is ignored)
+        k: How many to keep
+        key: What identifies a model
+
+    Returns:
+        List[Tuple]: (score, -position, candidate) triples, best first
+    """
+    if k <= 0:
+        return []
+    heap: List[Tuple[float, int, Dict]] = []
+    seen = set()
+    for position, candidate in enumerate(candidates):
+        model = key(candidate['url'])
+        if model in seen:
+            continue
+        seen.add(model)
+        entry = (float(candidate['score']), -position, candidate)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return sorted(heap, key=lambda entry: entry[:2], reverse=True)
+
+
+def allocate(streams: Dict[str, Iterable[Dict]], quotas: Dict[str, int],
+             key: Callable[[str], str] = canonical.model_key) -> Dict[str, List[Dict]]:
+    """
+    Assign every model to at most one section, filling each section's quota
+
+    Args:
+        streams: Section name -> its candidates (dicts with 'url' and
+            'score'), in the section's preference order. Sections earlier in
+            the dict win ties.
+        quotas: Section name -> most models it shows
+        key: What identifies a model
+
+    Returns:
+        Dict[str, List[Dict]]: Section name -> its assigned candidates, best first
+    """
+    total = sum(quotas.get(name, 0) for name in streams)
+    order = {name: index for index, name in enumerate(streams)}
+
+    merged = []
+    for name, candidates in streams.items():
+        for score, neg_position, candidate in top_candidates(candidates, total, key):
+            merged.append((-score, order[name], -neg_position, candidate, name))
+    heapq.heapify(merged)
+
+    assigned: Dict[str, List[Dict]] = {name: [] for name in streams}
+    taken = set()
+    open_sections = sum(1 for name in streams if quotas.get(name, 0) > 0)
+    while merged and open_sections:
+        _, _, _, candidate, name = heapq.heappop(merged)
+        model = key(candidate['url'])
+        if model in taken or len(assigned[name]) >= quotas.get(name, 0):
+            continue
+        taken.add(model)
+        assigned[name].append(candidate)
+        if len(assigned[name]) == quotas[name]:
+            open_sections -= 1
+    return assigned
+
+
+def rank_score(rank: int, popularity: float = 0.0) -> float:
+    """
+    Score of a candidate from its rank on its source page (0 is best),
+    boosted by engagement already known from an earlier fetch
+
+    Ranks are comparable across sections, so a section's #1 beats another's #5.
+    """
+    return (1.0 / (1 + rank)) * (1 + math.log1p(max(popularity, 0.0)) / 10)
+
+
+def interleave(pages: List[List[Dict]]) -> List[Dict]:
+    """Round-robin the candidate lists of several source pages, so equal ranks alternate between pages"""
+    return [link for rank in itertools.zip_longest(*pages) for link in rank if link is not None]
+
+
+def allocation_summary(streams: Dict[str, List[Dict]], assigned: Dict[str, List[Dict]],
+                       key: Callable[[str], str] = canonical.model_key) -> Optional[str]:
+    """One status line about models that were offered to several sections, or None if none were"""
+    offered: Dict[str, int] = {}
+    for candidates in streams.values():
+        for model in {key(candidate['url']) for candidate in candidates}:
+            offered[model] = offered.get(model, 0) + 1
+    shared = sum(1 for count in offered.values() if count > 1)
+    if not shared:
+        return None
+    placed = sum(len(links) for links in assigned.values())
+    return f"{shared} models were candidates in more than one section; {placed} models placed, each once"
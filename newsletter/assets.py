@@ -0,0 +1,211 @@
+"""
+Thumbnail file names shared by every generator: <model ID>-<content hash><ext>.
+
+Names used to come from the model URL: the text before its first '-'
+(so every model called "Dragon" wrote to Dragon.jpg), or for one-off a
+suffix from Python's hash(), which is randomized per process, so every run
+wrote the same images under new names. Now the name depends only on which
+model the image is for and what is in it. A rerun reproduces the same file
+name for the same image, and two models can never share one.
+
+migrate_section() renames the img/ trees written under the old names and
+rewrites everything that points at them (image manifest CSVs, the catalog
+and the rendered HTML) in one pass.
+"""
+import csv
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+from newsletter import buildcache, canonical
+from newsletter.journal import atomic_write
+
+HASH_LENGTH = 12  # hex digits of the SHA-256 kept in a name
+DEFAULT_EXTENSION = '.jpg'
+
+# <Thangs ID, or 'model' when the URL has none>-<HASH_LENGTH hex digits><extension>
+ASSET_NAME = re.compile(r'^(\d+|model)-[0-9a-f]{%d}\.\w+$' % HASH_LENGTH)
+
+
+def asset_name(url: str, digest: str, extension: str = DEFAULT_EXTENSION) -> str:
+    """
+    File name for a model's thumbnail
+
+    Args:
+        url: Model URL, in any spelling
+        digest: Hex SHA-256 of the image file as stored
+        extension: File extension including the dot
+    """
+    thangs_id = canonical.model_id(url)
+    stem = str(thangs_id) if thangs_id is not None else 'model'
+    return f"{stem}-{digest[:HASH_LENGTH]}{(extension or DEFAULT_EXTENSION).lower()}"
+
+
+def is_asset_name(filename: str) -> bool:
+    return bool(ASSET_NAME.match(filename))
+
+
+def _manifest_csvs(section: Dict) -> List[str]:
+    prefix = section['image_csv_prefix']
+    return sorted(
+        os.path.join(section['folder'], f) for f in os.listdir(section['folder'])
+        if f.startswith(prefix) and f.endswith('.csv') and f[len(prefix):-4].isdigit()
+    )
+
+
+def _image_date(image_path: str) -> Optional[str]:
+    """The YYYYMMDD folder an img/ path is in"""
+    parts = image_path.replace('\\', '/').split('/')
+    return parts[-2] if len(parts) >= 2 and parts[-2].isdigit() else None
+
+
+def plan_migration(section: Dict) -> Tuple[List[Dict], List[str]]:
+    """
+    Work out the new name of every image a section's manifests and catalog runs point at
+
+    Returns:
+        Tuple: One move per (manifest, row) as dicts with 'source' ('csv' path
+        or catalog 'image_id'), 'url', 'old' and 'new' image paths; and the
+        image paths referenced but missing on disk
+    """
+    from newsletter import catalog
+    from newsletter.showcase import read_image_manifest, section_path
+
+    moves, missing, digests = [], [], {}
+
+    def plan(source, url: str, old: str) -> None:
+        if is_asset_name(os.path.basename(old)):
+            return
+        path = section_path(section, old)
+        if path not in digests:
+            digests[path] = buildcache.file_digest(path)
+        if digests[path] is None:
+            missing.append(old)
+            return
+        new = os.path.join(os.path.dirname(old), asset_name(url, digests[path], os.path.splitext(old)[1]))
+        moves.append({'source': source, 'url': url, 'old': old, 'new': new.replace('\\', '/')})
+
+    for csv_path in _manifest_csvs(section):
+        for row in read_image_manifest(csv_path):
+            plan(csv_path, row['original_link'], row['image_path'])
+
+    with catalog.connect() as conn:
+        rows = conn.execute(
+            """SELECT images.id, images.path, COALESCE(appearances.link, models.url) FROM appearances
+               JOIN images ON images.id = appearances.image_id
+               JOIN models ON models.id = appearances.model_id
+               JOIN runs ON runs.id = appearances.run_id
+               WHERE runs.section = ? ORDER BY runs.date, appearances.position""",
+            (section['name'],),
+        ).fetchall()
+    for image_id, path, url in rows:
+        plan(image_id, url, path)
+    return moves, sorted(set(missing))
+
+
+def _rewrite_csv(csv_path: str, renamed: Dict[Tuple[str, str], str]) -> None:
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    with atomic_write(csv_path, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(rows[0])
+        for row in rows[1:]:
+            if len(row) >= 2:
+                row[0] = renamed.get((row[0], row[1]), row[0])
+            writer.writerow(row)
+
+
+def _rewrite_html(section: Dict, moves: List[Dict]) -> int:
+    """Point the section's blobs and the rollups of the same dates at the new names"""
+    from newsletter.rollup import ROLLUP_DIR
+    from newsletter.showcase import get_github_raw_url
+
+    # Blobs list their models in manifest order, so each occurrence of an old
+    # URL is replaced in that order (a file two models shared gets both names).
+    # A date's CSV rows are used when there are any, else its catalog rows.
+    by_date: Dict[str, Dict[bool, List[Tuple[str, str]]]] = {}
+    for move in moves:
+        date_str = _image_date(move['old'])
+        if date_str:
+            by_date.setdefault(date_str, {}).setdefault(isinstance(move['source'], str), []).append((
+                get_github_raw_url(section, move['old'], date_str),
+                get_github_raw_url(section, move['new'], date_str),
+            ))
+
+    rewritten = 0
+    for date_str, sources in by_date.items():
+        replacements = sources.get(True) or sources[False]
+        candidates = [os.path.join(section['folder'], f) for f in os.listdir(section['folder'])
+                      if f.endswith('.html') and date_str in f]
+        if os.path.isdir(ROLLUP_DIR):
+            candidates += [os.path.join(ROLLUP_DIR, f) for f in os.listdir(ROLLUP_DIR)
+                           if f.endswith('.html') and date_str in f]
+        for path in candidates:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = original = f.read()
+            for old_url, new_url in replacements:
+                html = html.replace(old_url, new_url, 1)
+            if html != original:
+                with atomic_write(path, encoding='utf-8') as f:
+                    f.write(html)
+                rewritten += 1
+    return rewritten
+
+
+def migrate_section(section: Dict, keep_originals: bool = False, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Rename a section's thumbnails to asset names and rewrite what points at them
+
+    Rows that already use asset names are left alone, so running it again is
+    a no-op. When the old scheme gave two models the same file, each gets a
+    copy under its own name.
+
+    Args:
+        section: Section definition (see newsletter.sections.get_section)
+        keep_originals: Copy instead of renaming, so already-sent newsletters
+            that link to the old GitHub URLs keep their images
+        dry_run: Only report what would change
+
+    Returns:
+        Dict[str, int]: Counts of 'files' renamed, manifest 'rows' and
+        catalog 'images' rewritten, 'html' files rewritten, 'shared' old
+        files that several models pointed at, and 'missing' images
+    """
+    from newsletter import catalog
+    from newsletter.showcase import section_path
+
+    moves, missing = plan_migration(section)
+    targets: Dict[str, set] = {}
+    for move in moves:
+        targets.setdefault(move['old'], set()).add(move['new'])
+    counts = {
+        'files': len(targets),
+        'rows': sum(1 for move in moves if isinstance(move['source'], str)),
+        'images': sum(1 for move in moves if not isinstance(move['source'], str)),
+        'html': 0,
+        'shared': sum(1 for news in targets.values() if len(news) > 1),
+        'missing': len(missing),
+    }
+    if dry_run or not moves:
+        return counts
+
+    for old, news in targets.items():
+        source = section_path(section, old)
+        for new in sorted(news):
+            target = section_path(section, new)
+            if not os.path.exists(target):
+                shutil.copy2(source, target)
+        if not keep_originals:
+            os.remove(source)
+
+    for csv_path in sorted({move['source'] for move in moves if isinstance(move['source'], str)}):
+        _rewrite_csv(csv_path, {(move['old'], move['url']): move['new']
+                                for move in moves if move['source'] == csv_path})
+
+    with catalog.connect() as conn:
+        conn.executemany('UPDATE images SET path = ? WHERE id = ?',
+                         [(move['new'], move['source']) for move in moves if not isinstance(move['source'], str)])
+
+    counts['html'] = _rewrite_html(section, moves)
+    return counts
@@ -0,0 +1,269 @@
+"""
+Offline benchmarks for the hot paths: link extraction, og:image extraction,
+reading a listing from its state blob, parsing a batch of designer pages inline and in the parse pool, section
+rendering at several sizes, the rollup and image transcoding.
+
+Every benchmark runs against the fixtures checked in under
+benchmarks/fixtures (saved-page stand-ins and a sample of real img/ files),
+with the HTTP session swapped for one that refuses to connect, so results
+don't depend on the network. Timings are compared against
+benchmarks/baseline.json; anything slower than its baseline by more than the
+threshold counts as a regression.
+"""
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, Iterator, List, Optional
+
+from newsletter import REPO_ROOT, client
+from newsletter.journal import atomic_write
+
+BENCHMARKS_DIR = os.path.join(REPO_ROOT, 'benchmarks')
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+BASELINE_FILE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+
+DEFAULT_THRESHOLD = 0.25  # fraction slower than the baseline that counts as a regression
+RENDER_SIZES = (10, 50, 200)  # models per rendered section
+REPEAT = 5  # measurements per benchmark; the fastest is kept
+DESIGNER_PAGES = 200  # saved designer pages parsed per batch
+POOL_PROCESSES = max(os.cpu_count() or 1, 2)  # parse pool size benchmarked against inline
+FIXTURE_DATE = '20250501'
+
+
+class OfflineSession:
+    """Stands in for the shared requests session so a benchmark can never hit the network"""
+
+    def get(self, url, **kwargs):
+        raise RuntimeError(f"benchmarks run offline, but something requested {url}")
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def fixture_manifest(count: int) -> List[Dict[str, str]]:
+    """Image manifest rows for count models, the shape render_section_body() takes"""
+    return [
+        {
+            'image_path': f"img/{FIXTURE_DATE}/Fixture Model {n}.jpg",
+            'original_link': f"https://thangs.com/designer/Fixture/3d-model/Fixture%20Model%20{n}-{1000000 + n}",
+        }
+        for n in range(count)
+    ]
+
+
+def designer_pages(count: int) -> List[bytes]:
+    """count saved designer pages, the fixture under a different designer's name each time"""
+    designer = read_fixture('designer.html')
+    return [designer.replace('/designer/LUDO/', f"/designer/Fixture{n}/").encode('utf-8') for n in range(count)]
+
+
+def state_page() -> str:
+    """The leaderboard fixture with its __NEXT_DATA__ blob listing every linked model, as Thangs's does"""
+    from newsletter.canonical import parse_model_url
+    from newsletter.showcase import extract_model_links
+
+    leaderboard = read_fixture('leaderboard.html')
+    items, seen = [], set()
+    for link in extract_model_links(leaderboard):
+        info = parse_model_url(link['url'])
+        if info['thangs_id'] is None or info['thangs_id'] in seen:
+            continue
+        seen.add(info['thangs_id'])
+        items.append({'id': info['thangs_id'], 'name': info['name'], 'owner': {'username': info['designer']},
+                      'rank': len(items), 'thumbnailUrl': f"https://cdn.thangs.com/fixture/{info['thangs_id']}.jpg"})
+    start = leaderboard.index('>', leaderboard.index('<script id="__NEXT_DATA__"')) + 1
+    end = leaderboard.index('</script>', start)
+    return leaderboard[:start] + json.dumps({'props': {'pageProps': {'items': items}}}) + leaderboard[end:]
+
+
+def build_benchmarks(workdir: str) -> Dict[str, Callable[[], object]]:
+    """
+    Set up every benchmark inside workdir
+
+    Returns:
+        Dict[str, Callable]: Benchmark name -> function running one iteration
+    """
+    from newsletter import parsing
+    from newsletter.rollup import render_rollup
+    from newsletter.sections import DEFAULT_SECTIONS, get_section
+    from newsletter.showcase import extract_model_links, generate_showcase_html, parse_thumbnail_url, transcode_image
+
+    leaderboard = read_fixture('leaderboard.html')
+    designer = read_fixture('designer.html')
+    model_page = read_fixture('model.html')
+
+    benchmarks = {
+        'extract_links.leaderboard': lambda: extract_model_links(leaderboard),
+        'extract_links.designer': lambda: extract_model_links(designer, limit=3),
+        'og_image.model_page': lambda: parse_thumbnail_url(model_page),
+    }
+
+    # A listing read from its state blob, and one without a usable blob falling back to its links
+    with_state, without_state = state_page().encode('utf-8'), leaderboard.encode('utf-8')
+    benchmarks['page_state.leaderboard'] = lambda: parsing.parse_listing(with_state)
+    benchmarks['page_state.fallback'] = lambda: parsing.parse_listing(without_state)
+
+    # The same pages parsed in this process, then spread over the parse pool
+    pages = designer_pages(DESIGNER_PAGES)
+    benchmarks[f"parse_pages.designer.{DESIGNER_PAGES}.inline"] = (
+        lambda: parsing.map_links(pages, limit=3, processes=1))
+    benchmarks[f"parse_pages.designer.{DESIGNER_PAGES}.pool"] = (
+        lambda: parsing.map_links(pages, limit=3, processes=POOL_PROCESSES))
+
+    for count in RENDER_SIZES:
+        folder = os.path.join(workdir, f"render-{count}")
+        os.makedirs(folder)
+        section = {**get_section('free-models'), 'folder': folder}
+        rows = fixture_manifest(count)
+        benchmarks[f"render.{count}"] = (
+            lambda section=section, rows=rows: generate_showcase_html(section, FIXTURE_DATE, rows))
+
+    # The rollup combines one 50-model blob per default section
+    blob_files = []
+    for name in DEFAULT_SECTIONS:
+        folder = os.path.join(workdir, 'rollup', name)
+        os.makedirs(folder)
+        section = {**get_section(name), 'folder': folder}
+        blob_files.append(os.path.join(folder, generate_showcase_html(section, FIXTURE_DATE, fixture_manifest(50))))
+    benchmarks['rollup'] = lambda: render_rollup(blob_files, FIXTURE_DATE)
+
+    image_dir = os.path.join(FIXTURES_DIR, 'img')
+    for filename in sorted(os.listdir(image_dir)):
+        source = os.path.join(image_dir, filename)
+        target = os.path.join(workdir, filename)
+
+        def transcode(source=source, target=target):
+            # The fixture is restored each time, since transcoding works in place
+            shutil.copyfile(source, target)
+            return transcode_image(target)
+        benchmarks[f"transcode.{os.path.splitext(filename)[0]}"] = transcode
+
+    return benchmarks
+
+
+def measure(func: Callable[[], object], repeat: int = REPEAT) -> float:
+    """Fastest seconds per call over repeat runs of enough calls to take ~0.2s each"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+@contextlib.contextmanager
+def offline() -> Iterator[None]:
+    """Swap in OfflineSession for the duration"""
+    original = client._session
+    client._session = OfflineSession()
+    try:
+        yield
+    finally:
+        client._session = original
+
+
+def run_benchmarks(only: Optional[str] = None, repeat: int = REPEAT) -> Dict[str, float]:
+    """
+    Run the benchmarks whose name contains only (all of them when None)
+
+    Returns:
+        Dict[str, float]: Benchmark name -> seconds per iteration
+    """
+    from newsletter import parsing
+
+    results = {}
+    with offline(), tempfile.TemporaryDirectory(prefix='newsletter-bench-') as workdir, \
+            open(os.devnull, 'w') as devnull:
+        # The generators print progress on every call; keep it out of the report
+        with contextlib.redirect_stdout(devnull):
+            benchmarks = build_benchmarks(workdir)
+        for name, func in benchmarks.items():
+            if only and only not in name:
+                continue
+            with contextlib.redirect_stdout(devnull):
+                results[name] = measure(func, repeat)
+            print(f"  {name:<32} {format_time(results[name])}")
+    parsing.shutdown()
+    return results
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(results: Dict[str, float], path: str = BASELINE_FILE,
+                  threshold: float = DEFAULT_THRESHOLD, partial: bool = False) -> None:
+    """
+    Store results as the new baseline, keeping any per-benchmark thresholds
+
+    Args:
+        results: From run_benchmarks()
+        path: Baseline file
+        threshold: Default regression threshold for a new baseline file
+        partial: results are from a subset of the benchmarks (--only); the
+            baseline's other results are kept instead of dropped
+    """
+    previous = load_baseline(path) or {}
+    merged = {**previous.get('results', {}), **results} if partial else results
+    baseline = {
+        'recorded_at': time.strftime('%Y-%m-%d'),
+        'cpus': os.cpu_count(),
+        'threshold': previous.get('threshold', threshold),
+        'thresholds': previous.get('thresholds', {}),
+        'results': {name: round(seconds, 9) for name, seconds in sorted(merged.items())},
+    }
+    with atomic_write(path, encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def compare(results: Dict[str, float], baseline: Dict, threshold: Optional[float] = None) -> List[Dict]:
+    """
+    Compare results against a baseline
+
+    Args:
+        results: From run_benchmarks()
+        baseline: From load_baseline()
+        threshold: Overrides the baseline's default threshold (per-benchmark
+            thresholds in the baseline still apply)
+
+    Returns:
+        List[Dict]: Per benchmark: 'name', 'seconds', 'baseline' (None if
+        new), 'ratio' and 'regressed'
+    """
+    default = threshold if threshold is not None else baseline.get('threshold', DEFAULT_THRESHOLD)
+    rows = []
+    for name, seconds in results.items():
+        base = baseline.get('results', {}).get(name)
+        ratio = seconds / base if base else None
+        limit = baseline.get('thresholds', {}).get(name, default)
+        rows.append({
+            'name': name,
+            'seconds': seconds,
+            'baseline': base,
+            'ratio': ratio,
+            'regressed': ratio is not None and ratio > 1 + limit,
+        })
+    return rows
+
+
+def pool_speedup(results: Dict[str, float]) -> Optional[float]:
+    """How many times faster the parse pool got through the designer pages than inline parsing, if both ran"""
+    inline = results.get(f"parse_pages.designer.{DESIGNER_PAGES}.inline")
+    pool = results.get(f"parse_pages.designer.{DESIGNER_PAGES}.pool")
+    return inline / pool if inline and pool else None
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
@@ -0,0 +1,127 @@
+"""
+Build-system style memoization for the newsletter stages.
+
+Every stage (link list, thumbnail manifest, rendered section, rollup) is
+described by a fingerprint of its inputs plus the version of the code that
+produces it. The fingerprint and the outputs it produced are recorded in a
+small JSON state file next to the outputs; a later run with the same
+fingerprint whose outputs are still on disk untouched can skip the stage.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional
+
+STATE_FILENAME = '.build_state.json'
+
+
+def file_digest(path: str) -> Optional[str]:
+    """
+    Hash a file's contents
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Optional[str]: Hex SHA-256 of the file, or None if it doesn't exist
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version(*source_files: str) -> str:
+    """Fingerprint the source files whose changes should invalidate a stage"""
+    return fingerprint(*[file_digest(path) for path in source_files])
+
+
+def fingerprint(*parts) -> str:
+    """
+    Combine stage inputs into a single fingerprint
+
+    Args:
+        parts: JSON-serializable values (digests, URLs, dates, config dicts)
+
+    Returns:
+        str: Hex SHA-256 over the canonical JSON encoding of the parts
+    """
+    encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def load_state(folder: str) -> Dict:
+    """Load the build state recorded in a folder (empty if none or unreadable)"""
+    path = os.path.join(folder, STATE_FILENAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(folder: str, state: Dict) -> None:
+    """Write the build state atomically so an interrupted run can't corrupt it"""
+    path = os.path.join(folder, STATE_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _stat_signature(path: str) -> Optional[list]:
+    """Cheap change detector for an output file: [size, mtime_ns]"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def is_fresh(state: Dict, stage: str, stage_fingerprint: str, folder: str) -> bool:
+    """
+    Check whether a stage can be skipped
+
+    A stage is fresh when its recorded fingerprint matches and every output
+    it recorded still exists with the same size and modification time.
+
+    Args:
+        state: Build state loaded with load_state()
+        stage: Stage name (e.g. 'links', 'thumbnails', 'render')
+        stage_fingerprint: Fingerprint of the stage's current inputs
+        folder: Folder the recorded output paths are relative to
+
+    Returns:
+        bool: True if the previous outputs are still valid
+    """
+    entry = state.get(stage)
+    if not entry or entry.get('fingerprint') != stage_fingerprint:
+        return False
+    for rel_path, signature in entry.get('outputs', {}).items():
+        if _stat_signature(os.path.join(folder, rel_path)) != signature:
+            return False
+    return True
+
+
+def record_stage(state: Dict, stage: str, stage_fingerprint: str,
+                 outputs: Iterable[str], folder: str) -> None:
+    """
+    Remember a completed stage's fingerprint and the outputs it produced
+
+    Args:
+        state: Build state to update in place
+        stage: Stage name
+        stage_fingerprint: Fingerprint the outputs were built from
+        outputs: Output paths relative to folder
+        folder: Folder the output paths are relative to
+    """
+    state[stage] = {
+        'fingerprint': stage_fingerprint,
+        'outputs': {
+            rel_path: _stat_signature(os.path.join(folder, rel_path))
+            for rel_path in outputs
+        },
+    }
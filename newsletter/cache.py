@@ -0,0 +1,141 @@
+"""
+On-disk caches shared by every run: model page -> thumbnail URL (and the
+rest of the page's metadata), and a store of downloaded thumbnail images.
+
+The in-process caches in newsletter.showcase only help sections running in
+the same process. These persist between runs, so the pre-warm daemon can
+fill them during the week and newsletter day mostly reads from disk.
+
+Thumbnail lookups are appended to a JSON-lines file (the last line for a
+URL wins), which is safe with several processes appending at once. Images
+are stored under a hash of their URL and written atomically, next to their
+copy transcoded to the newsletter's thumbnail size.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from newsletter import REPO_ROOT
+from newsletter.journal import atomic_write
+
+CACHE_DIR = os.path.join(REPO_ROOT, '.cache')
+THUMBNAILS_FILE = os.path.join(CACHE_DIR, 'thumbnails.jsonl')
+IMAGE_STORE = os.path.join(CACHE_DIR, 'images')
+
+# Designers occasionally swap a model's cover image, so lookups expire
+THUMBNAIL_TTL = 14 * 24 * 3600  # seconds
+# Stored images nobody asked for in this long are pruned by the daemon
+IMAGE_TTL = 30 * 24 * 3600  # seconds
+
+_thumbnails: Optional[Dict[str, Dict]] = None
+_lock = threading.Lock()
+
+
+def _load_thumbnails() -> Dict[str, Dict]:
+    global _thumbnails
+    if _thumbnails is None:
+        entries = {}
+        try:
+            with open(THUMBNAILS_FILE, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[entry['url']] = entry
+        except OSError:
+            pass
+        _thumbnails = entries
+    return _thumbnails
+
+
+def get_metadata(url: str) -> Optional[Dict]:
+    """
+    Cached model page record (newsletter.metadata.ModelMetadata) for a model
+    page, or None if unknown or expired
+
+    Entries written before metadata was kept only have 'thumbnail_url'.
+    """
+    with _lock:
+        entry = _load_thumbnails().get(url)
+    if entry and time.time() - entry['fetched'] < THUMBNAIL_TTL:
+        return entry.get('metadata') or {'thumbnail_url': entry['thumbnail_url']}
+    return None
+
+
+def put_thumbnail(url: str, thumbnail_url: str, metadata: Optional[Dict] = None) -> None:
+    """Remember the thumbnail URL, and the rest of the metadata, found on a model page"""
+    entry = {'url': url, 'thumbnail_url': thumbnail_url, 'fetched': time.time()}
+    if metadata:
+        entry['metadata'] = metadata
+    with _lock:
+        _load_thumbnails()[url] = entry
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(THUMBNAILS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+def image_path(image_url: str) -> str:
+    """Where an image URL is kept in the store (whether or not it is there yet)"""
+    digest = hashlib.sha256(image_url.encode('utf-8')).hexdigest()[:32]
+    extension = os.path.splitext(urlparse(image_url).path)[1] or '.jpg'
+    return os.path.join(IMAGE_STORE, f"{digest}{extension}")
+
+
+def transcoded_path(image_url: str, max_size: Tuple[int, int]) -> str:
+    """Where the copy of a stored image scaled to fit max_size is kept"""
+    stem, extension = os.path.splitext(image_path(image_url))
+    return f"{stem}-{max_size[0]}x{max_size[1]}{extension}"
+
+
+def has_image(image_url: str) -> bool:
+    """Check whether an image URL is already in the store"""
+    return os.path.exists(image_path(image_url))
+
+
+def touch_image(path: str) -> None:
+    """Mark a stored image as recently used so pruning keeps it"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_images(max_age: float = IMAGE_TTL) -> int:
+    """
+    Delete stored images that haven't been used for max_age seconds
+
+    Returns:
+        int: Number of images removed
+    """
+    removed = 0
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(IMAGE_STORE))
+    except OSError:
+        return 0
+    for entry in entries:
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+def compact_thumbnails() -> None:
+    """Rewrite the thumbnail cache with one line per URL, dropping expired entries"""
+    with _lock:
+        global _thumbnails
+        _thumbnails = None
+        now = time.time()
+        entries = {
+            url: entry for url, entry in _load_thumbnails().items()
+            if now - entry['fetched'] < THUMBNAIL_TTL
+        }
+        _thumbnails = entries
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with atomic_write(THUMBNAILS_FILE, encoding='utf-8') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in entries.values())
@@ -0,0 +1,189 @@
+"""
+Canonical form of Thangs model URLs.
+
+The same model reaches the pipeline spelled many ways: with an ?image= query
+(maker-showcase links point at one make of a model), percent-encoded
+differently, behind a than.gs short link, or simply listed twice. Everything
+that identifies a model (deduplication, the thumbnail caches, the run
+journal, image file names and the catalog) goes through model_key(), which is
+the numeric Thangs ID at the end of the model slug, so none of those
+spellings costs a second fetch or a second file.
+
+The URL a link was found under is still what gets fetched and linked to;
+only its key is canonical.
+"""
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urljoin, urlparse
+
+from newsletter import cache
+from newsletter.journal import atomic_write
+
+THANGS_BASE = 'https://thangs.com'
+SHORT_LINK_HOSTS = ('than.gs',)
+SHORT_LINKS_FILE = os.path.join(cache.CACHE_DIR, 'short_links.json')
+SHORT_LINK_TIMEOUT = 10  # seconds
+MAX_REDIRECTS = 5
+
+MODEL_ID_PATTERN = re.compile(r'-(\d+)$')
+
+# Short links never change target, so resolved ones are kept for good
+_short_links: Optional[Dict[str, str]] = None
+_short_links_lock = threading.Lock()
+
+
+def _split_path(url: str) -> Tuple[List[str], str]:
+    """A model URL's path segments and its decoded model slug"""
+    parts = urlparse(url).path.rstrip('/').split('/')
+    return parts, unquote(parts[parts.index('3d-model') + 1] if '3d-model' in parts[:-1] else parts[-1]).strip()
+
+
+def parse_model_url(url: str) -> Dict[str, Optional[str]]:
+    """
+    Pull the designer, model name and numeric Thangs ID out of a model URL
+
+    The slug is decoded before the ID is matched, so %2D-encoded dashes,
+    trailing slashes, queries and fragments don't hide it.
+
+    Args:
+        url: e.g. https://thangs.com/designer/LUDO/3d-model/S%27more%20Clicker-1318159
+
+    Returns:
+        Dict: 'designer', 'name' and 'thangs_id' (any of them None if absent)
+    """
+    parts, slug = _split_path(url)
+    designer = parts[parts.index('designer') + 1] if 'designer' in parts[:-1] else None
+    match = MODEL_ID_PATTERN.search(slug)
+    return {
+        'designer': unquote(designer) if designer else None,
+        'name': (slug[:match.start()] if match else slug).strip() or None,
+        'thangs_id': int(match.group(1)) if match else None,
+    }
+
+
+def model_id(url: str) -> Optional[int]:
+    """The numeric Thangs ID of a model URL, or None if it has none"""
+    match = MODEL_ID_PATTERN.search(_split_path(url)[1])
+    return int(match.group(1)) if match else None
+
+
+def canonical_url(url: str) -> str:
+    """
+    One spelling per model: https, thangs.com, consistently encoded designer
+    and slug, no query or fragment
+
+    URLs without a model ID only lose their fragment.
+    """
+    info = parse_model_url(url)
+    if info['thangs_id'] is None:
+        return url.split('#')[0]
+    slug = f"{info['name']}-{info['thangs_id']}" if info['name'] else str(info['thangs_id'])
+    if info['designer']:
+        return f"{THANGS_BASE}/designer/{quote(info['designer'], safe='')}/3d-model/{quote(slug, safe='')}"
+    return f"{THANGS_BASE}/3d-model/{quote(slug, safe='')}"
+
+
+def model_key(url: str) -> str:
+    """What identifies a model everywhere: its Thangs ID, else its canonical URL"""
+    thangs_id = model_id(url)
+    return str(thangs_id) if thangs_id is not None else canonical_url(url)
+
+
+def thumbnail_key(url: str) -> str:
+    """
+    What a model page's thumbnail is cached under: the model key, plus the
+    make when an ?image= query picks one, since its og:image is that make's photo
+    """
+    image = parse_qs(urlparse(url).query).get('image')
+    return f"{model_key(url)}?image={image[0]}" if image else model_key(url)
+
+
+def is_short_link(url: str) -> bool:
+    return urlparse(url).netloc.lower() in SHORT_LINK_HOSTS
+
+
+def _load_short_links() -> Dict[str, str]:
+    global _short_links
+    if _short_links is None:
+        try:
+            with open(SHORT_LINKS_FILE, 'r', encoding='utf-8') as f:
+                _short_links = json.load(f)
+        except (OSError, ValueError):
+            _short_links = {}
+    return _short_links
+
+
+def resolve_short_link(url: str) -> str:
+    """
+    Where a than.gs short link points, asking the server only the first time
+
+    Other URLs, and short links that can't be resolved right now, come back
+    unchanged.
+    """
+    if not is_short_link(url):
+        return url
+    with _short_links_lock:
+        target = _load_short_links().get(url)
+    if target:
+        return target
+
+    from newsletter.client import get_session
+
+    target = url
+    try:
+        for _ in range(MAX_REDIRECTS):
+            response = get_session().head(target, allow_redirects=False, timeout=SHORT_LINK_TIMEOUT)
+            location = response.headers.get('Location')
+            if not response.is_redirect or not location:
+                break
+            target = urljoin(target, location)
+            if not is_short_link(target):
+                break
+    except Exception as e:
+        print(f"⚠️  Couldn't resolve short link {url}: {e}")
+        return url
+    if target == url:
+        return url
+
+    with _short_links_lock:
+        short_links = _load_short_links()
+        short_links[url] = target
+        os.makedirs(cache.CACHE_DIR, exist_ok=True)
+        with atomic_write(SHORT_LINKS_FILE, encoding='utf-8') as f:
+            json.dump(short_links, f, indent=1, sort_keys=True)
+    return target
+
+
+def unique_urls(urls: Iterable[str]) -> List[str]:
+    """URLs with short links resolved and repeats of a page (by canonical URL) dropped, first one kept"""
+    seen, unique = set(), []
+    for url in urls:
+        url = resolve_short_link(url)
+        key = canonical_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+def unique_links(links: Iterable[Dict], seen: Optional[set] = None) -> Iterator[Dict]:
+    """
+    Yield link dicts (with a 'url') skipping any whose model was already
+    yielded, resolving short links first
+
+    Args:
+        links: Candidate links, in preference order
+        seen: Model keys to treat as already taken; updated as links are yielded
+    """
+    seen = set() if seen is None else seen
+    for link in links:
+        if is_short_link(link['url']):
+            link = {**link, 'url': resolve_short_link(link['url'])}
+        key = model_key(link['url'])
+        if key in seen:
+            continue
+        seen.add(key)
+        yield link
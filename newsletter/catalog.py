@@ -0,0 +1,509 @@
+"""
+SQLite catalog of every model, designer, thumbnail, stored image, run and
+per-section appearance.
+
+Each section run is written in one transaction once its thumbnail pipeline
+has drained, so lookups such as "latest run for a section" or "image for a
+model" are indexed queries rather than directory scans over dated CSVs. The
+CSV manifests are exports of a run; import_csv_history() backfills the
+catalog from the ones written before it existed.
+
+Leaderboard crawls are also kept as snapshots: the ranked Thangs IDs of a
+listing page on a date, packed as an int64 array so newsletter.trends can
+load months of them straight into NumPy.
+"""
+import csv
+import os
+from array import array
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from newsletter import REPO_ROOT
+# parse_model_url is re-exported for the modules that already look it up here
+from newsletter.canonical import canonical_url, parse_model_url
+
+CATALOG_PATH = os.path.join(REPO_ROOT, 'catalog.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS designers (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    thangs_id INTEGER,
+    name TEXT,
+    designer_id INTEGER REFERENCES designers(id),
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS models_thangs_id ON models(thangs_id);
+CREATE INDEX IF NOT EXISTS models_designer ON models(designer_id);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    model_id INTEGER PRIMARY KEY REFERENCES models(id),
+    thumbnail_url TEXT NOT NULL,
+    resolved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS model_metadata (
+    model_id INTEGER PRIMARY KEY REFERENCES models(id),
+    title TEXT,
+    description TEXT,
+    designer TEXT,
+    price REAL,
+    currency TEXT,
+    rating REAL,
+    rating_count INTEGER,
+    likes INTEGER,
+    downloads INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    date TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    UNIQUE (section, date)
+);
+CREATE INDEX IF NOT EXISTS runs_date ON runs(date);
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    sha256 TEXT,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS images_model ON images(model_id, run_id);
+CREATE INDEX IF NOT EXISTS images_sha256 ON images(sha256);
+CREATE TABLE IF NOT EXISTS appearances (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    model_id INTEGER NOT NULL REFERENCES models(id),
+    image_id INTEGER REFERENCES images(id),
+    link TEXT,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS appearances_model ON appearances(model_id);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    thangs_ids BLOB NOT NULL,
+    UNIQUE (source, date)
+);
+"""
+
+# Columns of model_metadata filled from a newsletter.metadata.ModelMetadata record
+METADATA_COLUMNS = ('title', 'description', 'designer', 'price', 'currency',
+                    'rating', 'rating_count', 'likes', 'downloads')
+
+# Bound parameters per IN (...) lookup, under SQLite's default limit of 999
+LOOKUP_BATCH = 500
+
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+
+@contextmanager
+def connect(path: str = CATALOG_PATH) -> Iterator[sqlite3.Connection]:
+    """
+    Open the catalog, creating its tables on first use, and commit on success
+
+    A connection is opened per call so concurrently running sections never
+    share one; WAL mode lets them read while another section writes.
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute('PRAGMA foreign_keys = ON')
+        if path not in _schema_ready:
+            with _schema_lock:
+                conn.execute('PRAGMA journal_mode = WAL')
+                conn.executescript(SCHEMA)
+                _migrate(conn)
+                _schema_ready.add(path)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Bring a catalog created by an older version up to SCHEMA"""
+    columns = {row['name'] for row in conn.execute('PRAGMA table_info(appearances)')}
+    if 'link' not in columns:
+        # The URL a model was linked under in a run (e.g. with its ?image= make)
+        conn.execute('ALTER TABLE appearances ADD COLUMN link TEXT')
+
+
+def _lookup_ids(conn: sqlite3.Connection, table: str, column: str, values: List[str]) -> Dict[str, int]:
+    """Map values of a unique column to their row ids, a batch of values per query"""
+    ids = {}
+    for start in range(0, len(values), LOOKUP_BATCH):
+        batch = values[start:start + LOOKUP_BATCH]
+        placeholders = ','.join('?' * len(batch))
+        ids.update(conn.execute(f'SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})',
+                                batch).fetchall())
+    return ids
+
+
+def _upsert_models(conn: sqlite3.Connection, urls: List[str], date_str: str) -> Dict[str, int]:
+    """
+    Insert new models and their designers, mark known ones seen on date_str,
+    and map URLs to row ids
+
+    Models are stored under their canonical URL, so every spelling of a
+    model's URL maps to the same row.
+    """
+    canonical = {url: canonical_url(url) for url in urls}
+    parsed = {url: parse_model_url(url) for url in set(canonical.values())}
+    designers = sorted({info['designer'] for info in parsed.values() if info['designer']})
+    conn.executemany('INSERT OR IGNORE INTO designers (slug) VALUES (?)', [(d,) for d in designers])
+    designer_ids = _lookup_ids(conn, 'designers', 'slug', designers)
+
+    conn.executemany(
+        """INSERT INTO models (url, thangs_id, name, designer_id, first_seen, last_seen)
+           VALUES (?, ?, ?, ?, ?, ?)
+           ON CONFLICT(url) DO UPDATE SET last_seen = excluded.last_seen""",
+        [
+            (url, info['thangs_id'], info['name'], designer_ids.get(info['designer']), date_str, date_str)
+            for url, info in sorted(parsed.items())
+        ],
+    )
+    ids = _lookup_ids(conn, 'models', 'url', list(parsed))
+    return {url: ids[key] for url, key in canonical.items()}
+
+
+def record_models(date_str: str, urls: List[str]) -> int:
+    """
+    Add a batch of crawled models to the catalog in one transaction
+
+    Models already known only get their last_seen date moved forward.
+
+    Args:
+        date_str: Crawl date as YYYYMMDD
+        urls: Model URLs
+
+    Returns:
+        int: Number of distinct models written
+    """
+    with connect() as conn:
+        return len(set(_upsert_models(conn, urls, date_str).values()))
+
+
+def record_run(section: str, date_str: str, items: List[Dict]) -> int:
+    """
+    Write a section run and everything it showed in one batched transaction
+
+    A rerun for the same section and date replaces the earlier run.
+
+    Args:
+        section: Section name
+        date_str: Run date as YYYYMMDD
+        items: Pipeline items in manifest order, each with 'url',
+            'image_path' and optionally 'thumbnail_url', 'sha256', 'size' and
+            'metadata' (a newsletter.metadata.ModelMetadata record)
+
+    Returns:
+        int: The run's id
+    """
+    now = time.time()
+
+    with connect() as conn:
+        model_ids = _upsert_models(conn, [item['url'] for item in items], date_str)
+
+        conn.executemany(
+            """INSERT INTO thumbnails (model_id, thumbnail_url, resolved_at) VALUES (?, ?, ?)
+               ON CONFLICT(model_id) DO UPDATE SET thumbnail_url = excluded.thumbnail_url,
+                                                   resolved_at = excluded.resolved_at""",
+            # Images reused by a delta run keep the time their thumbnail was actually resolved
+            [(model_ids[item['url']], item['thumbnail_url'], item.get('resolved_at') or now)
+             for item in items if item.get('thumbnail_url')],
+        )
+
+        # A record without a field (state blob listings often lack likes and downloads) keeps the known value
+        conn.executemany(
+            f"""INSERT INTO model_metadata (model_id, {', '.join(METADATA_COLUMNS)}, updated_at)
+                VALUES (?, {', '.join('?' * len(METADATA_COLUMNS))}, ?)
+                ON CONFLICT(model_id) DO UPDATE SET
+                {', '.join(f'{column} = COALESCE(excluded.{column}, {column})' for column in METADATA_COLUMNS)},
+                updated_at = excluded.updated_at""",
+            [(model_ids[item['url']], *(item['metadata'].get(column) for column in METADATA_COLUMNS), now)
+             for item in items if item.get('metadata')],
+        )
+
+        conn.execute('DELETE FROM runs WHERE section = ? AND date = ?', (section, date_str))
+        run_id = conn.execute('INSERT INTO runs (section, date, finished_at) VALUES (?, ?, ?)',
+                              (section, date_str, now)).lastrowid
+
+        conn.executemany(
+            'INSERT INTO images (model_id, run_id, path, sha256, size) VALUES (?, ?, ?, ?, ?)',
+            [(model_ids[item['url']], run_id, item['image_path'], item.get('sha256'), item.get('size'))
+             for item in items],
+        )
+        # Row ids are handed out in insertion order, so they line up with items
+        image_ids = [row[0] for row in conn.execute('SELECT id FROM images WHERE run_id = ? ORDER BY id', (run_id,))]
+        conn.executemany(
+            'INSERT INTO appearances (run_id, position, model_id, image_id, link) VALUES (?, ?, ?, ?, ?)',
+            [(run_id, position, model_ids[item['url']], image_id, item['url'])
+             for position, (item, image_id) in enumerate(zip(items, image_ids))],
+        )
+    return run_id
+
+
+def get_run(section: str, date_str: Optional[str] = None) -> Optional[Dict]:
+    """
+    Find a section's run for a date, or its latest run when date_str is None
+
+    Returns:
+        Optional[Dict]: 'id', 'section', 'date' and 'finished_at', or None
+    """
+    with connect() as conn:
+        if date_str:
+            row = conn.execute('SELECT * FROM runs WHERE section = ? AND date = ?', (section, date_str)).fetchone()
+        else:
+            row = conn.execute('SELECT * FROM runs WHERE section = ? ORDER BY date DESC LIMIT 1',
+                               (section,)).fetchone()
+    return dict(row) if row else None
+
+
+def previous_run(section: str, date_str: str) -> Optional[Dict]:
+    """A section's latest run on or before date_str (its run for date_str itself if there is one), or None"""
+    with connect() as conn:
+        row = conn.execute('SELECT * FROM runs WHERE section = ? AND date <= ? ORDER BY date DESC LIMIT 1',
+                           (section, date_str)).fetchone()
+    return dict(row) if row else None
+
+
+def run_images(run_id: int) -> List[Dict]:
+    """
+    Everything a run stored about each model it showed, in order
+
+    Returns:
+        List[Dict]: 'url' (as linked), 'image_path', 'sha256', 'size', and the
+        model's latest 'thumbnail_url', its 'resolved_at' time and its
+        'metadata' record (None if unknown)
+    """
+    with connect() as conn:
+        rows = conn.execute(
+            f"""SELECT COALESCE(appearances.link, models.url) AS url, images.path AS image_path,
+                       images.sha256, images.size, thumbnails.thumbnail_url, thumbnails.resolved_at,
+                       model_metadata.updated_at,
+                       {', '.join(f'model_metadata.{column}' for column in METADATA_COLUMNS)} FROM appearances
+                JOIN images ON images.id = appearances.image_id
+                JOIN models ON models.id = appearances.model_id
+                LEFT JOIN thumbnails ON thumbnails.model_id = appearances.model_id
+                LEFT JOIN model_metadata ON model_metadata.model_id = appearances.model_id
+                WHERE appearances.run_id = ? ORDER BY appearances.position""",
+            (run_id,),
+        ).fetchall()
+    items = []
+    for row in rows:
+        item = {key: row[key] for key in ('url', 'image_path', 'sha256', 'size', 'thumbnail_url', 'resolved_at')}
+        item['metadata'] = None
+        if row['updated_at'] is not None:
+            item['metadata'] = {'thumbnail_url': row['thumbnail_url'],
+                                **{column: row[column] for column in METADATA_COLUMNS}}
+        items.append(item)
+    return items
+
+
+def run_manifest(run_id: int) -> List[Dict[str, str]]:
+    """
+    A run's image manifest rows in order: image_path/original_link dicts,
+    plus the model's title, designer, price and currency when its metadata is known
+    """
+    with connect() as conn:
+        rows = conn.execute(
+            """SELECT images.path, COALESCE(appearances.link, models.url),
+                      model_metadata.title, model_metadata.designer, model_metadata.price,
+                      model_metadata.currency FROM appearances
+               JOIN images ON images.id = appearances.image_id
+               JOIN models ON models.id = appearances.model_id
+               LEFT JOIN model_metadata ON model_metadata.model_id = appearances.model_id
+               WHERE appearances.run_id = ? ORDER BY appearances.position""",
+            (run_id,),
+        ).fetchall()
+    manifest = []
+    for path, url, title, designer, price, currency in rows:
+        row = {'image_path': path, 'original_link': url}
+        if title:
+            row.update(title=title, designer=designer, price=price, currency=currency)
+        manifest.append(row)
+    return manifest
+
+
+def image_for_model(model: str) -> Optional[Dict]:
+    """
+    Most recent stored image of a model
+
+    Args:
+        model: The model's URL (any spelling) or numeric Thangs ID
+
+    Returns:
+        Optional[Dict]: 'path', 'sha256', 'section' and 'date' of the image, or None
+    """
+    column = 'thangs_id' if str(model).isdigit() else 'url'
+    with connect() as conn:
+        row = conn.execute(
+            f"""SELECT images.path, images.sha256, runs.section, runs.date FROM models
+                JOIN images ON images.model_id = models.id
+                JOIN runs ON runs.id = images.run_id
+                WHERE models.{column} = ? ORDER BY runs.date DESC LIMIT 1""",
+            (int(model) if column == 'thangs_id' else canonical_url(model),),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def export_manifest_csv(rows: List[Dict[str, str]], path: str) -> None:
+    """Write manifest rows as an image_links CSV"""
+    from newsletter.journal import atomic_write
+
+    with atomic_write(path, newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Image Path', 'Original Link'])
+        for row in rows:
+            writer.writerow([row['image_path'], row['original_link']])
+
+
+def import_csv_history(section: Dict) -> int:
+    """
+    Backfill the catalog with a section's image_links CSVs from before it existed
+
+    Runs already in the catalog are left alone.
+
+    Args:
+        section: Section definition (see newsletter.sections.get_section)
+
+    Returns:
+        int: Number of runs imported
+    """
+    from newsletter.buildcache import file_digest
+
+    prefix = section['image_csv_prefix']
+    imported = 0
+    for filename in sorted(os.listdir(section['folder'])):
+        date_str = filename[len(prefix):-4]
+        if not (filename.startswith(prefix) and filename.endswith('.csv') and date_str.isdigit()):
+            continue
+        if get_run(section['name'], date_str):
+            continue
+
+        items = []
+        with open(os.path.join(section['folder'], filename), 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                image_file = os.path.join(section['folder'], row['Image Path'])
+                items.append({
+                    'url': row['Original Link'],
+                    'image_path': row['Image Path'],
+                    'sha256': file_digest(image_file),
+                    'size': os.path.getsize(image_file) if os.path.exists(image_file) else None,
+                })
+        record_run(section['name'], date_str, items)
+        imported += 1
+    return imported
+
+
+def import_snapshot_history(section: Dict) -> int:
+    """
+    Backfill a listing section's snapshots from its dated links CSVs, which
+    hold the whole listing in rank order
+
+    Returns:
+        int: Number of snapshots imported
+    """
+    if section['source'] != 'listing':
+        return 0
+    with connect() as conn:
+        known = {date for (date,) in conn.execute('SELECT date FROM snapshots WHERE source = ?',
+                                                  (section['listing_url'],))}
+
+    prefix = section['links_csv_prefix']
+    imported = 0
+    for filename in sorted(os.listdir(section['folder'])):
+        date_str = filename[len(prefix):-4]
+        if not (filename.startswith(prefix) and filename.endswith('.csv') and date_str.isdigit()):
+            continue
+        if date_str in known:
+            continue
+        with open(os.path.join(section['folder'], filename), 'r', encoding='utf-8') as f:
+            urls = [row['URL'] for row in csv.DictReader(f)]
+        record_snapshot(section['listing_url'], date_str, urls)
+        imported += 1
+    return imported
+
+
+def record_snapshot(source: str, date_str: str, urls: List[str]) -> int:
+    """
+    Store a listing page's ranking for a date, replacing an earlier one that day
+
+    Args:
+        source: Listing URL the ranking came from
+        date_str: Date as YYYYMMDD
+        urls: Model URLs in rank order; ones without a numeric ID are skipped
+
+    Returns:
+        int: Number of ranked models stored
+    """
+    ids, seen = array('q'), set()
+    for url in urls:
+        thangs_id = parse_model_url(url)['thangs_id']
+        if thangs_id is not None and thangs_id not in seen:
+            seen.add(thangs_id)
+            ids.append(thangs_id)
+    return record_snapshot_ids(source, date_str, ids)
+
+
+def record_snapshot_ids(source: str, date_str: str, ids: array) -> int:
+    """Store a ranking already packed as distinct Thangs IDs in an array('q'), like record_snapshot()"""
+    with connect() as conn:
+        conn.execute(
+            """INSERT INTO snapshots (source, date, taken_at, thangs_ids) VALUES (?, ?, ?, ?)
+               ON CONFLICT(source, date) DO UPDATE SET taken_at = excluded.taken_at,
+                                                      thangs_ids = excluded.thangs_ids""",
+            (source, date_str, time.time(), ids.tobytes()),
+        )
+    return len(ids)
+
+
+def load_snapshots(source: str, since: Optional[str] = None) -> List[Tuple[str, bytes]]:
+    """
+    A listing's snapshots in date order
+
+    Args:
+        source: Listing URL
+        since: Only snapshots on or after this YYYYMMDD date
+
+    Returns:
+        List[Tuple[str, bytes]]: (date, packed native-order int64 Thangs IDs) pairs
+    """
+    with connect() as conn:
+        rows = conn.execute(
+            'SELECT date, thangs_ids FROM snapshots WHERE source = ? AND date >= ? ORDER BY date',
+            (source, since or ''),
+        ).fetchall()
+    return [(date, bytes(blob)) for date, blob in rows]
+
+
+def previous_snapshot(source: str, date_str: str) -> Optional[array]:
+    """
+    A listing's latest snapshot from before date_str
+
+    Returns:
+        Optional[array]: Its Thangs IDs in rank order as an array('q'), or
+        None if the listing has no earlier snapshot
+    """
+    with connect() as conn:
+        row = conn.execute(
+            'SELECT thangs_ids FROM snapshots WHERE source = ? AND date < ? ORDER BY date DESC LIMIT 1',
+            (source, date_str),
+        ).fetchone()
+    if not row:
+        return None
+    ids = array('q')
+    ids.frombytes(bytes(row[0]))
+    return ids
@@ -0,0 +1,40 @@
+"""
+HTTP client shared by every section running in the same process.
+
+One pooled requests session is created lazily on first use, so importing
+this module (or running a fully cached build) never pays for importing
+requests.
+"""
+import threading
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Enough pooled connections per host for every section fetching at once
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Get the process-wide requests session, creating it on first use
+
+    Returns:
+        requests.Session: Session with a browser User-Agent and a connection
+        pool sized for concurrent sections
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                session.headers['User-Agent'] = USER_AGENT
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
@@ -0,0 +1,207 @@
+"""
+Deep crawl of listing and designer pages into the catalog, in bounded memory.
+
+The newsletter sections only read the first page of a listing; a crawl
+walks every page of it (whole categories, every designer) and may see tens
+of thousands of models. Pages are fetched one at a time and parsed with a
+streaming HTML parser rather than a soup, each model is held as a small
+__slots__ record only until its batch is written to the catalog, and the
+ranking kept for the leaderboard snapshot is a packed array('q'). What a
+crawl holds at any moment is one page, one batch and 8 bytes per ranked
+model, however deep it goes.
+"""
+import time
+from array import array
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from newsletter import catalog
+from newsletter.prewarm import RateLimiter
+from newsletter.showcase import absolute_url, make_request, validate_url
+
+PAGE_PARAM = 'page'  # query parameter Thangs listings paginate with
+DEFAULT_MAX_PAGES = 500
+DEFAULT_RATE = 30  # requests per minute
+BATCH_SIZE = 500  # models per catalog transaction
+
+
+class ModelRecord:
+    """One crawled model link"""
+
+    __slots__ = ('url', 'text', 'thangs_id')
+
+    def __init__(self, url: str, text: str, thangs_id: Optional[int]):
+        self.url = url
+        self.text = text
+        self.thangs_id = thangs_id
+
+
+class IdSet:
+    """Set of non-negative integer IDs as a bitmap, sized by the largest ID rather than the count"""
+
+    __slots__ = ('bits',)
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, value: int) -> bool:
+        """Add value, returning False if it was already present"""
+        index, mask = value >> 3, 1 << (value & 7)
+        if index >= len(self.bits):
+            self.bits.extend(bytes(max(index + 1 - len(self.bits), len(self.bits))))
+        if self.bits[index] & mask:
+            return False
+        self.bits[index] |= mask
+        return True
+
+
+class ModelLinkParser(HTMLParser):
+    """Collect '/3d-model/' links from HTML fed to it, without building a document tree"""
+
+    def __init__(self):
+        super().__init__()
+        self.records: List[ModelRecord] = []
+        self._href: Optional[str] = None
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            self._href = absolute_url(href) if href else None
+            self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag != 'a' or self._href is None:
+            return
+        url, self._href = self._href, None
+        if '/3d-model/' in url and validate_url(url):
+            text = ' '.join(''.join(self._text).split())
+            self.records.append(ModelRecord(url, text, catalog.parse_model_url(url)['thangs_id']))
+
+
+def page_url(url: str, page: int) -> str:
+    """url with its page query parameter set to page"""
+    parts = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != PAGE_PARAM]
+    query.append((PAGE_PARAM, str(page)))
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def listing_page_url(url: str, page: int) -> str:
+    """The URL of a listing's page-th page; the first page is the listing URL as given"""
+    return url if page == 1 else page_url(url, page)
+
+
+def iter_model_records(url: str, limiter: RateLimiter, max_pages: int = DEFAULT_MAX_PAGES,
+                       stats: Optional[Dict[str, int]] = None) -> Iterator[ModelRecord]:
+    """
+    Yield the model links of every page of a listing, fetching one page at a time
+
+    Paging stops at max_pages, at a page without model links, or when a page
+    repeats the previous one (past the end, or a page that ignores PAGE_PARAM).
+
+    Args:
+        url: First page of the listing
+        limiter: Shared request pacing
+        max_pages: Most pages to fetch
+        stats: Counters to add 'pages' fetched to
+    """
+    previous = None
+    for page in range(1, max_pages + 1):
+        limiter.wait()
+        response = make_request(listing_page_url(url, page))
+        if not response:
+            return
+        parser = ModelLinkParser()
+        parser.feed(response.text)
+        parser.close()
+        if stats is not None:
+            stats['pages'] = stats.get('pages', 0) + 1
+
+        urls = [record.url for record in parser.records]
+        if not urls or urls == previous:
+            return
+        previous = urls
+        yield from parser.records
+
+
+def store_records(url: str, date_str: str, records: Iterable[ModelRecord], batch_size: int = BATCH_SIZE,
+                  stats: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """
+    Write a listing's crawled records to the catalog as they arrive
+
+    Models are written batch_size at a time; once the records run out the
+    whole ranking is stored as the listing's snapshot for date_str.
+
+    Args:
+        url: The listing the records were found on
+        date_str: Crawl date as YYYYMMDD
+        records: Its model links, in rank order across pages
+        batch_size: Models per catalog transaction
+        stats: Counters to add to (created if None)
+
+    Returns:
+        Dict[str, int]: stats with distinct 'models' and catalog 'batches' added
+    """
+    stats = {'pages': 0, 'models': 0, 'batches': 0} if stats is None else stats
+    ranking, ranked = array('q'), IdSet()
+    batch: List[str] = []
+
+    def flush():
+        if batch:
+            catalog.record_models(date_str, batch)
+            stats['batches'] += 1
+            batch.clear()
+
+    for record in records:
+        if record.thangs_id is not None:
+            if not ranked.add(record.thangs_id):
+                continue
+            ranking.append(record.thangs_id)
+        stats['models'] += 1
+        batch.append(record.url)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    if ranking:
+        catalog.record_snapshot_ids(url, date_str, ranking)
+    return stats
+
+
+def crawl_source(url: str, date_str: str, limiter: RateLimiter, max_pages: int = DEFAULT_MAX_PAGES,
+                 batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Crawl every page of one listing or designer page into the catalog
+
+    Returns:
+        Dict[str, int]: Counts of 'pages' fetched, distinct 'models' and catalog 'batches'
+    """
+    stats = {'pages': 0, 'models': 0, 'batches': 0}
+    return store_records(url, date_str, iter_model_records(url, limiter, max_pages, stats), batch_size, stats)
+
+
+def run_crawl(urls: List[str], date_str: str, max_pages: int = DEFAULT_MAX_PAGES,
+              rate: float = DEFAULT_RATE, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Crawl each URL in turn, sharing one request pace
+
+    Returns:
+        Dict[str, int]: Totals of 'pages', 'models' and 'batches' across the URLs
+    """
+    limiter = RateLimiter(rate)
+    totals = {'pages': 0, 'models': 0, 'batches': 0}
+    start = time.perf_counter()
+    for url in urls:
+        print(f"🔍 Crawling {url}...")
+        stats = crawl_source(url, date_str, limiter, max_pages, batch_size)
+        print(f"✅ {stats['models']} models from {stats['pages']} pages ({stats['batches']} catalog batches)")
+        for key in totals:
+            totals[key] += stats[key]
+    print(f"⏱️  Crawled {totals['models']} models in {time.perf_counter() - start:.1f}s")
+    return totals
@@ -0,0 +1,100 @@
+"""
+Delta runs: only what changed on a section's source since its last run is processed.
+
+Most of a leaderboard is the same from one run to the next, yet a full run
+resolves, downloads and transcodes every model on it again. A delta run
+diffs the freshly extracted link list against the previous snapshot of the
+section's source (the listing's leaderboard snapshot, or for designer
+sections the models of its previous run). A model that was already on it
+and whose image the section's last run stored reuses that image, thumbnail
+URL and metadata: the file is copied into the new img folder and nothing is
+fetched. New models, and ones whose stored thumbnail may be stale (resolved
+longer than cache.THUMBNAIL_TTL ago, or no longer the one the thumbnail
+cache knows), go through the pipeline as usual.
+"""
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Optional
+
+from newsletter import cache, canonical, catalog
+
+
+def load_baseline(section: Dict, date_str: str) -> Optional[Dict]:
+    """
+    What a delta run of a section can reuse: its latest run on or before date_str
+
+    Args:
+        section: Section definition (see newsletter.sections.get_section)
+        date_str: Date of the run being built as YYYYMMDD
+
+    Returns:
+        Optional[Dict]: 'date' of that run, 'snapshot' (model keys on the
+        source's previous snapshot) and 'images' (model key -> stored image
+        record, see catalog.run_images, for models still on the snapshot),
+        or None if the section has never run
+    """
+    run = catalog.previous_run(section['name'], date_str)
+    if not run:
+        return None
+    images = {canonical.model_key(row['url']): row for row in catalog.run_images(run['id'])}
+    snapshot = set(images)
+    # A run for this very date is as current as the source; earlier ones are checked against it
+    if section['source'] == 'listing' and run['date'] < date_str:
+        ids = catalog.previous_snapshot(section['listing_url'], date_str)
+        if ids is not None:
+            snapshot = {str(thangs_id) for thangs_id in ids}
+    return {
+        'date': run['date'],
+        'snapshot': snapshot,
+        'images': {key: row for key, row in images.items() if key in snapshot},
+    }
+
+
+def diff_links(baseline: Dict, links: Iterable[Dict]) -> Dict[str, int]:
+    """Counts of 'new', 'unchanged' and 'dropped' models in a link list against the baseline's snapshot"""
+    keys = {canonical.model_key(link['url']) for link in links}
+    snapshot = baseline['snapshot']
+    return {'new': len(keys - snapshot), 'unchanged': len(keys & snapshot), 'dropped': len(snapshot - keys)}
+
+
+def reusable_image(section: Dict, baseline: Optional[Dict], url: str) -> Optional[Dict]:
+    """
+    The stored image a delta run can show for a model without fetching anything
+
+    Returns:
+        Optional[Dict]: The baseline's record for the model (see
+        catalog.run_images), or None if the model has to be processed
+    """
+    from newsletter.showcase import section_path
+
+    stored = baseline and baseline['images'].get(canonical.model_key(url))
+    if not stored or not stored['thumbnail_url']:
+        return None
+    # A different make (?image=) of the same model has a different photo
+    if canonical.thumbnail_key(stored['url']) != canonical.thumbnail_key(url):
+        return None
+    if time.time() - (stored['resolved_at'] or 0) >= cache.THUMBNAIL_TTL:
+        return None
+    cached = cache.get_metadata(canonical.thumbnail_key(url))
+    if cached and cached['thumbnail_url'] != stored['thumbnail_url']:
+        return None
+    if not os.path.exists(section_path(section, stored['image_path'])):
+        return None
+    return stored
+
+
+def reuse_image(section: Dict, stored: Dict, img_folder: str) -> str:
+    """
+    Copy a stored image into img_folder under the same asset name
+
+    Returns:
+        str: The copy's path relative to the section
+    """
+    from newsletter.showcase import section_path
+
+    image_path = os.path.join(img_folder, os.path.basename(stored['image_path']))
+    source, target = section_path(section, stored['image_path']), section_path(section, image_path)
+    if os.path.abspath(source) != os.path.abspath(target):
+        shutil.copy2(source, target)
+    return image_path
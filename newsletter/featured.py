@@ -0,0 +1,205 @@
+"""
+Featured history: which models and images earlier newsletters already showed.
+
+Every model and image hash that ever appeared in a run goes into a Bloom
+filter kept in .cache/, backed by the catalog as the exact store. Checking a
+candidate costs a few bit lookups; only the rare candidates the filter
+can't rule out (those featured at some point, plus ~1% false positives)
+are looked up in the catalog to see whether they appeared in the last K
+newsletters. The filter is brought up to date incrementally from the runs
+recorded since it was last saved, so it stays cheap after years of history.
+"""
+import hashlib
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from newsletter import cache, canonical, catalog
+from newsletter.journal import atomic_write
+
+BLOOM_FILE = os.path.join(cache.CACHE_DIR, 'featured_history.bloom')
+
+BLOOM_CAPACITY = 1_000_000  # keys before the filter is rebuilt twice as large
+BLOOM_ERROR_RATE = 0.01
+
+# How selection treats models shown in the last 'newsletters' sends: 'downrank'
+# moves them behind fresh ones, 'exclude' drops them, 'off' ignores history.
+# A section can override this with its own 'novelty' dict.
+DEFAULT_NOVELTY = {'mode': 'downrank', 'newsletters': 4}
+NOVELTY_MODES = ('off', 'downrank', 'exclude')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys, using double hashing on one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE,
+                 bits: Optional[bytearray] = None, count: int = 0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def model_key(url: str) -> str:
+    """Bloom key for a model: its Thangs ID when the URL has one, so URL variants match"""
+    thangs_id = canonical.model_id(url)
+    return f"model:{thangs_id}" if thangs_id is not None else f"url:{canonical.canonical_url(url)}"
+
+
+def image_key(sha256: str) -> str:
+    return f"image:{sha256}"
+
+
+class FeaturedHistory:
+    """Bloom filter over everything ever featured, plus exact recency checks against the catalog"""
+
+    def __init__(self, before_date: str, newsletters: int):
+        """
+        Args:
+            before_date: Date of the newsletter being built; history is what came before it
+            newsletters: How many earlier sends (distinct run dates) count as recent
+        """
+        self.before_date = before_date
+        with catalog.connect() as conn:
+            dates = [row[0] for row in conn.execute(
+                'SELECT DISTINCT date FROM runs WHERE date < ? ORDER BY date DESC LIMIT ?',
+                (before_date, newsletters),
+            )]
+        # Oldest date still inside the window; nothing is recent without earlier sends
+        self.since = dates[-1] if dates else None
+        self.bloom = self._load() if self.since else None
+
+    def _load(self) -> BloomFilter:
+        """Load the saved filter and add the runs recorded since it was saved"""
+        bloom, last_run = None, 0
+        try:
+            with open(BLOOM_FILE, 'rb') as f:
+                header = json.loads(f.readline())
+                bloom = BloomFilter(header['capacity'], header['error_rate'], bytearray(f.read()), header['count'])
+                last_run = header['last_run']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        with catalog.connect() as conn:
+            rows = conn.execute(
+                """SELECT appearances.run_id, models.url, models.thangs_id, images.sha256 FROM appearances
+                   JOIN models ON models.id = appearances.model_id
+                   LEFT JOIN images ON images.id = appearances.image_id
+                   WHERE appearances.run_id > ? ORDER BY appearances.run_id""",
+                (last_run,),
+            ).fetchall()
+            if bloom is None or bloom.count + 2 * len(rows) > bloom.capacity:
+                # First use, or full: rebuild from the whole history, with room to grow
+                total = conn.execute('SELECT COUNT(*) FROM appearances').fetchone()[0]
+                capacity = BLOOM_CAPACITY
+                while capacity < 4 * total:
+                    capacity *= 2
+                bloom = BloomFilter(capacity)
+                rows = conn.execute(
+                    """SELECT appearances.run_id, models.url, models.thangs_id, images.sha256 FROM appearances
+                       JOIN models ON models.id = appearances.model_id
+                       LEFT JOIN images ON images.id = appearances.image_id
+                       ORDER BY appearances.run_id"""
+                ).fetchall()
+
+        for run_id, url, thangs_id, sha256 in rows:
+            bloom.add(f"model:{thangs_id}" if thangs_id is not None else f"url:{url}")
+            if sha256:
+                bloom.add(image_key(sha256))
+            last_run = max(last_run, run_id)
+
+        if rows:
+            os.makedirs(cache.CACHE_DIR, exist_ok=True)
+            header = {'capacity': bloom.capacity, 'error_rate': bloom.error_rate,
+                      'count': bloom.count, 'last_run': last_run}
+            with atomic_write(BLOOM_FILE, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                f.write(bloom.bits)
+        return bloom
+
+    def recent_models(self, urls: List[str]) -> Set[str]:
+        """The URLs among urls whose model was featured in the recent newsletters"""
+        if not self.bloom:
+            return set()
+        maybe = {url: catalog.parse_model_url(url)['thangs_id'] for url in urls if model_key(url) in self.bloom}
+        if not maybe:
+            return set()
+
+        ids = sorted({thangs_id for thangs_id in maybe.values() if thangs_id is not None})
+        plain = sorted({canonical.canonical_url(url) for url, thangs_id in maybe.items() if thangs_id is None})
+        recent_ids, recent_urls = set(), set()
+        with catalog.connect() as conn:
+            for column, values, found in (('thangs_id', ids, recent_ids), ('url', plain, recent_urls)):
+                for start in range(0, len(values), catalog.LOOKUP_BATCH):
+                    batch = values[start:start + catalog.LOOKUP_BATCH]
+                    found.update(row[0] for row in conn.execute(
+                        f"""SELECT DISTINCT models.{column} FROM models
+                            JOIN appearances ON appearances.model_id = models.id
+                            JOIN runs ON runs.id = appearances.run_id
+                            WHERE models.{column} IN ({','.join('?' * len(batch))})
+                              AND runs.date >= ? AND runs.date < ?""",
+                        (*batch, self.since, self.before_date),
+                    ))
+        return {url for url, thangs_id in maybe.items()
+                if thangs_id in recent_ids or canonical.canonical_url(url) in recent_urls}
+
+    def recent_images(self, hashes: List[str]) -> Set[str]:
+        """The image hashes among hashes that were featured in the recent newsletters"""
+        if not self.bloom:
+            return set()
+        maybe = sorted({sha for sha in hashes if sha and image_key(sha) in self.bloom})
+        found = set()
+        with catalog.connect() as conn:
+            for start in range(0, len(maybe), catalog.LOOKUP_BATCH):
+                batch = maybe[start:start + catalog.LOOKUP_BATCH]
+                found.update(row[0] for row in conn.execute(
+                    f"""SELECT DISTINCT images.sha256 FROM images
+                        JOIN runs ON runs.id = images.run_id
+                        WHERE images.sha256 IN ({','.join('?' * len(batch))})
+                          AND runs.date >= ? AND runs.date < ?""",
+                    (*batch, self.since, self.before_date),
+                ))
+        return found
+
+
+def novelty_settings(section: Dict) -> Dict:
+    """A section's novelty mode and window, falling back to DEFAULT_NOVELTY"""
+    return {**DEFAULT_NOVELTY, **section.get('novelty', {})}
+
+
+def apply_novelty(links: List[Dict], recent: Set[str], mode: str, key: str = 'url') -> List[Dict]:
+    """
+    Drop or down-rank recently featured entries, keeping the order otherwise
+
+    Args:
+        links: Candidates in preference order
+        recent: Values of key that were featured recently
+        mode: 'exclude', 'downrank' or 'off'
+        key: Field of each candidate to look up in recent
+
+    Returns:
+        List[Dict]: The candidates to use, in order
+    """
+    if mode == 'off' or not recent:
+        return links
+    fresh = [link for link in links if link.get(key) not in recent]
+    if mode == 'exclude':
+        return fresh
+    return fresh + [link for link in links if link.get(key) in recent]
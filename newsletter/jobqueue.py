@@ -0,0 +1,399 @@
+"""
+Durable job queue shared by crawl worker processes, on one machine or many.
+
+A job is a (kind, key, payload) triple. The key is what makes the queue
+idempotent: putting a job whose key is already queued, running or done is a
+no-op, so workers can re-enqueue follow-up work freely (two listings linking
+the same model yield one model-page fetch), and a job that runs twice after
+its lease ran out stores the same result under the same key.
+
+Workers lease a job for a number of seconds. A job that is not completed or
+failed in time (its worker crashed, hung or lost its connection) becomes
+available again; every lease counts as an attempt, and a job failing
+MAX_ATTEMPTS times is left 'dead' for inspection instead of retried forever.
+Failed jobs are retried after an exponential backoff. A completed job drops
+its payload and keeps only its result, which later jobs and the collector
+read back by key.
+
+Two backends implement the same methods:
+
+- SQLiteQueue: one SQLite file, the default. Worker processes on the machine
+  holding the file coordinate through BEGIN IMMEDIATE transactions (SQLite
+  locking is not to be trusted over network filesystems).
+- RedisQueue: hashes and sorted sets on any client with the redis-py API, for
+  workers on several machines. MemoryRedis is an in-process stand-in with the
+  same API, for running the Redis code path without a server.
+
+open_queue() picks one from a URL: a path or sqlite:///path, redis://host:port/db
+(needs the redis package) or memory://.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LEASE_SECONDS = 120  # how long a worker may hold a job before others may take it
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 30  # seconds before the first retry; doubled for each later one
+STATES = ('queued', 'leased', 'done', 'dead')
+
+
+class Job:
+    """A leased job"""
+
+    __slots__ = ('key', 'kind', 'payload', 'attempts', 'owner')
+
+    def __init__(self, key: str, kind: str, payload: Dict, attempts: int, owner: str):
+        self.key = key
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.owner = owner
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before a job that has failed attempts times is offered again"""
+    return RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    owner TEXT,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, kind, available_at);
+"""
+
+
+class SQLiteQueue:
+    """Job queue in one SQLite file"""
+
+    def __init__(self, path: str, max_attempts: int = MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection per queue object; worker processes each open their own
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.executescript(SCHEMA)
+
+    def _write(self, sql: str, params: Tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def put(self, kind: str, key: str, payload: Dict) -> bool:
+        """Queue a job unless one with its key exists; True if it was added"""
+        now = time.time()
+        return self._write(
+            'INSERT OR IGNORE INTO jobs (key, kind, payload, available_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+            (key, kind, json.dumps(payload), now, now)) == 1
+
+    def lease(self, kinds: List[str], owner: str, seconds: float = LEASE_SECONDS) -> Optional[Job]:
+        """
+        Take the job of one of kinds that has been ready longest
+
+        Jobs whose lease ran out count as ready. Returns None if there is none.
+        """
+        marks = ','.join('?' * len(kinds))
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                while True:
+                    now = time.time()
+                    row = conn.execute(
+                        f"SELECT key, kind, payload, attempts FROM jobs "
+                        f"WHERE state IN ('queued', 'leased') AND kind IN ({marks}) AND available_at <= ? "
+                        f"ORDER BY available_at LIMIT 1", (*kinds, now)).fetchone()
+                    if row is None:
+                        conn.execute('COMMIT')
+                        return None
+                    key, kind, payload, attempts = row
+                    if attempts >= self.max_attempts:
+                        # Its last lease ran out without an answer
+                        conn.execute("UPDATE jobs SET state = 'dead', error = coalesce(error, 'lease expired'), "
+                                     "updated_at = ? WHERE key = ?", (now, key))
+                        continue
+                    conn.execute("UPDATE jobs SET state = 'leased', attempts = attempts + 1, owner = ?, "
+                                 "available_at = ?, updated_at = ? WHERE key = ?",
+                                 (owner, now + seconds, now, key))
+                    conn.execute('COMMIT')
+                    return Job(key, kind, json.loads(payload), attempts + 1, owner)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def complete(self, job: Job, result: Dict) -> bool:
+        """Store a job's result and drop its payload; False if it was already done"""
+        return self._write(
+            "UPDATE jobs SET state = 'done', result = ?, payload = '{}', error = NULL, updated_at = ? "
+            "WHERE key = ? AND state != 'done'", (json.dumps(result), time.time(), job.key)) == 1
+
+    def fail(self, job: Job, error: str) -> str:
+        """
+        Give a job back after an error, to be retried after a backoff
+
+        Returns:
+            str: Its new state, 'queued', or 'dead' once it has used up its attempts
+        """
+        state = 'dead' if job.attempts >= self.max_attempts else 'queued'
+        now = time.time()
+        self._write("UPDATE jobs SET state = ?, error = ?, owner = NULL, available_at = ?, updated_at = ? "
+                    "WHERE key = ? AND state = 'leased' AND owner = ?",
+                    (state, error, now + retry_delay(job.attempts), now, job.key, job.owner))
+        return state
+
+    def result(self, key: str) -> Optional[Dict]:
+        """A done job's result, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE key = ? AND state = 'done'", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def results(self, kind: str) -> Iterator[Tuple[str, Dict]]:
+        """(key, result) of every done job of a kind"""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, result FROM jobs WHERE kind = ? AND state = 'done' ORDER BY key",
+                                      (kind,)).fetchall()
+        for key, result in rows:
+            yield key, json.loads(result)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        with self._lock:
+            rows = self._conn.execute('SELECT state, count(*) FROM jobs GROUP BY state').fetchall()
+        return {state: dict(rows).get(state, 0) for state in STATES}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class RedisQueue:
+    """
+    Job queue on a Redis server (or anything with the redis-py client API)
+
+    Each job is a hash at <prefix>:job:<key>. Ready jobs of a kind sit in the
+    sorted set <prefix>:ready:<kind> scored by when they become available,
+    leased ones in <prefix>:leases scored by when their lease runs out. A
+    worker owns a job once its ZREM from one of those sets returns 1, so
+    workers never need a transaction to claim one.
+    """
+
+    def __init__(self, client, prefix: str = 'crawl', max_attempts: int = MAX_ATTEMPTS):
+        self.client = client
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+
+    def _name(self, *parts: str) -> str:
+        return ':'.join((self.prefix,) + parts)
+
+    def put(self, kind: str, key: str, payload: Dict) -> bool:
+        """Queue a job unless one with its key exists; True if it was added"""
+        job = self._name('job', key)
+        if not self.client.hsetnx(job, 'kind', kind):
+            return False
+        self.client.hset(job, mapping={'payload': json.dumps(payload), 'state': 'queued', 'attempts': 0})
+        self.client.sadd(self._name('kinds'), kind)
+        self.client.zadd(self._name('ready', kind), {key: time.time()})
+        return True
+
+    def _reclaim(self, now: float) -> None:
+        """Offer jobs whose lease ran out again"""
+        for key in self.client.zrangebyscore(self._name('leases'), 0, now):
+            if self.client.zrem(self._name('leases'), key):
+                job = self._name('job', key)
+                kind = self.client.hget(job, 'kind')
+                if self.client.hget(job, 'state') == 'done':
+                    continue  # completed just as its lease ran out
+                if int(self.client.hget(job, 'attempts') or 0) >= self.max_attempts:
+                    self.client.hset(job, mapping={'state': 'dead', 'error': 'lease expired'})
+                    self.client.sadd(self._name('dead'), key)
+                else:
+                    self.client.hset(job, 'state', 'queued')
+                    self.client.zadd(self._name('ready', kind), {key: now})
+
+    def lease(self, kinds: List[str], owner: str, seconds: float = LEASE_SECONDS) -> Optional[Job]:
+        """Take a ready job of one of kinds, or return None if there is none"""
+        now = time.time()
+        self._reclaim(now)
+        for kind in kinds:
+            ready = self._name('ready', kind)
+            for key in self.client.zrangebyscore(ready, 0, now, start=0, num=16):
+                if not self.client.zrem(ready, key):
+                    continue  # another worker took it
+                job = self._name('job', key)
+                if self.client.hget(job, 'state') == 'done':
+                    continue  # requeued after its lease ran out, then completed by the late worker
+                attempts = self.client.hincrby(job, 'attempts', 1)
+                self.client.hset(job, mapping={'state': 'leased', 'owner': owner})
+                self.client.zadd(self._name('leases'), {key: now + seconds})
+                return Job(key, kind, json.loads(self.client.hget(job, 'payload')), int(attempts), owner)
+        return None
+
+    def complete(self, job: Job, result: Dict) -> bool:
+        """Store a job's result and drop its payload; False if it was already done"""
+        name = self._name('job', job.key)
+        self.client.zrem(self._name('leases'), job.key)
+        # A job whose lease ran out may have been offered again; it needn't run twice
+        self.client.zrem(self._name('ready', job.kind), job.key)
+        if self.client.hget(name, 'state') == 'done':
+            return False
+        self.client.hset(name, mapping={'state': 'done', 'result': json.dumps(result), 'payload': '{}', 'error': ''})
+        self.client.sadd(self._name('done', job.kind), job.key)
+        return True
+
+    def fail(self, job: Job, error: str) -> str:
+        """Give a job back after an error; returns its new state, 'queued' or 'dead'"""
+        name = self._name('job', job.key)
+        if not self.client.zrem(self._name('leases'), job.key):
+            return self.client.hget(name, 'state')  # its lease ran out and it was handed on
+        if job.attempts >= self.max_attempts:
+            self.client.hset(name, mapping={'state': 'dead', 'error': error})
+            self.client.sadd(self._name('dead'), job.key)
+            return 'dead'
+        self.client.hset(name, mapping={'state': 'queued', 'error': error})
+        self.client.zadd(self._name('ready', job.kind), {job.key: time.time() + retry_delay(job.attempts)})
+        return 'queued'
+
+    def result(self, key: str) -> Optional[Dict]:
+        """A done job's result, or None"""
+        job = self._name('job', key)
+        if self.client.hget(job, 'state') != 'done':
+            return None
+        return json.loads(self.client.hget(job, 'result'))
+
+    def results(self, kind: str) -> Iterator[Tuple[str, Dict]]:
+        """(key, result) of every done job of a kind"""
+        for key in sorted(self.client.smembers(self._name('done', kind))):
+            result = self.result(key)
+            if result is not None:
+                yield key, result
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        kinds = self.client.smembers(self._name('kinds'))
+        done = sum(self.client.scard(self._name('done', kind)) for kind in kinds)
+        queued = sum(self.client.zcard(self._name('ready', kind)) for kind in kinds)
+        leased = self.client.zcard(self._name('leases'))
+        return {'queued': queued, 'leased': leased, 'done': done, 'dead': self.client.scard(self._name('dead'))}
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryRedis:
+    """
+    In-process stand-in for the part of the redis-py client RedisQueue uses
+
+    Values come back as str, as from a client made with decode_responses=True.
+    Threads of one process can share it; it is not a server.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, object] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, kind):
+        value = self._data.get(name)
+        if value is None:
+            value = self._data[name] = kind()
+        return value
+
+    def hsetnx(self, name: str, key: str, value) -> int:
+        with self._lock:
+            fields = self._get(name, dict)
+            if key in fields:
+                return 0
+            fields[key] = str(value)
+            return 1
+
+    def hset(self, name: str, key: Optional[str] = None, value=None, mapping: Optional[Dict] = None) -> int:
+        with self._lock:
+            fields = self._get(name, dict)
+            items = dict(mapping or {})
+            if key is not None:
+                items[key] = value
+            added = sum(1 for field in items if field not in fields)
+            fields.update({field: str(item) for field, item in items.items()})
+            return added
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        with self._lock:
+            return self._data.get(name, {}).get(key)
+
+    def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        with self._lock:
+            fields = self._get(name, dict)
+            fields[key] = str(int(fields.get(key, 0)) + amount)
+            return int(fields[key])
+
+    def sadd(self, name: str, *values) -> int:
+        with self._lock:
+            members = self._get(name, set)
+            added = sum(1 for value in values if value not in members)
+            members.update(values)
+            return added
+
+    def smembers(self, name: str) -> set:
+        with self._lock:
+            return set(self._data.get(name, set()))
+
+    def scard(self, name: str) -> int:
+        with self._lock:
+            return len(self._data.get(name, set()))
+
+    def zadd(self, name: str, mapping: Dict[str, float]) -> int:
+        with self._lock:
+            scores = self._get(name, dict)
+            added = sum(1 for member in mapping if member not in scores)
+            scores.update({member: float(score) for member, score in mapping.items()})
+            return added
+
+    def zrem(self, name: str, *members) -> int:
+        with self._lock:
+            scores = self._data.get(name, {})
+            return sum(1 for member in members if scores.pop(member, None) is not None)
+
+    def zrangebyscore(self, name: str, min_score: float, max_score: float,
+                      start: Optional[int] = None, num: Optional[int] = None) -> List[str]:
+        with self._lock:
+            members = sorted((score, member) for member, score in self._data.get(name, {}).items()
+                             if min_score <= score <= max_score)
+        members = [member for _, member in members]
+        if start is not None and num is not None:
+            members = members[start:start + num]
+        return members
+
+    def zcard(self, name: str) -> int:
+        with self._lock:
+            return len(self._data.get(name, {}))
+
+
+def open_queue(url: str):
+    """
+    A queue backend from a URL
+
+    Args:
+        url: A file path or sqlite:///path, redis://host:port/db (or
+            rediss://) for a Redis server, or memory:// for an in-process MemoryRedis
+    """
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        import redis
+
+        return RedisQueue(redis.Redis.from_url(url, decode_responses=True))
+    if url.startswith('memory://'):
+        return RedisQueue(MemoryRedis())
+    if url.startswith('sqlite:///'):
+        url = url[len('sqlite:///'):]
+        url = url if os.path.isabs(url) else os.path.abspath(url)
+    return SQLiteQueue(url)
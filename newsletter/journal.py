@@ -0,0 +1,130 @@
+"""
+Crash-safe progress journal for a section run.
+
+Every completed unit of work (a link discovered, a thumbnail URL resolved,
+an image stored, the section rendered) is appended to a JSON-lines file in
+the section's folder as soon as it finishes and flushed to disk. If the run
+dies part way (timeout, Ctrl-C, laptop sleep), a rerun with --resume replays
+the journal and skips every unit it already recorded. A torn last line from
+a crash mid-write is ignored.
+
+Files the journal points at are written with atomic_write(), so a unit is
+only ever recorded after its output is complete and in place.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+JOURNAL_PREFIX = '.journal_'
+
+
+def journal_path(folder: str, date_str: str) -> str:
+    """Journal file for a section folder's run on a date"""
+    return os.path.join(folder, f"{JOURNAL_PREFIX}{date_str}.jsonl")
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', **kwargs) -> Iterator:
+    """
+    Open a temporary file that replaces path only once it was written completely
+
+    Args:
+        path: Final file path
+        mode: 'w' or 'wb'
+        kwargs: Passed on to open() (encoding, newline)
+
+    Yields:
+        The open temporary file
+    """
+    # Unique per writer, so two threads producing the same file don't collide
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.part"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Journal:
+    """Append-only record of the units of work a section run has completed"""
+
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Args:
+            path: Journal file (see journal_path())
+            resume: Keep and replay the existing journal instead of starting over
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Dict]] = {}
+        self._links: Dict[int, Dict] = {}
+
+        if resume:
+            records = self._read()
+            for record in records:
+                self._remember(record)
+            # Rewrite without any torn tail so new records aren't appended after it
+            with atomic_write(path, encoding='utf-8') as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        elif os.path.exists(path):
+            os.remove(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _read(self) -> List[Dict]:
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # torn write from a crash; nothing after it is trustworthy
+        except OSError:
+            pass
+        return records
+
+    def _remember(self, record: Dict) -> None:
+        unit = record['unit']
+        if unit == 'link':
+            # A resumed discovery rewrites the same positions
+            self._links[record['index']] = record
+        self._records.setdefault(unit, {})[record.get('key', '')] = record
+
+    def record(self, unit: str, key: str = '', **fields) -> None:
+        """
+        Append a completed unit of work and flush it to disk
+
+        Args:
+            unit: Kind of work ('link', 'links_done', 'thumbnail', 'image', 'render')
+            key: What the unit is about, usually the model URL
+            fields: JSON-serializable details needed to skip the unit next time
+        """
+        record = {'unit': unit, 'key': key, **fields}
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._remember(record)
+
+    def get(self, unit: str, key: str = '') -> Optional[Dict]:
+        """The recorded unit for a key, or None if it hasn't completed"""
+        with self._lock:
+            return self._records.get(unit, {}).get(key)
+
+    def links(self) -> Optional[List[Dict]]:
+        """Every discovered link in order, or None unless discovery had finished"""
+        with self._lock:
+            done = self._records.get('links_done', {}).get('')
+            if done is None:
+                return None
+            return [self._links[index] for index in range(done['count'])]
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,301 @@
+"""
+Personalized mail-merge rendering on top of the rollup output.
+
+The combined showcase is parsed once and compiled into per-section
+fragments: static chunks separated by slots for recipient fields
+({{ field }} merge tags) and for the tracking token appended to every link.
+Rendering a recipient is then only joining those chunks with the
+recipient's values - nothing is re-parsed or re-templated per email.
+
+Recipients are streamed from a CSV and the rendered emails are streamed to
+JSONL shard files, so memory stays bounded however many recipients there
+are.
+"""
+import csv
+import hashlib
+import html
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from newsletter.sections import SECTIONS
+
+TRACKING_PARAM = 'rid'
+SHARD_SIZE = 1000  # recipients per output file
+DEFAULT_GREETING = 'Hi there,'
+
+FIELD_PATTERN = re.compile(r'href="([^"]*)"|\{\{\s*(\w+)\s*\}\}')
+
+GREETING_FRAGMENT = """<table width="100%" cellpadding="0" cellspacing="0" border="0" style="min-width: 100%;">
+    <tr>
+        <td align="center" style="padding: 20px 0 0 0;">
+            {{ greeting }}
+        </td>
+    </tr>
+</table>
+"""
+
+# A compiled fragment: static chunks, and for each gap either None (the
+# recipient's tracking token) or the name of a recipient field
+Fragment = Tuple[List[str], List[Optional[str]]]
+
+
+def section_for_blob(file_name: str) -> Optional[str]:
+    """Map an html_blob_*.html filename back to the section that wrote it"""
+    for name, config in SECTIONS.items():
+        if file_name.startswith(config['blob_prefix']):
+            return name
+    return None
+
+
+def compile_fragment(fragment_html: str) -> Fragment:
+    """
+    Split HTML into static chunks and slots
+
+    Every href gets the tracking parameter baked into the preceding chunk
+    (in its query, ahead of any #fragment), leaving only the token itself as a slot, and every {{ field }} merge tag
+    becomes a field slot.
+
+    Args:
+        fragment_html: HTML to compile
+
+    Returns:
+        Fragment: (chunks, slots) with len(chunks) == len(slots) + 1
+    """
+    chunks, slots = [], []
+    position = 0
+    for match in FIELD_PATTERN.finditer(fragment_html):
+        if match.group(1) is not None:
+            # The parameter joins the query; after a #fragment the server would never see it
+            query_end = match.start(1) + len(match.group(1).split('#', 1)[0])
+            separator = '&' if '?' in fragment_html[match.start(1):query_end] else '?'
+            chunks.append(fragment_html[position:query_end] + f"{separator}{TRACKING_PARAM}=")
+            slots.append(None)
+            position = query_end
+        else:
+            chunks.append(fragment_html[position:match.start()])
+            slots.append(match.group(2))
+            position = match.end()
+    chunks.append(fragment_html[position:])
+    return chunks, slots
+
+
+def compile_rollup(rollup_path: str) -> Dict:
+    """
+    Compile a combined_showcase_*.html file into mail-merge fragments
+
+    Args:
+        rollup_path: Path to the rollup output
+
+    Returns:
+        Dict: 'order' (section names as they appear in the rollup), 'sections'
+        (section name -> Fragment), plus the 'head', 'greeting' and 'tail'
+        fragments wrapped around them
+    """
+    with open(rollup_path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+
+    order, sections = [], {}
+    for block in soup.select('div.showcase-section'):
+        title = block.select_one('div.section-title')
+        file_name = title.get_text(strip=True).replace('Source:', '').strip() if title else ''
+        name = section_for_blob(file_name) or file_name
+        if title:
+            # The source link is for reviewers, not recipients
+            title.decompose()
+        order.append(name)
+        sections[name] = compile_fragment(block.decode_contents(formatter='html').strip() + "\n")
+
+    head = """<!DOCTYPE html>
+<html>
+<head>
+    <title>{{ subject }}</title>
+</head>
+<body>
+"""
+    return {
+        'order': order,
+        'sections': sections,
+        'head': compile_fragment(head),
+        'greeting': compile_fragment(GREETING_FRAGMENT),
+        'tail': compile_fragment("</body>\n</html>\n"),
+    }
+
+
+def json_escape(text: str) -> str:
+    """Escape text for the inside of a JSON string literal"""
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+def precompile_for_json(compiled: Dict) -> Dict:
+    """
+    JSON-escape every static chunk once, so an email can be written into a
+    JSONL shard by escaping only its (short) recipient values
+    """
+    escaped = dict(compiled, json=True)
+    for key in ('head', 'greeting', 'tail'):
+        chunks, slots = compiled[key]
+        escaped[key] = ([json_escape(chunk) for chunk in chunks], slots)
+    escaped['sections'] = {
+        name: ([json_escape(chunk) for chunk in chunks], slots)
+        for name, (chunks, slots) in compiled['sections'].items()
+    }
+    return escaped
+
+
+def render_fragment(fragment: Fragment, token: str, fields: Dict[str, str]) -> str:
+    """Join a fragment's chunks with one recipient's token and field values"""
+    chunks, slots = fragment
+    if not any(slots):
+        # Only tracking slots: a single join does the whole fragment
+        return token.join(chunks)
+    parts = [''] * (len(chunks) + len(slots))
+    parts[0::2] = chunks
+    parts[1::2] = [token if slot is None else fields.get(slot, '') for slot in slots]
+    return ''.join(parts)
+
+
+def tracking_token(recipient: Dict[str, str], campaign: str) -> str:
+    """The recipient's own token, or one derived from their email that stays stable across re-renders"""
+    if recipient.get('token'):
+        return recipient['token']
+    return hashlib.blake2b(f"{campaign}:{recipient['email']}".encode('utf-8'), digest_size=8).hexdigest()
+
+
+def recipient_sections(recipient: Dict[str, str], compiled: Dict,
+                       segments: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """
+    Pick the sections a recipient gets, in order
+
+    Uses the recipient's own 'sections' column (names separated by '|') if
+    set, then their segment's sections, then every section in rollup order.
+    """
+    if recipient.get('sections'):
+        wanted = recipient['sections'].split('|')
+    elif segments and recipient.get('segment') in segments:
+        wanted = segments[recipient['segment']]
+    else:
+        return compiled['order']
+    return [name for name in wanted if name in compiled['sections']]
+
+
+def render_recipient(compiled: Dict, recipient: Dict[str, str], token: str,
+                     segments: Optional[Dict[str, List[str]]] = None) -> str:
+    """
+    Render one personalized email
+
+    Args:
+        compiled: Output of compile_rollup()
+        recipient: Row with at least 'email'; optional 'first_name',
+            'greeting', 'segment', 'sections', 'subject' and any field used
+            by {{ field }} merge tags
+        token: Tracking token appended to every link
+        segments: Segment name -> section names
+
+    Returns:
+        str: The email's HTML (JSON-escaped if compiled came from
+        precompile_for_json)
+    """
+    fields = {key: html.escape(value or '') for key, value in recipient.items() if key}
+    if not recipient.get('greeting'):
+        first_name = recipient.get('first_name')
+        fields['greeting'] = f"Hi {fields['first_name']}," if first_name else DEFAULT_GREETING
+    if not fields.get('subject'):
+        fields['subject'] = 'What to Print This Weekend'
+    if compiled.get('json'):
+        fields = {key: json_escape(value) for key, value in fields.items()}
+
+    parts = [
+        render_fragment(compiled['head'], token, fields),
+        render_fragment(compiled['greeting'], token, fields),
+    ]
+    for name in recipient_sections(recipient, compiled, segments):
+        parts.append(render_fragment(compiled['sections'][name], token, fields))
+    parts.append(render_fragment(compiled['tail'], token, fields))
+    return ''.join(parts)
+
+
+def read_recipients(csv_path: str) -> Iterator[Dict[str, str]]:
+    """Stream recipient rows from a CSV with an 'email' column"""
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('email'):
+                yield row
+
+
+def write_shards(compiled: Dict, recipients: Iterable[Dict[str, str]], output_dir: str,
+                 campaign: str, segments: Optional[Dict[str, List[str]]] = None,
+                 shard_size: int = SHARD_SIZE) -> Dict:
+    """
+    Render recipients and stream them into JSONL shard files
+
+    Each line is {"email", "token", "html"}. Only the current shard is open
+    at any time and each email is written as soon as it is rendered.
+
+    Args:
+        compiled: Output of compile_rollup()
+        recipients: Iterable of recipient rows (consumed lazily)
+        output_dir: Folder for shard-NNNNN.jsonl files
+        campaign: Campaign name the tracking tokens are derived from
+        segments: Segment name -> section names
+        shard_size: Recipients per shard
+
+    Returns:
+        Dict: 'emails', 'shards', 'bytes' and 'seconds' for the run
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    escaped = precompile_for_json(compiled)
+    stats = {'emails': 0, 'shards': 0, 'bytes': 0, 'seconds': 0.0}
+    shard = None
+    start = time.perf_counter()
+    try:
+        for recipient in recipients:
+            if stats['emails'] % shard_size == 0:
+                if shard:
+                    shard.close()
+                shard = open(os.path.join(output_dir, f"shard-{stats['shards']:05d}.jsonl"), 'w', encoding='utf-8')
+                stats['shards'] += 1
+
+            token = json_escape(tracking_token(recipient, campaign))
+            email_html = render_recipient(escaped, recipient, token, segments)
+            line = f'{{"email": "{json_escape(recipient["email"])}", "token": "{token}", "html": "{email_html}"}}\n'
+            shard.write(line)
+            stats['emails'] += 1
+            stats['bytes'] += len(line)
+    finally:
+        if shard:
+            shard.close()
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def synthetic_recipients(count: int, section_names: List[str]) -> Iterator[Dict[str, str]]:
+    """Generate fake recipients for benchmarking, cycling through section subsets"""
+    for i in range(count):
+        subset = section_names[i % len(section_names):] or section_names
+        yield {
+            'email': f"subscriber{i}@example.com",
+            'first_name': f"Maker{i}" if i % 3 else '',
+            'sections': '|'.join(subset),
+        }
+
+
+def benchmark(compiled: Dict, count: int, output_dir: str) -> Dict:
+    """
+    Measure mail-merge throughput on synthetic recipients
+
+    Args:
+        compiled: Output of compile_rollup()
+        count: Number of emails to render
+        output_dir: Scratch folder for the shards
+
+    Returns:
+        Dict: write_shards() stats plus 'emails_per_second'
+    """
+    stats = write_shards(compiled, synthetic_recipients(count, compiled['order']), output_dir, 'benchmark')
+    stats['emails_per_second'] = stats['emails'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
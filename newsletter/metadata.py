@@ -0,0 +1,187 @@
+"""
+Model metadata read from a model page's head in the same parse that finds
+its thumbnail.
+
+Thangs puts everything the newsletter can use in the page head: og:image,
+og:title ("<name> | 3D model by <designer>"), og:description, and a JSON-LD
+block with the model's name, creator, price and counters. Only the head is
+parsed (the body is most of the page and holds nothing of use here), and the
+result is one ModelMetadata record per model. It rides along with the
+thumbnail URL through the caches, the journal and the catalog, so alt text,
+captions and ranking never cost another request.
+"""
+import json
+import re
+from typing import Dict, Iterator, Optional, TypedDict
+
+from newsletter import canonical
+
+# og:title is "<name> | 3D model by <designer>", sometimes just "<name> | Thangs"
+OG_TITLE_PATTERN = re.compile(r'^(?P<name>.*?)\s*\|\s*(?:3D model by\s+(?P<designer>.+)|Thangs)\s*$')
+CAPTION_LENGTH = 60  # characters of the title shown under a thumbnail
+DEFAULT_ALT = '3D Model Preview'
+
+
+class ModelMetadata(TypedDict, total=False):
+    thumbnail_url: Optional[str]
+    title: Optional[str]
+    description: Optional[str]
+    designer: Optional[str]
+    price: Optional[float]
+    currency: Optional[str]
+    rating: Optional[float]
+    rating_count: Optional[int]
+    likes: Optional[int]
+    downloads: Optional[int]
+
+
+FIELDS = tuple(ModelMetadata.__annotations__)
+
+
+def _head(html: str) -> str:
+    end = html.find('</head>')
+    return html[:end + len('</head>')] if end != -1 else html
+
+
+def _number(value, kind=float):
+    try:
+        return kind(str(value).replace(',', '')) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+def _name(value) -> Optional[str]:
+    """A schema.org person/organization as a name"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get('name')
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _json_ld_items(data) -> Iterator[Dict]:
+    """Every object in a JSON-LD document, including inside @graph lists"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_items(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from _json_ld_items(data.get('@graph'))
+
+
+def _apply_json_ld(record: ModelMetadata, item: Dict) -> None:
+    record['title'] = record.get('title') or _name(item.get('name'))
+    record['description'] = record.get('description') or _name(item.get('description'))
+    record['designer'] = record.get('designer') or _name(
+        item.get('creator') or item.get('author') or item.get('brand'))
+
+    offers = item.get('offers')
+    if isinstance(offers, list):
+        offers = offers[0] if offers else None
+    if isinstance(offers, dict) and record.get('price') is None:
+        record['price'] = _number(offers.get('price', offers.get('lowPrice')))
+        record['currency'] = offers.get('priceCurrency')
+
+    rating = item.get('aggregateRating')
+    if isinstance(rating, dict):
+        record['rating'] = _number(rating.get('ratingValue'))
+        record['rating_count'] = _number(rating.get('ratingCount', rating.get('reviewCount')), int)
+
+    statistics = item.get('interactionStatistic') or []
+    for statistic in statistics if isinstance(statistics, list) else [statistics]:
+        if not isinstance(statistic, dict):
+            continue
+        kind = statistic.get('interactionType') or ''
+        kind = str(kind.get('@type', '') if isinstance(kind, dict) else kind).lower()
+        count = _number(statistic.get('userInteractionCount'), int)
+        if 'like' in kind:
+            record['likes'] = count
+        elif 'download' in kind:
+            record['downloads'] = count
+
+
+def parse_model_page(html: str, url: Optional[str] = None) -> ModelMetadata:
+    """
+    Everything the newsletter uses from a model page, in one parse of its head
+
+    Args:
+        html: Model page HTML
+        url: The page's URL, for the designer when the page doesn't name one
+
+    Returns:
+        ModelMetadata: Fields the page didn't provide are None
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(_head(html), 'html.parser')
+    record = ModelMetadata(**{field: None for field in FIELDS})
+
+    meta = {}
+    for tag in soup.find_all('meta'):
+        key = tag.get('property') or tag.get('name')
+        if key and tag.get('content') and key not in meta:
+            meta[key] = tag['content'].strip()
+
+    record['thumbnail_url'] = meta.get('og:image')
+    if not record['thumbnail_url']:
+        # Older pages only have the preview in the body
+        img_element = BeautifulSoup(html, 'html.parser').select_one('img[alt*="model"]')
+        if img_element and img_element.get('src'):
+            record['thumbnail_url'] = img_element.get('src')
+
+    title = meta.get('og:title')
+    match = OG_TITLE_PATTERN.match(title) if title else None
+    if match:
+        record['title'] = match.group('name') or None
+        record['designer'] = match.group('designer')
+    else:
+        record['title'] = title
+    record['description'] = meta.get('og:description') or meta.get('description')
+    record['designer'] = record['designer'] or meta.get('author')
+
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        for item in _json_ld_items(data):
+            _apply_json_ld(record, item)
+
+    if not record['designer'] and url:
+        record['designer'] = canonical.parse_model_url(url)['designer']
+    return record
+
+
+def alt_text(record: Optional[Dict]) -> str:
+    """Image alt text: "<title> by <designer>" when known"""
+    if not record or not record.get('title'):
+        return DEFAULT_ALT
+    if record.get('designer'):
+        return f"{record['title']} by {record['designer']}"
+    return record['title']
+
+
+def caption(record: Optional[Dict]) -> Optional[str]:
+    """Short line shown under a thumbnail: title and price, or None without a title"""
+    if not record or not record.get('title'):
+        return None
+    title = record['title']
+    if len(title) > CAPTION_LENGTH:
+        title = title[:CAPTION_LENGTH - 1].rstrip() + '…'
+    price = record.get('price')
+    if price is None:
+        return title
+    if price == 0:
+        return f"{title} · Free"
+    symbol = '$' if record.get('currency') in (None, 'USD') else f"{record['currency']} "
+    return f"{title} · {symbol}{price:,.2f}"
+
+
+def popularity(record: Optional[Dict]) -> float:
+    """Engagement score for ranking: downloads plus likes, weighted by rating when rated"""
+    if not record:
+        return 0.0
+    score = float((record.get('downloads') or 0) + 2 * (record.get('likes') or 0))
+    if record.get('rating') and record.get('rating_count'):
+        score *= 0.5 + record['rating'] / 10
+    return score
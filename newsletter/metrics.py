@@ -0,0 +1,223 @@
+"""
+Per-run metrics: request counts and bytes per host, latency histograms,
+cache hit ratios, stage and section wall times, retries and failures.
+
+Everything is kept in one process-wide registry behind a lock, so sections
+running concurrently (and their pipeline threads) all report into it. The
+counters are plain dict updates, cheap enough to stay on for every run; at
+the end write_report() saves them as JSON next to the run's outputs, with a
+plain-text summary beside it for reading across weeks.
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from newsletter.journal import atomic_write
+
+# Upper bounds of the latency histogram buckets, in milliseconds; anything
+# slower falls in a final overflow bucket
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+REPORT_PREFIX = 'run_metrics_'
+
+_lock = threading.Lock()
+_started = time.time()
+_counters: Dict[str, Dict[str, float]] = {}
+_latencies: Dict[str, Dict] = {}
+_cache: Dict[str, List[int]] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+
+
+def reset() -> None:
+    """Forget everything recorded so far, e.g. at the start of a run"""
+    global _started
+    with _lock:
+        _started = time.time()
+        _counters.clear()
+        _latencies.clear()
+        _cache.clear()
+        _timings.clear()
+
+
+def incr(group: str, key: str, amount: float = 1) -> None:
+    """Add amount to a counter, e.g. incr('failures', 'download_image')"""
+    with _lock:
+        counters = _counters.setdefault(group, {})
+        counters[key] = counters.get(key, 0) + amount
+
+
+def record_request(url: str, nbytes: int = 0, ok: bool = True) -> None:
+    """Count one HTTP request and the bytes it returned against its host"""
+    host = urlparse(url).netloc or 'unknown'
+    with _lock:
+        for group, amount in (('requests', 1), ('bytes', nbytes), ('failed_requests', 0 if ok else 1)):
+            counters = _counters.setdefault(group, {})
+            counters[host] = counters.get(host, 0) + amount
+
+
+def cache_lookup(name: str, hit: bool) -> None:
+    """Record a hit or miss for one of the caches"""
+    with _lock:
+        counts = _cache.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def observe(name: str, seconds: float) -> None:
+    """Add one latency sample to a histogram"""
+    ms = seconds * 1000
+    with _lock:
+        histogram = _latencies.get(name)
+        if histogram is None:
+            histogram = _latencies[name] = {
+                'count': 0, 'total_ms': 0.0, 'min_ms': ms, 'max_ms': ms,
+                'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+        histogram['count'] += 1
+        histogram['total_ms'] += ms
+        histogram['min_ms'] = min(histogram['min_ms'], ms)
+        histogram['max_ms'] = max(histogram['max_ms'], ms)
+        histogram['buckets'][bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+
+@contextmanager
+def latency(name: str) -> Iterator[None]:
+    """Record the enclosed block's latency in the name histogram, e.g. just a function's network path"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator recording each call's latency in the name histogram"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with latency(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_time(group: str, key: str, seconds: float) -> None:
+    """Add wall time to a group such as 'sections' or 'stages'"""
+    with _lock:
+        timings = _timings.setdefault(group, {})
+        timings[key] = timings.get(key, 0.0) + seconds
+
+
+@contextmanager
+def timer(group: str, key: str) -> Iterator[None]:
+    """Time the enclosed block into add_time(group, key)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(group, key, time.perf_counter() - start)
+
+
+def _percentile(histogram: Dict, fraction: float) -> float:
+    """Upper bound of the bucket holding the given fraction of samples"""
+    target = fraction * histogram['count']
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS + [histogram['max_ms']], histogram['buckets']):
+        seen += count
+        if seen >= target:
+            return min(bound, histogram['max_ms'])
+    return histogram['max_ms']
+
+
+def snapshot() -> Dict:
+    """Everything recorded so far, as a JSON-ready dict"""
+    with _lock:
+        latencies = {}
+        for name, histogram in _latencies.items():
+            latencies[name] = {
+                'count': histogram['count'],
+                'mean_ms': round(histogram['total_ms'] / histogram['count'], 3),
+                'min_ms': round(histogram['min_ms'], 3),
+                'p50_ms': round(_percentile(histogram, 0.5), 3),
+                'p95_ms': round(_percentile(histogram, 0.95), 3),
+                'max_ms': round(histogram['max_ms'], 3),
+                'buckets_ms': dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ['inf'], histogram['buckets'])),
+            }
+        caches = {
+            name: {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 4)}
+            for name, (hits, misses) in _cache.items()
+        }
+        return {
+            'started_at': _started,
+            'finished_at': time.time(),
+            'hosts': {
+                host: {
+                    'requests': int(_counters['requests'][host]),
+                    'bytes': int(_counters.get('bytes', {}).get(host, 0)),
+                    'failed': int(_counters.get('failed_requests', {}).get(host, 0)),
+                }
+                for host in sorted(_counters.get('requests', {}))
+            },
+            'latency': latencies,
+            'caches': caches,
+            'timings': {group: {k: round(v, 3) for k, v in sorted(t.items())} for group, t in _timings.items()},
+            'retries': dict(_counters.get('retries', {})),
+            'failures': dict(_counters.get('failures', {})),
+        }
+
+
+def format_summary(report: Dict) -> str:
+    """Human-readable summary of a snapshot()"""
+    lines = [f"Run metrics ({report['finished_at'] - report['started_at']:.1f}s)", '']
+    lines.append('Requests per host:')
+    for host, stats in report['hosts'].items():
+        lines.append(f"  {host:<28} {stats['requests']:6d} requests {stats['bytes'] / 1024:10.1f} KiB "
+                     f"{stats['failed']:4d} failed")
+    lines.append('')
+    lines.append('Latency:')
+    for name, stats in sorted(report['latency'].items()):
+        lines.append(f"  {name:<28} n={stats['count']:<6d} mean {stats['mean_ms']:8.1f} ms  "
+                     f"p50 <= {stats['p50_ms']:.0f} ms  p95 <= {stats['p95_ms']:.0f} ms  max {stats['max_ms']:.0f} ms")
+    lines.append('')
+    lines.append('Cache hit ratios:')
+    for name, stats in sorted(report['caches'].items()):
+        lines.append(f"  {name:<28} {stats['hit_ratio']:7.1%} ({stats['hits']} hits, {stats['misses']} misses)")
+    for group, timings in sorted(report['timings'].items()):
+        lines.append('')
+        lines.append(f"Wall time by {group.rstrip('s')}:")
+        for key, seconds in timings.items():
+            lines.append(f"  {key:<40} {seconds:8.2f}s")
+    for group in ('retries', 'failures'):
+        lines.append('')
+        lines.append(f"{group.capitalize()}: " + (', '.join(
+            f"{key} {int(count)}" for key, count in sorted(report[group].items())) or 'none'))
+    return '\n'.join(lines) + '\n'
+
+
+def write_report(folder: str, date_str: str, name: Optional[str] = None) -> str:
+    """
+    Write the run's metrics as run_metrics_YYYYMMDD.json plus a .txt summary
+
+    Args:
+        folder: Directory to write into, e.g. the rollup folder
+        date_str: Run date as YYYYMMDD
+        name: Section a single-section run was for, added to the file names
+            (run_metrics_YYYYMMDD-<name>) so it doesn't replace the full run's report
+
+    Returns:
+        str: The human summary
+    """
+    report = snapshot()
+    summary = format_summary(report)
+    base = os.path.join(folder, f"{REPORT_PREFIX}{date_str}" + (f"-{name}" if name else ''))
+    with atomic_write(f"{base}.json", encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+    with atomic_write(f"{base}.txt", encoding='utf-8') as f:
+        f.write(summary)
+    return summary
@@ -0,0 +1,221 @@
+"""
+Run several newsletter sections concurrently in one process, then the rollup.
+
+Sections are independent (each works only inside its own folder with its
+own build state), so each one gets a worker thread. They share the pooled
+HTTP session and the process-wide thumbnail caches in newsletter.showcase,
+so total wall time approaches that of the slowest section.
+
+With allocation on, every section's candidates are collected first (also
+concurrently) and newsletter.allocation assigns each model to one section,
+so no model appears twice in the rollup.
+
+Several tenants' newsletters (see newsletter.tenants) run as one set of
+sections, grouped per tenant for allocation and the rollup, so everything
+they have in common is fetched and processed once.
+"""
+import contextvars
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from newsletter import allocation, metrics, profiling, tracing
+from newsletter.rollup import ROLLUP_DIR, generate_rollup, print_push_reminder
+from newsletter.sections import get_section
+from newsletter.tenants import tenant_folder
+from newsletter.showcase import SectionError, collect_candidates, run_section, today_str
+
+# Which section the current worker is running, for output prefixes. A context
+# variable rather than a thread-local so the section's pipeline threads inherit it.
+_current_section = contextvars.ContextVar('section', default=None)
+
+
+class SectionOutput:
+    """Stdout wrapper that prefixes every line printed by a section worker with the section's name"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        section = _current_section.get()
+        if section is None:
+            return self._stream.write(text)
+
+        # Buffer per thread until a full line is available so lines never interleave
+        *lines, rest = (getattr(self._local, 'buffer', '') + text).split('\n')
+        self._local.buffer = rest
+        if lines:
+            with self._lock:
+                self._stream.write(''.join(f"[{section}] {line}\n" for line in lines))
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _collect_one(name: str, date_str: str, limit: Optional[int]) -> Optional[Tuple[List[Dict], int]]:
+    """Collect one section's scored candidates and quota in the current worker thread, or None if it can't"""
+    token = _current_section.set(name)
+    try:
+        with tracing.span(f"{name}.candidates", 'section'):
+            return collect_candidates(get_section(name), date_str, limit)
+    except SectionError as e:
+        print(f"⚠️  {e}; it will pick its own models")
+        return None
+    finally:
+        sys.stdout.flush()
+        _current_section.reset(token)
+
+
+def allocate_sections(executor: ThreadPoolExecutor, section_names: List[str], date_str: str,
+                      limit: Optional[int], groups: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[Dict]]:
+    """
+    Collect every section's candidates concurrently and assign each model to one section
+
+    Args:
+        groups: Tenant name -> its sections, allocated separately (a model
+            can appear once in every tenant's newsletter)
+
+    Returns:
+        Dict[str, List[Dict]]: Section name -> its allocated links, for the
+        sections whose candidates could be collected
+    """
+    print("🧮 Collecting candidates for allocation...")
+    futures = {name: executor.submit(_collect_one, name, date_str, limit) for name in section_names}
+    collected = {name: future.result() for name, future in futures.items()}
+    streams = {name: result[0] for name, result in collected.items() if result}
+    quotas = {name: result[1] for name, result in collected.items() if result}
+
+    assigned = {}
+    for label, members in (groups or {None: section_names}).items():
+        group_streams = {name: streams[name] for name in members if name in streams}
+        with metrics.timer('stages', 'allocation'):
+            group_assigned = allocation.allocate(group_streams, quotas)
+        assigned.update(group_assigned)
+        summary = allocation.allocation_summary(group_streams, group_assigned)
+        prefix = f"{label}: " if label else ''
+        print(f"🧮 {prefix}{summary}" if summary else f"🧮 {prefix}No model was a candidate in more than one section")
+    return assigned
+
+
+def _run_one(name: str, date_str: str, force: bool, limit: Optional[int],
+             stage_workers: Optional[Dict[str, int]], resume: bool, export_csv: bool,
+             links: Optional[List[Dict]] = None, delta: bool = False) -> Dict:
+    """Run one section in the current worker thread and report how it went"""
+    token = _current_section.set(name)
+    start = time.perf_counter()
+    result = {'section': name, 'ok': False, 'output': None, 'error': None}
+    try:
+        with tracing.span(name, 'section'), profiling.section(name):
+            result['output'] = run_section(name, date_str=date_str, force=force, limit=limit,
+                                           stage_workers=stage_workers, resume=resume,
+                                           export_csv=export_csv, links=links, delta=delta)
+        result['ok'] = result['output'] is not None
+    except SectionError as e:
+        result['error'] = str(e)
+        print(f"❌ {e}")
+    except Exception as e:
+        result['error'] = repr(e)
+        print(f"❌ Unexpected error: {e!r}")
+    finally:
+        result['seconds'] = time.perf_counter() - start
+        metrics.add_time('sections', name, result['seconds'])
+        if not result['ok']:
+            metrics.incr('failures', f"section.{name}")
+        sys.stdout.flush()
+        _current_section.reset(token)
+    return result
+
+
+def run_newsletter(section_names: List[str], date_str: Optional[str] = None, force: bool = False,
+                   limit: Optional[int] = None, max_workers: Optional[int] = None,
+                   rollup: bool = True, stage_workers: Optional[Dict[str, int]] = None,
+                   resume: bool = False, export_csv: bool = True, allocate: bool = False,
+                   delta: bool = False, groups: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+    """
+    Run the given sections concurrently, then combine their blobs
+
+    Args:
+        section_names: Sections to run (see newsletter.sections.SECTIONS)
+        date_str: Run date as YYYYMMDD (defaults to today)
+        force: Rebuild every stage even if its inputs are unchanged
+        limit: Keep at most this many models per section
+        max_workers: Sections to run at once (defaults to all of them)
+        rollup: Generate the combined showcase afterwards
+        stage_workers: Per-stage worker counts for every section's thumbnail pipeline
+        resume: Continue each section's interrupted run for this date where it stopped
+        export_csv: Export each section's links and image manifest as dated CSVs
+        allocate: Assign every model to at most one section before the
+            sections run (see newsletter.allocation)
+        delta: Only process the models that changed since each section's
+            last run (see newsletter.delta)
+        groups: Tenant name -> its sections (see newsletter.tenants). Each
+            tenant is allocated and rolled up on its own, into its folder.
+
+    Returns:
+        List[Dict]: One result per section with 'section', 'ok', 'output',
+        'error' and 'seconds'
+    """
+    date_str = date_str or today_str()
+    start = time.perf_counter()
+    metrics.reset()
+
+    # Tenants' section folders are created on their first run
+    for name in section_names:
+        os.makedirs(get_section(name)['folder'], exist_ok=True)
+
+    original_stdout = sys.stdout
+    sys.stdout = SectionOutput(original_stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or len(section_names),
+                                thread_name_prefix='section') as executor:
+            assigned = allocate_sections(executor, section_names, date_str, limit, groups) if allocate else {}
+            futures = [
+                executor.submit(_run_one, name, date_str, force, limit, stage_workers, resume, export_csv,
+                                assigned.get(name), delta)
+                for name in section_names
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        sys.stdout = original_stdout
+
+    print("\n📊 Section summary")
+    for result in results:
+        status = '✅' if result['ok'] else '❌'
+        print(f"  {status} {result['section']:<24} {result['seconds']:6.1f}s  {result['output'] or result['error']}")
+
+    if rollup and groups:
+        for tenant, members in groups.items():
+            print(f"\n📝 Running HTML Blob Rollup for {tenant}...")
+            with metrics.timer('stages', f"{tenant}.rollup"), profiling.section(f"{tenant}.rollup"):
+                generate_rollup(date_str, force=force, update_readme=False,
+                                folders=[get_section(name)['folder'] for name in members],
+                                output_dir=tenant_folder(tenant))
+    elif rollup:
+        print("\n📝 Running HTML Blob Rollup...")
+        with metrics.timer('stages', 'rollup'), profiling.section('rollup'):
+            generate_rollup(date_str, force=force)
+
+    print(f"\n📈 {metrics.write_report(ROLLUP_DIR, date_str)}", end='')
+    print(f"📄 Metrics written to rollup/{metrics.REPORT_PREFIX}{date_str}.json")
+    print(f"\n⏱️  Total wall time: {time.perf_counter() - start:.1f}s")
+    return results
+
+
+def print_completion(results: List[Dict]) -> None:
+    """Final status lines for the command-line entry point"""
+    if all(result['ok'] for result in results):
+        print("\n✨ Newsletter generation complete!")
+    else:
+        failed = ', '.join(result['section'] for result in results if not result['ok'])
+        print(f"\n⚠️  Newsletter generated with failed sections: {failed}")
+    print("Check the rollup directory for the combined showcase file.")
+    print_push_reminder()
@@ -0,0 +1,179 @@
+"""
+Models read from the state blob a listing or designer page embeds.
+
+Thangs pages are rendered by a JavaScript framework that ships the data it
+rendered from along with the HTML: a <script id="__NEXT_DATA__"
+type="application/json"> document (or another application/json script, or a
+window.__INITIAL_STATE__ = {...} assignment). For a listing, that blob holds
+every listed model with its ID, name, designer and preview image. Reading it
+gives a section its links in rank order and each model's thumbnail URL from
+the one listing response, so the per-model page fetches that only existed
+to find og:image are skipped: a section costs about one page request
+instead of N + 1.
+
+The blob's layout is not a published API, so models are recognised by
+shape rather than by path: a JSON object with a numeric ID, a name (or a
+/3d-model/ URL) and an image URL counts as a model, and the listing is the
+array holding the most of them (a page may also carry shorter "related" or
+"featured" arrays). A page without a blob, or whose blob has no models with
+images, gives None and the caller falls back to the page's links and
+per-model fetches.
+"""
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote
+
+from newsletter.canonical import THANGS_BASE, canonical_url, model_id
+from newsletter.metadata import FIELDS, ModelMetadata
+
+STATE_SCRIPT = re.compile(
+    r'<script\b[^>]*\btype=["\']application/json["\'][^>]*>(.*?)</script>', re.S | re.I)
+STATE_ASSIGNMENT = re.compile(r'window\.__(?:INITIAL|PRELOADED|APOLLO)_STATE__\s*=\s*')
+
+# Keys a model object is recognised by, most specific first
+ID_KEYS = ('modelId', 'thangsId', 'id')
+TITLE_KEYS = ('name', 'title', 'modelName')
+IMAGE_KEYS = ('thumbnailUrl', 'previewUrl', 'imageUrl', 'coverImage', 'thumbnail', 'previewImage', 'image',
+              'images', 'ogImage')
+IMAGE_KEY_SET = frozenset(IMAGE_KEYS)
+URL_KEYS = ('url', 'href', 'modelUrl', 'path')
+DESIGNER_KEYS = ('designer', 'owner', 'creator', 'author', 'user')
+RANK_KEYS = ('rank', 'position')
+LIKES_KEYS = ('likes', 'likesCount', 'likeCount')
+DOWNLOADS_KEYS = ('downloads', 'downloadCount', 'downloadsCount')
+
+
+def iter_blobs(html: str) -> Iterator[object]:
+    """Every JSON state document embedded in a page"""
+    for match in STATE_SCRIPT.finditer(html):
+        try:
+            yield json.loads(match.group(1))
+        except ValueError:
+            continue
+    decoder = json.JSONDecoder()
+    for match in STATE_ASSIGNMENT.finditer(html):
+        try:
+            yield decoder.raw_decode(html, match.end())[0]
+        except ValueError:
+            continue
+
+
+def _first(item: Dict, keys) -> object:
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+
+def _text(value) -> Optional[str]:
+    """A name from a string or a {'name'/'username'/...} object"""
+    if isinstance(value, dict):
+        value = _first(value, ('username', 'name', 'displayName', 'handle'))
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _image_url(value) -> Optional[str]:
+    """An absolute image URL from a string, a {'url'/'src'} object or a list of them"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = _first(value, ('url', 'src', 'thumbnailUrl', 'large', 'medium'))
+    if not isinstance(value, str):
+        return None
+    if value.startswith('//'):
+        return 'https:' + value
+    return value if value.startswith('http') else None
+
+
+def _count(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_model(item: Dict) -> Optional[Dict]:
+    """
+    A model object from a state blob as a listed model, or None if it isn't one
+
+    Returns:
+        Optional[Dict]: 'url', 'thangs_id', 'rank' (None unless the blob
+        gives one) and 'metadata', a metadata.ModelMetadata record
+    """
+    # Most objects in a blob aren't models; turn those away before looking closer
+    if IMAGE_KEY_SET.isdisjoint(item):
+        return None
+    thumbnail_url = _image_url(_first(item, IMAGE_KEYS))
+    if not thumbnail_url:
+        return None
+    title = _text(_first(item, TITLE_KEYS))
+    designer = _text(_first(item, DESIGNER_KEYS))
+
+    url = _first(item, URL_KEYS)
+    url = url if isinstance(url, str) and '/3d-model/' in url else None
+    if url:
+        url = THANGS_BASE + url if url.startswith('/') else url
+        thangs_id = model_id(url)
+    else:
+        thangs_id = _count(_first(item, ID_KEYS))
+        if thangs_id is None or not title:
+            return None
+        slug = quote(f"{title}-{thangs_id}", safe='')
+        url = (f"{THANGS_BASE}/designer/{quote(designer, safe='')}/3d-model/{slug}" if designer
+               else f"{THANGS_BASE}/3d-model/{slug}")
+    if thangs_id is None:
+        return None
+
+    record = ModelMetadata(**{field: None for field in FIELDS})
+    record.update(thumbnail_url=thumbnail_url, title=title, designer=designer,
+                  likes=_count(_first(item, LIKES_KEYS)), downloads=_count(_first(item, DOWNLOADS_KEYS)))
+    rank = _first(item, RANK_KEYS)
+    return {'url': canonical_url(url), 'thangs_id': thangs_id,
+            'rank': rank if isinstance(rank, (int, float)) else None, 'metadata': record}
+
+
+def _iter_arrays(data) -> Iterator[List]:
+    """Every array in a JSON document"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            yield value
+            stack.extend(reversed(value))
+
+
+def listing_models(html: str) -> Optional[List[Dict]]:
+    """
+    The models a page's state blob lists, best ranked first
+
+    Args:
+        html: Listing or designer page HTML
+
+    Returns:
+        Optional[List[Dict]]: Listed models (see parse_model), each model
+        once, with 'rank' set to its place in the list; None if the page
+        has no blob or its blob lists no models with images
+    """
+    best: List[Dict] = []
+    for blob in iter_blobs(html):
+        for array in _iter_arrays(blob):
+            models = [model for model in (parse_model(item) for item in array if isinstance(item, dict)) if model]
+            if len(models) > len(best):
+                best = models
+    if not best:
+        return None
+
+    # A blob's own ranks win over array order; unranked models keep their place
+    order = sorted(range(len(best)), key=lambda i: (best[i]['rank'] if best[i]['rank'] is not None else i, i))
+    listed, seen = [], set()
+    for index in order:
+        model = best[index]
+        if model['thangs_id'] in seen:
+            continue
+        seen.add(model['thangs_id'])
+        listed.append({**model, 'rank': len(listed)})
+    return listed
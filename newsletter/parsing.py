@@ -0,0 +1,155 @@
+"""
+Page extraction in a process pool.
+
+BeautifulSoup with html.parser is pure Python, so once the pipeline fetches
+pages concurrently their parsing still runs one page at a time under the
+GIL, and a run with many sections and models is bound to one core. The
+extractors here take a page's raw bytes (as the response delivered them)
+and return small records: the link dicts of a listing or designer page
+(with the models of its state blob), or a model page's metadata.ModelMetadata. They run in a pool of
+PARSE_PROCESSES worker processes, so only the bytes go out and a few hundred
+bytes come back per page; no soup or decoded text is pickled. The calling
+thread waits without holding the GIL, so the pipeline's other stages keep
+going meanwhile.
+
+The pool is started on first use with the spawn method (the pipeline is
+threaded, and forking a threaded process can copy a held lock). With a
+single CPU, or if the pool breaks, pages are parsed in the calling thread.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+from newsletter import tracing
+
+PARSE_PROCESSES = os.cpu_count() or 1  # 1 parses in the calling thread
+MAP_CHUNKSIZE = 8  # pages per task when a batch of pages is parsed at once
+
+T = TypeVar('T')
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+_pool_broken = False
+
+
+def decode(body: bytes, encoding: Optional[str] = None) -> str:
+    """A response body as text, in its declared encoding (UTF-8 if none)"""
+    return body.decode(encoding or 'utf-8', errors='replace')
+
+
+def parse_links(body: bytes, encoding: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """The '/3d-model/' links of a listing or designer page (see showcase.extract_model_links)"""
+    from newsletter.showcase import extract_model_links
+
+    return extract_model_links(decode(body, encoding), limit)
+
+
+def parse_listing(body: bytes, encoding: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+    """
+    A listing or designer page's models: from its embedded state blob when
+    it has one (see newsletter.pagestate), else from its links
+
+    Returns:
+        Dict: 'links' (dicts with 'url' and 'text', in page order) and
+        'models' (the blob's models, each with its metadata record, or None
+        without a usable blob)
+    """
+    from newsletter.pagestate import listing_models
+    from newsletter.showcase import extract_model_links
+
+    html = decode(body, encoding)
+    models = listing_models(html)
+    if not models:
+        return {'links': extract_model_links(html, limit), 'models': None}
+    models = models[:limit] if limit else models
+    return {'links': [{'url': model['url'], 'text': model['metadata']['title'] or ''} for model in models],
+            'models': models}
+
+
+def parse_model(body: bytes, encoding: Optional[str] = None, url: Optional[str] = None) -> Dict:
+    """A model page's metadata.ModelMetadata record"""
+    from newsletter.metadata import parse_model_page
+
+    return parse_model_page(decode(body, encoding), url)
+
+
+def get_pool(processes: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """
+    The shared parse pool, started on first use, or None when parsing inline
+
+    Args:
+        processes: Pool size (default PARSE_PROCESSES); asking for another
+            size replaces the pool
+    """
+    global _pool, _pool_size
+    processes = PARSE_PROCESSES if processes is None else processes
+    if processes <= 1 or _pool_broken:
+        return None
+    with _pool_lock:
+        if _pool is not None and _pool_size != processes:
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+            _pool_size = processes
+        return _pool
+
+
+def shutdown() -> None:
+    """Stop the parse pool's processes (a later parse starts a new pool)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def run(func: Callable[..., T], *args) -> T:
+    """Call one of the extractors above in the pool, or inline without one"""
+    global _pool_broken
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    try:
+        with tracing.span('parse_in_pool', extractor=func.__name__):
+            return pool.submit(func, *args).result()
+    except BrokenProcessPool as e:
+        print(f"⚠️  Parse pool stopped ({e}); parsing in this process from now on")
+        _pool_broken = True
+        shutdown()
+        return func(*args)
+
+
+def extract_listing(body: bytes, encoding: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+    """The links, and state blob models, of a fetched listing or designer page, parsed in the pool"""
+    return run(parse_listing, body, encoding, limit)
+
+
+def extract_metadata(body: bytes, encoding: Optional[str] = None, url: Optional[str] = None) -> Dict:
+    """The metadata record of a fetched model page, parsed in the pool"""
+    return run(parse_model, body, encoding, url)
+
+
+def map_links(bodies: Iterable[bytes], limit: Optional[int] = None,
+              processes: Optional[int] = None) -> List[List[Dict[str, str]]]:
+    """
+    The model links of many saved pages at once, spread over the pool
+
+    Args:
+        bodies: Raw pages (UTF-8)
+        limit: Stop each page after this many model links
+        processes: Pool size (default PARSE_PROCESSES; 1 parses inline)
+
+    Returns:
+        List: Each page's links, in order
+    """
+    bodies = list(bodies)
+    pool = get_pool(processes)
+    if pool is None:
+        return [parse_links(body, None, limit) for body in bodies]
+    return list(pool.map(parse_links, bodies, [None] * len(bodies), [limit] * len(bodies),
+                         chunksize=MAP_CHUNKSIZE))
@@ -0,0 +1,121 @@
+"""
+A small streaming pipeline of thread-pool stages joined by bounded queues.
+
+Items flow from a source iterable through each stage as soon as they are
+produced, so downstream work starts with the first item instead of after
+the whole list. Bounded queues apply backpressure: a fast stage blocks once
+the next one falls behind, keeping memory flat. Each stage has its own
+worker count, so the end-to-end time is roughly that of the slowest stage.
+"""
+import contextvars
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+from newsletter import metrics, profiling, tracing
+
+QUEUE_SIZE = 8  # items buffered between two stages
+
+_DONE = object()
+
+
+class Stage(NamedTuple):
+    """One pipeline stage: func maps an item to its next form, or None to drop it"""
+    name: str
+    func: Callable[[Any], Optional[Any]]
+    workers: int = 1
+
+
+def _profiled(target, *args):
+    """Run target, profiled under the caller's section when profiling is on"""
+    with profiling.thread():
+        target(*args)
+
+
+def run_pipeline(source: Iterable, stages: List[Stage], queue_size: int = QUEUE_SIZE) -> List:
+    """
+    Stream items from source through every stage
+
+    Args:
+        source: Iterable producing the input items (consumed on its own thread)
+        stages: Stages to run, in order
+        queue_size: Maximum items waiting between two stages
+
+    Returns:
+        List: Items that made it through the last stage, in completion order
+
+    Raises:
+        Exception: Whatever the source raised, once the pipeline has drained
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    remaining = [stage.workers for stage in stages]
+    remaining_lock = threading.Lock()
+    source_errors = []
+
+    def feed():
+        try:
+            for item in source:
+                queues[0].put(item)
+        except BaseException as e:
+            source_errors.append(e)
+        finally:
+            for _ in range(stages[0].workers):
+                queues[0].put(_DONE)
+
+    def work(index: int, stage: Stage):
+        inbox, outbox = queues[index], queues[index + 1]
+        busy = 0.0
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            try:
+                with tracing.span(stage.name, 'pipeline'):
+                    result = stage.func(item)
+            except Exception as e:
+                print(f"❌ {stage.name} failed: {e}")
+                metrics.incr('failures', f"pipeline.{stage.name}")
+                result = None
+            busy += time.perf_counter() - start
+            if result is not None:
+                outbox.put(result)
+
+        # Time spent working rather than waiting on the queues, summed over workers
+        metrics.add_time('pipeline_stages', stage.name, busy)
+
+        # The last worker of a stage tells every worker downstream to stop
+        with remaining_lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last:
+            downstream = stages[index + 1].workers if index + 1 < len(stages) else 1
+            for _ in range(downstream):
+                outbox.put(_DONE)
+
+    # Workers run in a copy of the caller's context so context variables
+    # (like the orchestrator's section name) carry over to them
+    def spawn(target, name, *args):
+        return threading.Thread(target=contextvars.copy_context().run, args=(_profiled, target, *args),
+                                name=name, daemon=True)
+
+    threads = [spawn(feed, 'pipeline-source')]
+    for index, stage in enumerate(stages):
+        for n in range(stage.workers):
+            threads.append(spawn(work, f"pipeline-{stage.name}-{n}", index, stage))
+    for thread in threads:
+        thread.start()
+
+    results = []
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        results.append(item)
+
+    for thread in threads:
+        thread.join()
+    if source_errors:
+        raise source_errors[0]
+    return results
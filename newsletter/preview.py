@@ -0,0 +1,250 @@
+"""
+Local preview server for the newsletter sections and the combined rollup.
+
+Everything is rendered from data already on disk: each section's image
+manifest (from the catalog, or a CSV from before it) is read once and kept
+in memory with its rendered HTML, and
+thumbnails are served from the section img folders instead of GitHub, so
+the preview never touches the network. A watcher thread polls the
+template/config modules and the manifests; a changed manifest re-renders
+only its section, a changed module is reloaded and re-renders them all.
+Open pages reload themselves when anything they show changes.
+"""
+import importlib
+import mimetypes
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from newsletter import REPO_ROOT, catalog, rollup, sections, showcase
+
+DEFAULT_PORT = 8000
+POLL_INTERVAL = 0.25  # seconds between checks for changed files
+
+# Reloaded in this order when they change, so showcase and rollup pick up
+# the reloaded section definitions
+WATCHED_MODULES = [sections, showcase, rollup]
+
+# Polls /version and reloads the page when the preview re-rendered
+RELOAD_SCRIPT = """
+<script>
+(function () {
+    var version = null;
+    setInterval(function () {
+        fetch('/version').then(function (r) { return r.text(); }).then(function (v) {
+            if (version !== null && v !== version) { location.reload(); }
+            version = v;
+        }).catch(function () {});
+    }, 500);
+})();
+</script>
+"""
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class PreviewState:
+    """Section data and rendered HTML held in memory, refreshed when files change"""
+
+    def __init__(self, section_names: List[str], date_str: str):
+        self.section_names = section_names
+        self.date_str = date_str
+        self.version = 0
+        self._lock = threading.Lock()
+        self._modules = {module.__file__: _signature(module.__file__) for module in WATCHED_MODULES}
+        self._sections: Dict[str, Dict] = {}
+        self._files: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+        self.refresh()
+
+    def _render_section(self, name: str, force: bool) -> bool:
+        """Re-render one section if its manifest (or the code, with force) changed"""
+        section = sections.get_section(name)
+        # Cheap indexed lookups; the manifest itself is only read when they change
+        run = catalog.get_run(name, self.date_str) or catalog.get_run(name)
+        csv_path = showcase.find_image_manifest(section, self.date_str)
+        signature = (run and (run['id'], run['finished_at']), csv_path, csv_path and _signature(csv_path))
+        entry = self._sections.get(name)
+        if entry and not force and entry['signature'] == signature:
+            return False
+
+        # Without a run for the date this is an older one, whose images are in its own img folder
+        manifest_date, image_data = showcase.resolve_manifest(section, self.date_str) or (self.date_str, [])
+        body = showcase.render_section_body(section, image_data, manifest_date)
+        # Point thumbnails at this server instead of GitHub
+        body = body.replace(f"{sections.GITHUB_RAW_BASE}/", '/files/')
+        self._sections[name] = {
+            'signature': signature,
+            'file_name': showcase.blob_name(section, self.date_str),
+            'body': body,
+            'models': len(image_data),
+        }
+        return True
+
+    def refresh(self) -> List[str]:
+        """
+        Reload changed modules and re-render the sections whose inputs changed
+
+        Returns:
+            List[str]: Names of the re-rendered sections
+        """
+        start = time.perf_counter()
+        with self._lock:
+            changed_modules = [
+                module for module in WATCHED_MODULES
+                if _signature(module.__file__) != self._modules[module.__file__]
+            ]
+            if changed_modules:
+                try:
+                    for module in WATCHED_MODULES:
+                        importlib.reload(module)
+                except Exception as e:
+                    print(f"❌ Couldn't reload {', '.join(m.__name__ for m in changed_modules)}: {e!r}")
+                    return []
+                finally:
+                    self._modules = {module.__file__: _signature(module.__file__) for module in WATCHED_MODULES}
+
+            rendered = [
+                name for name in self.section_names
+                if self._render_section(name, force=bool(changed_modules))
+            ]
+            if rendered:
+                self.version += 1
+
+        if rendered and self.version > 1:
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"🎨 Re-rendered {', '.join(rendered)} in {elapsed:.1f} ms")
+        return rendered
+
+    def section_page(self, name: str) -> Optional[str]:
+        with self._lock:
+            entry = self._sections.get(name)
+        if not entry:
+            return None
+        return f"<!DOCTYPE html>\n<html>\n<head>\n</head>\n<body>\n{entry['body']}{RELOAD_SCRIPT}</body>\n</html>\n"
+
+    def rollup_page(self) -> str:
+        with self._lock:
+            blobs = [
+                (entry['file_name'], f"/section/{name}", entry['body'])
+                for name, entry in self._sections.items() if entry['models']
+            ]
+        return rollup.render_rollup_blobs(blobs, self.date_str).replace('</body>', f"{RELOAD_SCRIPT}</body>")
+
+    def index_page(self) -> str:
+        with self._lock:
+            rows = ''.join(
+                f'<li><a href="/section/{name}">{name}</a> ({entry["models"]} models)</li>'
+                for name, entry in self._sections.items()
+            )
+        return (f"<!DOCTYPE html>\n<html>\n<head><title>Newsletter preview {self.date_str}</title></head>\n"
+                f"<body>\n<h1>Newsletter preview {self.date_str}</h1>\n"
+                f'<p><a href="/rollup">Combined showcase</a></p>\n<ul>{rows}</ul>\n</body>\n</html>\n')
+
+    def read_file(self, rel_path: str) -> Optional[bytes]:
+        """Read a file under the repo, keeping it in memory until it changes"""
+        # Both sides resolved, so a checkout under a symlinked path (/tmp on macOS) still matches
+        root = os.path.realpath(REPO_ROOT)
+        path = os.path.realpath(os.path.join(root, rel_path))
+        if not path.startswith(root + os.sep):
+            return None
+        signature = _signature(path)
+        if signature is None:
+            return None
+        with self._lock:
+            cached = self._files.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self._lock:
+            self._files[path] = (signature, data)
+        return data
+
+
+def make_handler(state: PreviewState):
+    """Request handler class bound to a preview state"""
+
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/':
+                self._send(state.index_page())
+            elif path == '/rollup':
+                self._send(state.rollup_page())
+            elif path.startswith('/section/'):
+                page = state.section_page(unquote(path[len('/section/'):]))
+                if page is None:
+                    self.send_error(404)
+                else:
+                    self._send(page)
+            elif path == '/version':
+                self._send(str(state.version), 'text/plain')
+            elif path.startswith('/files/'):
+                # Image URLs are encoded like GitHub raw URLs, which decode once
+                rel_path = unquote(path[len('/files/'):])
+                data = state.read_file(rel_path)
+                if data is None:
+                    data = state.read_file(unquote(rel_path))
+                if data is None:
+                    self.send_error(404)
+                else:
+                    self._send(data, mimetypes.guess_type(rel_path)[0] or 'application/octet-stream')
+            else:
+                self.send_error(404)
+
+        def _send(self, body, content_type='text/html; charset=utf-8'):
+            data = body.encode('utf-8') if isinstance(body, str) else body
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PreviewHandler
+
+
+def watch(state: PreviewState, stop: threading.Event) -> None:
+    """Poll for changed files until stop is set"""
+    while not stop.wait(POLL_INTERVAL):
+        try:
+            state.refresh()
+        except Exception as e:
+            print(f"❌ Re-render failed: {e!r}")
+
+
+def serve(section_names: List[str], date_str: str, port: int = DEFAULT_PORT) -> None:
+    """
+    Serve the preview until interrupted
+
+    Args:
+        section_names: Sections to preview, in rollup order
+        date_str: Run date whose manifests to render (falls back to each
+            section's latest manifest, like the generators)
+        port: Local port to listen on
+    """
+    state = PreviewState(section_names, date_str)
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(state, stop), name='preview-watch', daemon=True).start()
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    print(f"👀 Previewing {date_str} at http://127.0.0.1:{port}/ (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Preview stopped")
+    finally:
+        stop.set()
+        server.server_close()
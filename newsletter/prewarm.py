@@ -0,0 +1,152 @@
+"""
+Pre-warm the on-disk caches during the week.
+
+Polls the listing and designer pages every section crawls, resolves the
+thumbnail of each model it hasn't seen, downloads the image into the
+shared store and scales it the way the newsletter shows it, all at a low
+request rate. On newsletter day the generators then only fetch the listing
+pages themselves; model pages, images and transcoded copies are cache hits.
+"""
+import os
+import time
+from typing import Dict, Iterator, List
+
+from newsletter import cache, canonical, catalog
+from newsletter.sections import get_section
+from newsletter.showcase import (
+    NOVELTY_CANDIDATES,
+    THUMBNAIL_MAX_SIZE,
+    SectionError,
+    cached_thumbnail,
+    fetch_listing_links,
+    make_request,
+    page_links,
+    process_model_page,
+    read_source_urls,
+    reset_caches,
+    today_str,
+    transcoded_image,
+)
+
+DEFAULT_INTERVAL = 6 * 3600  # seconds between polls
+DEFAULT_RATE = 6  # requests per minute
+
+
+class RateLimiter:
+    """Spaces calls to wait() at least 60 / per_minute seconds apart"""
+
+    def __init__(self, per_minute: float):
+        self.delay = 60.0 / per_minute
+        self._next = 0.0
+
+    def wait(self) -> None:
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.delay
+
+
+def iter_section_links(section: Dict, limiter: RateLimiter) -> Iterator[Dict[str, str]]:
+    """Yield the model links a section would crawl, fetching its pages at the limiter's pace"""
+    if section['source'] == 'listing':
+        limiter.wait()
+        links = fetch_listing_links(section)
+        # Mid-week polls double as extra leaderboard snapshots for the trends
+        catalog.record_snapshot(section['listing_url'], today_str(), [link['url'] for link in links])
+        yield from links
+        return
+
+    for source_url in read_source_urls(section):
+        limiter.wait()
+        response = make_request(source_url)
+        if response:
+            # As many candidates as iter_designer_pages offers the section, not just the ones it usually picks
+            yield from page_links(response.content, response.encoding,
+                                  limit=section['models_per_source'] * NOVELTY_CANDIDATES)
+
+
+def prewarm_section(name: str, limiter: RateLimiter) -> Dict[str, int]:
+    """
+    Resolve, download and transcode every model a section links to that isn't cached yet
+
+    Args:
+        name: Section folder name (see newsletter.sections.SECTIONS)
+        limiter: Shared request pacing
+
+    Returns:
+        Dict[str, int]: Counts of 'models' seen, 'resolved', 'downloaded' and 'transcoded'
+    """
+    section = get_section(name)
+    counts = {'models': 0, 'resolved': 0, 'downloaded': 0, 'transcoded': 0}
+
+    for link in canonical.unique_links(iter_section_links(section, limiter)):
+        url = link['url']
+        counts['models'] += 1
+
+        thumbnail_url = cached_thumbnail(url)
+        if not thumbnail_url:
+            limiter.wait()
+            thumbnail_url = process_model_page(url)
+            if not thumbnail_url:
+                continue
+            counts['resolved'] += 1
+
+        if os.path.exists(cache.transcoded_path(thumbnail_url, THUMBNAIL_MAX_SIZE)):
+            continue
+        # Only a download is a request; transcoding a stored image needs no pacing
+        download = not cache.has_image(thumbnail_url)
+        if download:
+            limiter.wait()
+        if transcoded_image(thumbnail_url):
+            counts['downloaded'] += download
+            counts['transcoded'] += 1
+
+    return counts
+
+
+def prewarm_once(section_names: List[str], limiter: RateLimiter) -> None:
+    """Run one pre-warm pass over the given sections"""
+    start = time.perf_counter()
+    # The daemon runs for weeks: records held since the last pass may have outlived the
+    # disk cache's TTL, and pages that had no thumbnail then deserve another look
+    reset_caches()
+    for name in section_names:
+        print(f"🔍 Pre-warming {name}...")
+        try:
+            counts = prewarm_section(name, limiter)
+        except SectionError as e:
+            print(f"❌ {e}")
+            continue
+        print(f"✅ {name}: {counts['models']} models, {counts['resolved']} newly resolved, "
+              f"{counts['downloaded']} images downloaded, {counts['transcoded']} transcoded")
+
+    cache.compact_thumbnails()
+    pruned = cache.prune_images()
+    if pruned:
+        print(f"🧹 Pruned {pruned} unused images from the store")
+    print(f"⏱️  Pass finished in {time.perf_counter() - start:.1f}s")
+
+
+def run_prewarm(section_names: List[str], interval: float = DEFAULT_INTERVAL,
+                rate: float = DEFAULT_RATE, once: bool = False) -> None:
+    """
+    Pre-warm the caches now and then every interval seconds until interrupted
+
+    Args:
+        section_names: Sections whose pages to poll
+        interval: Seconds between the start of two passes
+        rate: Maximum requests per minute
+        once: Run a single pass and return
+    """
+    limiter = RateLimiter(rate)
+    try:
+        while True:
+            started = time.monotonic()
+            prewarm_once(section_names, limiter)
+            if once:
+                return
+            pause = max(0.0, interval - (time.monotonic() - started))
+            print(f"💤 Next pass in {pause / 60:.0f} minutes")
+            time.sleep(pause)
+    except KeyboardInterrupt:
+        print("\n👋 Pre-warm stopped")
@@ -0,0 +1,213 @@
+"""
+Opt-in profiling of a run, attributed per section.
+
+cProfile only sees the thread it was enabled on, so every thread doing a
+section's work (the section's own worker and its pipeline threads, which
+inherit the section through a context variable) gets its own profiler, and
+the profilers are merged per section at the end. Alongside, a sampler thread
+snapshots every registered thread's stack a few hundred times a second; the
+samples become collapsed stacks ("frame;frame;frame count" lines) that
+flamegraph.pl, speedscope or inferno read directly, and since they sample
+wall time they also show where threads sat waiting on the network.
+
+From Python 3.12, cProfile runs on sys.monitoring and only one profiler can
+be enabled at a time, so threads that start while another is profiled are
+covered by the sampler alone (their section still gets its collapsed
+stacks; its .prof only holds the threads cProfile could take).
+"""
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from newsletter import REPO_ROOT
+
+PROFILES_DIR = os.path.join(REPO_ROOT, 'profiles')
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+TOP_FUNCTIONS = 15  # rows in the end-of-run summary
+
+# What the current thread's work is attributed to (a section name, 'rollup', ...)
+_current = contextvars.ContextVar('profile_key', default=None)
+
+_enabled = False
+_lock = threading.Lock()
+_profiles: Dict[str, List[cProfile.Profile]] = {}
+_threads: Dict[int, str] = {}
+_samples: Dict[str, Counter] = {}
+_sampled_only = 0  # threads cProfile couldn't take because another profiler was enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def thread() -> Iterator[None]:
+    """Profile the current thread into the current key, if profiling is on and a key is set"""
+    key = _current.get()
+    if not _enabled or key is None:
+        yield
+        return
+
+    global _sampled_only
+    profile: Optional[cProfile.Profile] = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+: another thread's profiler is already enabled
+        profile = None
+    ident = threading.get_ident()
+    with _lock:
+        if profile is None:
+            _sampled_only += 1
+        else:
+            _profiles.setdefault(key, []).append(profile)
+        previous = _threads.get(ident)
+        _threads[ident] = key
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.disable()
+        with _lock:
+            if previous is None:
+                _threads.pop(ident, None)
+            else:
+                _threads[ident] = previous
+
+
+@contextmanager
+def section(key: str) -> Iterator[None]:
+    """Attribute the enclosed work, and threads started from it, to key"""
+    if not _enabled:
+        yield
+        return
+    token = _current.set(key)
+    try:
+        with thread():
+            yield
+    finally:
+        _current.reset(token)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(REPO_ROOT):
+        filename = os.path.relpath(filename, REPO_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _sample(stop: threading.Event) -> None:
+    """Record the stack of every profiled thread until stop is set"""
+    own = threading.get_ident()
+    while not stop.wait(SAMPLE_INTERVAL):
+        with _lock:
+            threads = dict(_threads)
+        frames = sys._current_frames()
+        for ident, key in threads.items():
+            frame = frames.get(ident)
+            if frame is None or ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            with _lock:
+                _samples.setdefault(key, Counter())[';'.join(stack)] += 1
+
+
+def _merged_stats(profiles: List[cProfile.Profile]) -> pstats.Stats:
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+    return stats
+
+
+def write_profiles(folder: str, top: int = TOP_FUNCTIONS) -> str:
+    """
+    Write <key>.prof and <key>.collapsed for every profiled key
+
+    Args:
+        folder: Output directory (created if missing)
+        top: Functions in the returned summary
+
+    Returns:
+        str: Top functions by own time across all keys, as pstats prints them
+    """
+    os.makedirs(folder, exist_ok=True)
+    with _lock:
+        profiles = {key: list(items) for key, items in _profiles.items()}
+        samples = {key: Counter(counter) for key, counter in _samples.items()}
+
+    # Tenants' sections are keyed tenants/<name>/<section>
+    for key, items in profiles.items():
+        _merged_stats(items).dump_stats(os.path.join(folder, f"{key.replace('/', '.')}.prof"))
+    for key, counter in samples.items():
+        with open(os.path.join(folder, f"{key.replace('/', '.')}.collapsed"), 'w', encoding='utf-8') as f:
+            for stack, count in counter.most_common():
+                f.write(f"{stack} {count}\n")
+
+    everything = [profile for items in profiles.values() for profile in items]
+    if not everything:
+        return ''
+    summary = io.StringIO()
+    stats = _merged_stats(everything)
+    stats.stream = summary
+    stats.strip_dirs().sort_stats('tottime').print_stats(top)
+    return summary.getvalue()
+
+
+@contextmanager
+def profiling_to(folder: Optional[str]) -> Iterator[None]:
+    """
+    Profile the enclosed run into folder, or do nothing when folder is None
+
+    Work is only recorded inside section() blocks.
+    """
+    global _enabled, _sampled_only
+    if not folder:
+        yield
+        return
+
+    with _lock:
+        _profiles.clear()
+        _threads.clear()
+        _samples.clear()
+        _sampled_only = 0
+    _enabled = True
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample, args=(stop,), name='profile-sampler', daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _enabled = False
+        stop.set()
+        sampler.join()
+        summary = write_profiles(folder)
+        print(f"\n🔬 Hottest functions by own time ({time.perf_counter() - start:.1f}s profiled):")
+        print(summary.rstrip())
+        if _sampled_only:
+            print(f"⚠️  {_sampled_only} threads ran while another was under cProfile (one at a time on "
+                  f"Python {sys.version_info.major}.{sys.version_info.minor}); only their samples were kept")
+        print(f"📄 Profiles written to {os.path.relpath(folder)}: <section>.prof for pstats or snakeviz, "
+              f"<section>.collapsed for flamegraph tools")
+
+
+def profile_dir(option: Optional[str], date_str: str) -> Optional[str]:
+    """Folder for a --profile option: the given path, or profiles/YYYYMMDD when given bare"""
+    if option is None:
+        return None
+    return option or os.path.join(PROFILES_DIR, date_str)
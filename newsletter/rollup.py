@@ -0,0 +1,278 @@
+"""
+Combine every section's HTML blob for a date into rollup/combined_showcase_YYYYMMDD.html.
+
+Tenants (see newsletter.tenants) get their own rollup from their own
+sections' blobs, in tenants/<name>/; the main rollup leaves those out.
+"""
+import glob
+import os
+import re
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+from newsletter import REPO_ROOT, buildcache, tracing
+from newsletter.tenants import TENANTS_DIR
+
+ROLLUP_DIR = os.path.join(REPO_ROOT, 'rollup')
+
+
+def find_html_blobs(date_str=None, folders: Optional[Sequence[str]] = None):
+    """
+    Find all html_blob_*.html files in the parent and sibling directories,
+    or only in folders (kept in their order) when given
+    """
+    # List to store all found HTML blob files
+    html_files = []
+
+    if folders is not None:
+        for folder in folders:
+            html_files.extend(sorted(glob.glob(os.path.join(folder, "html_blob_*.html"))))
+    else:
+        # Search patterns to look for
+        search_dirs = [
+            os.path.join(REPO_ROOT, "**", "html_blob_*.html"),  # Search in all subdirectories
+            os.path.join(REPO_ROOT, "html_blob_*.html")         # Search in parent directory
+        ]
+
+        # Find all matching files, except the tenants' own
+        for pattern in search_dirs:
+            html_files.extend(path for path in glob.glob(pattern, recursive=True)
+                              if not path.startswith(TENANTS_DIR + os.sep))
+
+    # Extract dates from filenames and group files by date
+    date_grouped_files = {}
+    for file_path in html_files:
+        filename = os.path.basename(file_path)
+        # Extract date from filename (assuming format html_blob_*_YYYYMMDD.html)
+        try:
+            file_date = filename.split('_')[-1].replace('.html', '')
+            if len(file_date) == 8 and file_date.isdigit():  # Ensure it's a valid YYYYMMDD format
+                # If date_str is provided, only include files matching that date
+                if date_str and file_date != date_str:
+                    continue
+                date_grouped_files.setdefault(file_date, []).append(file_path)
+        except IndexError:
+            continue
+
+    # Find the date with the most files
+    if not date_grouped_files:
+        return []
+
+    most_common_date = max(date_grouped_files.items(), key=lambda x: len(x[1]))[0]
+    print(f"📅 Using files from date: {most_common_date}")
+
+    files = date_grouped_files[most_common_date]
+    return files if folders is not None else sorted(files)
+
+def extract_body_content(html_file):
+    """Extract the body content from an HTML file"""
+    from bs4 import BeautifulSoup
+
+    with open(html_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Get the body content
+    body = soup.body
+    if body:
+        return body.decode_contents()
+    return ""
+
+def get_github_source_url(file_path):
+    """Convert local file path to GitHub source URL"""
+    # Using the repository URL from the README demo links
+    base_url = "https://github.com/danphamx/MarketingAutomation/blob/main"
+
+    # Get the actual directory name from the file path
+    dir_name = os.path.dirname(file_path)
+    if dir_name:
+        # Relative to the repository, so tenants' section folders keep their tenants/<name>/ prefix
+        dir_name = os.path.relpath(dir_name, REPO_ROOT).replace(os.sep, '/')
+        # First decode the filename in case it's already URL-encoded
+        filename = os.path.basename(file_path)
+        try:
+            filename = unquote(filename)
+            # Double encode the filename - this is what GitHub expects
+            encoded_filename = quote(quote(filename, safe=''), safe='')
+        except:
+            # Fallback to simple encoding if there's an error
+            encoded_filename = quote(filename, safe='')
+        return f"{base_url}/{dir_name}/{encoded_filename}"
+    else:
+        # If no directory (file is in root), just append filename
+        filename = os.path.basename(file_path)
+        try:
+            filename = unquote(filename)
+            encoded_filename = quote(quote(filename, safe=''), safe='')
+        except:
+            encoded_filename = quote(filename, safe='')
+        return f"{base_url}/{encoded_filename}"
+
+def render_rollup(html_files: List[str], file_date: str) -> str:
+    """Build the combined HTML for a set of blob files"""
+    blobs = []
+    for html_file in html_files:
+        print(f"Processing: {os.path.basename(html_file)}")
+        with tracing.span('read_blob', file=os.path.basename(html_file)):
+            blobs.append((os.path.basename(html_file), get_github_source_url(html_file), extract_body_content(html_file)))
+    return render_rollup_blobs(blobs, file_date)
+
+@tracing.traced('render_rollup')
+def render_rollup_blobs(blobs: List[Tuple[str, str, str]], file_date: str) -> str:
+    """
+    Build the combined HTML from blobs that were already read
+
+    Args:
+        blobs: (file name, source URL, body HTML) for each section, in order
+        file_date: Date shown under the heading
+
+    Returns:
+        str: The combined showcase document
+    """
+    combined_html = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Combined Thangs Newsletter Showcase</title>
+    <style>
+        .showcase-section {
+            margin: 20px 0;
+            padding: 20px;
+            border-bottom: 2px solid #eee;
+        }
+        .section-title {
+            background: #f5f5f5;
+            padding: 10px;
+            margin-bottom: 20px;
+            border-radius: 5px;
+        }
+        .source-link {
+            color: #0366d6;
+            text-decoration: none;
+        }
+        .source-link:hover {
+            text-decoration: underline;
+        }
+    </style>
+</head>
+<body>
+    <h1 style="text-align: center;">Combined Thangs Showcase</h1>
+    <p style="text-align: center;">Date: """ + file_date + """</p>
+"""
+
+    # Add each file's content
+    for file_name, github_url, body in blobs:
+        combined_html += f"""
+    <div class="showcase-section">
+        <div class="section-title">Source: <a href="{github_url}" class="source-link" target="_blank">{file_name}</a></div>
+        {body}
+    </div>
+"""
+
+    # Close the HTML
+    combined_html += """
+</body>
+</html>
+"""
+    return combined_html
+
+def rollup_fingerprint(html_files):
+    """Fingerprint the rollup inputs: every blob's location and contents plus this module"""
+    blobs = [
+        [os.path.relpath(path, REPO_ROOT), buildcache.file_digest(path)]
+        for path in html_files
+    ]
+    return buildcache.fingerprint('rollup', buildcache.code_version(os.path.abspath(__file__)), blobs)
+
+@tracing.traced('rollup')
+def generate_rollup(date_str: Optional[str] = None, force: bool = False,
+                    update_readme: bool = True, folders: Optional[Sequence[str]] = None,
+                    output_dir: str = ROLLUP_DIR) -> Optional[str]:
+    """
+    Generate a combined HTML file from all html blobs for a date
+
+    Args:
+        date_str: Date of the blobs to combine as YYYYMMDD (defaults to today)
+        force: Rebuild even if no blob changed since the last rollup
+        update_readme: Point the README's newsletter link at the new rollup
+        folders: Only combine the blobs in these section folders, in this
+            order (a tenant's sections)
+        output_dir: Where the combined showcase and its build state go
+
+    Returns:
+        Optional[str]: Path of the combined showcase, or None if there were no blobs
+    """
+    date_str = date_str or datetime.now().strftime('%Y%m%d')
+    html_files = find_html_blobs(date_str, folders)
+
+    if not html_files:
+        print("❌ No HTML blob files found!")
+        return None
+
+    print(f"📝 Found {len(html_files)} HTML blob files")
+
+    # Create the output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, f"combined_showcase_{date_str}.html")
+
+    # Skip the rollup when none of the blobs changed since the last run
+    state = buildcache.load_state(output_dir)
+    fingerprint = rollup_fingerprint(html_files)
+    if not force and buildcache.is_fresh(state, 'rollup', fingerprint, output_dir):
+        print(f"⏭️  No section changed, keeping {os.path.basename(output_file)}")
+        return output_file
+
+    combined_html = render_rollup(html_files, date_str)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(combined_html)
+
+    print(f"\n✅ Generated combined showcase: {os.path.basename(output_file)}")
+
+    buildcache.record_stage(state, 'rollup', fingerprint, [os.path.basename(output_file)], output_dir)
+    buildcache.save_state(output_dir, state)
+
+    # Update README.md with the latest link
+    if update_readme:
+        update_readme_with_latest_link(date_str)
+
+    return output_file
+
+def update_readme_with_latest_link(date_str):
+    """Update the README.md with the latest newsletter link"""
+    readme_path = os.path.join(REPO_ROOT, "README.md")
+
+    # Read the current README content
+    with open(readme_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    # Create the new link line
+    new_link = f"- HTML Preview: https://danphamx.github.io/MarketingAutomation/rollup/combined_showcase_{date_str}.html"
+
+    # Check if the Links to Newsletters section exists
+    if "## Links to Newsletters" in content:
+        # If section exists, update the first link
+        content = re.sub(
+            r'(## Links to Newsletters\n)(.*?)(?=\n\n|\Z)',
+            f'\\1{new_link}',
+            content,
+            flags=re.DOTALL
+        )
+    else:
+        # If section doesn't exist, add it at the end
+        content += f"\n\n## Links to Newsletters\n{new_link}\n"
+
+    # Write the updated content back to README.md
+    with open(readme_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    print(f"✅ Updated README.md with latest newsletter link")
+
+def print_push_reminder():
+    """Remind the operator to push, since the images are served from GitHub"""
+    print("\n⚠️  IMPORTANT: Remember to push your changes to GitHub!")
+    print("This ensures all images will be accessible in the newsletter.")
+    print("\nRun these commands:")
+    print("  git add .")
+    print("  git commit -m 'Update newsletter content and images'")
+    print("  git push origin main")
@@ -0,0 +1,132 @@
+"""
+Section definitions for every showcase in the newsletter.
+
+Each section is a plain dict describing where its models come from, which
+files it writes inside its folder and the copy used in its HTML blob.
+"""
+import os
+from typing import Dict, List
+
+from newsletter import REPO_ROOT
+
+GITHUB_RAW_BASE = "https://raw.githubusercontent.com/danphamx/MarketingAutomation/refs/heads/main"
+
+SECTIONS: Dict[str, Dict] = {
+    'premium-designs': {
+        'label': 'Premium Designers',
+        # 'designers' sections read designer pages from links.txt and keep the
+        # first few models of each; 'listing' sections scrape a single page.
+        # A listing section may also set 'selection': 'risers' to feature the
+        # models climbing its leaderboard fastest instead of its current top.
+        # Any section may set 'novelty': {'mode': ..., 'newsletters': K} to
+        # override how recently featured models are treated (see
+        # newsletter.featured.DEFAULT_NOVELTY). With --allocate, 'quota'
+        # caps how many models the allocator gives a section (by default
+        # what it would show on its own; see newsletter.allocation).
+        # 'links_file' points a designers section at another list of
+        # designer pages, and 'headline'/'tagline' replace the header copy
+        # (newsletter.tenants sets these for each tenant's copy of a section).
+        'source': 'designers',
+        'models_per_source': 3,
+        'model_links_file': 'model_links.txt',
+        'links_csv_prefix': 'thangs_premium_designer_links_',
+        'image_csv_prefix': 'image_links_premium_designer_',
+        'blob_prefix': 'html_blob_premium_designers_',
+        'title': 'Premium Designs',
+        'header_url': 'https://thangs.com/marketplace/memberships/trending',
+        'header_text': 'Trending Premium Designers',
+        'footer_url': 'https://thangs.com/marketplace/memberships/trending',
+        'footer_text': 'View All Premium Models',
+    },
+    'maker-showcase': {
+        'label': 'Maker League',
+        'source': 'listing',
+        'listing_url': 'https://thangs.com/leaderboard/makes?inTheRunning=popular&range=period',
+        'model_links_file': 'links.txt',
+        'links_csv_prefix': 'thangs_makerleague_links_',
+        'image_csv_prefix': 'image_links_makerleague_',
+        'blob_prefix': 'html_blob_maker_league_',
+        'title': 'Maker League',
+        'header_url': 'https://thangs.com/leaderboard/makes?inTheRunning=popular&range=period',
+        'header_text': 'Support Your Favorite Makers on Thangs',
+        'footer_url': 'https://thangs.com/leaderboard/period?league=All',
+        'footer_text': 'View All Maker League Models',
+    },
+    'free-models': {
+        'label': 'Designer Showcase',
+        'source': 'listing',
+        'listing_url': 'https://thangs.com/leaderboard/period?league=All',
+        'model_links_file': 'links.txt',
+        'links_csv_prefix': 'thangs_links_',
+        'image_csv_prefix': 'image_links_',
+        'blob_prefix': 'html_blob_designer_showcase_',
+        'title': 'Designer Showcase',
+        'header_url': 'https://thangs.com/leaderboard/period?league=All',
+        'header_text': "Explore This Week's Exclusive Releases",
+        'footer_url': 'https://thangs.com/leaderboard/period?league=All',
+        'footer_text': 'View All Top Models',
+    },
+    'print-on-demand': {
+        'label': 'POD Designer',
+        'source': 'listing',
+        'listing_url': 'https://thangs.com/?sort=prints&range=prints&costType=all',
+        'model_links_file': 'links.txt',
+        'links_csv_prefix': 'thangs_pod_links_',
+        'image_csv_prefix': 'image_links_pod_designers_',
+        'blob_prefix': 'html_blob_pod_designers_',
+        'title': 'Print On Demand Designers',
+        'header_url': 'https://thangs.com/?sort=prints&range=prints&costType=all',
+        'header_text': 'Shop 3D Prints, Right To Your Door!',
+        'footer_url': 'https://thangs.com/leaderboard/period?league=All',
+        'footer_text': 'View All Top Models',
+    },
+    'one-off': {
+        'label': 'One Off Designs',
+        'source': 'designers',
+        'models_per_source': 3,
+        'model_links_file': 'model_links.txt',
+        'links_csv_prefix': 'thangs_one_off_links_',
+        'image_csv_prefix': 'image_links_one_off_',
+        'blob_prefix': 'html_blob_one_off_',
+        'title': 'Designs on Thangs',
+        'header_url': 'https://thangs.com',
+        'header_text': 'Search from over 30M 3D Models',
+        'footer_url': 'https://thangs.com/marketplace/memberships/trending',
+        'footer_text': 'Check out the Marketplace!',
+    },
+    'paid-trending-monthly': {
+        'label': 'Paid Models Showcase',
+        'source': 'listing',
+        'listing_url': 'https://thangs.com/?sort=trending&range=year&costType=paid&results=100',
+        'model_links_file': 'links.txt',
+        'links_csv_prefix': 'thangs_links_',
+        'image_csv_prefix': 'image_links_',
+        'blob_prefix': 'html_blob_paid_models_showcase_',
+        'title': 'Paid Models Showcase',
+        'header_url': 'https://thangs.com/?sort=trending&range=month&costType=paid',
+        'header_text': "Explore This Month's Top Paid Models",
+        'footer_url': 'https://thangs.com/leaderboard/period?league=All',
+        'footer_text': 'View All Top Models',
+    },
+}
+
+# Sections included in the weekly send, in the order generate_newsletter.sh runs them
+DEFAULT_SECTIONS: List[str] = ['premium-designs', 'maker-showcase', 'free-models', 'print-on-demand']
+
+
+def get_section(name: str) -> Dict:
+    """
+    Look up a section definition by its folder name
+
+    Args:
+        name: Folder name of the section (e.g. 'free-models')
+
+    Returns:
+        Dict: Section definition with its 'name' and absolute 'folder' filled in
+    """
+    if name not in SECTIONS:
+        raise KeyError(f"Unknown section '{name}' (expected one of: {', '.join(SECTIONS)})")
+    section = dict(SECTIONS[name])
+    section['name'] = name
+    section['folder'] = os.path.join(REPO_ROOT, name)
+    return section
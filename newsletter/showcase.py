@@ -0,0 +1,1364 @@
+"""
+Stages shared by every showcase generator: fetch model links, download
+thumbnails and render the section's HTML blob.
+
+All paths are resolved against the section's folder, so the stages behave
+the same whether a generator is started from inside its folder or not, and
+several sections can run side by side in one process. requests and bs4 are
+imported on first use so fully cached runs never load them.
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from html import escape
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse, quote, unquote
+
+from newsletter import (allocation, assets, buildcache, cache, canonical, catalog, featured, metadata, metrics, parsing,
+                        profiling, tracing)
+from newsletter.client import get_session
+from newsletter.delta import diff_links, load_baseline, reusable_image, reuse_image
+from newsletter.journal import Journal, atomic_write, journal_path
+from newsletter.pipeline import Stage, run_pipeline
+from newsletter.rollup import ROLLUP_DIR
+from newsletter.sections import GITHUB_RAW_BASE, SECTIONS, get_section
+
+# Constants
+REQUESTS_TIMEOUT = 10  # seconds
+RATE_LIMIT_DELAY = 1  # seconds
+MAX_RETRIES = 3
+
+# Worker threads per thumbnail pipeline stage; resolve hits thangs.com, so it
+# stays small to be polite, while downloads come from the CDN
+STAGE_WORKERS = {'resolve': 2, 'download': 4, 'transcode': 2}
+
+# Thumbnails are shown at 300x400, so anything bigger than 2x is scaled down
+THUMBNAIL_MAX_SIZE = (600, 800)
+
+# Transcodes running at once across every section (and tenant) in the process
+TRANSCODE_SLOTS = os.cpu_count() or 2
+
+# A listing or designer page fetched by one section is reused by every other
+# section (and tenant) reading it for this long within a process
+SOURCE_PAGE_TTL = 10 * 60  # seconds
+
+# Designer pages offer this many times models_per_source candidates, so
+# repeated models and (with novelty on) recently featured ones can be passed over
+NOVELTY_CANDIDATES = 3
+
+# Header copy shown above every section
+DEFAULT_HEADLINE = 'What to Print This Weekend'
+DEFAULT_TAGLINE = 'Explore the latest 3D Printing Trends!'
+
+# Process-wide cache shared by sections running concurrently: model page
+# (by canonical.thumbnail_key) -> its metadata record, thumbnail URL included.
+# Lookups that were found also go to the on-disk cache, and images to its
+# image store, so later runs (and the pre-warm daemon) share them.
+_thumbnail_cache: Dict[str, Optional[Dict]] = {}
+_cache_lock = threading.Lock()
+
+# Source page URL -> (fetched at, body, encoding); transcoded copy in the image store ->
+# (path, SHA-256); and one lock per page, image or transcode being worked on,
+# so concurrent sections asking for the same one wait for a single fetch
+_source_pages: Dict[str, Tuple[float, bytes, Optional[str]]] = {}
+_transcoded: Dict[str, Tuple[str, str]] = {}
+_inflight: Dict[str, threading.Lock] = {}
+_transcode_slots = threading.BoundedSemaphore(TRANSCODE_SLOTS)
+
+# (date, newsletters) -> featured history, so its Bloom filter is read from
+# disk once per run rather than by every section and stage that checks it
+_featured: Dict[Tuple[str, int], featured.FeaturedHistory] = {}
+
+# Bumped implicitly whenever this module or the section definitions change
+CODE_FILES = [
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sections.py'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'featured.py'),
+]
+
+
+class SectionError(Exception):
+    """Raised when a section can't collect the model links it needs"""
+
+
+def today_str() -> str:
+    """Today's date in the YYYYMMDD format used by every output filename"""
+    return datetime.now().strftime('%Y%m%d')
+
+
+def section_path(section: Dict, *parts: str) -> str:
+    """Resolve a path inside a section's folder"""
+    return os.path.join(section['folder'], *parts)
+
+
+def validate_url(url: str) -> bool:
+    """
+    Validate if a URL is properly formatted and points to thangs.com or than.gs
+
+    Args:
+        url: The URL to validate
+
+    Returns:
+        bool: True if URL is valid, False otherwise
+    """
+    try:
+        parsed = urlparse(url)
+        return all([parsed.scheme, parsed.netloc]) and (
+            'thangs.com' in parsed.netloc or
+            'than.gs' in parsed.netloc
+        )
+    except Exception:
+        return False
+
+
+def make_request(url: str, headers: Optional[Dict[str, str]] = None, retry_count: int = 0) -> Optional['requests.Response']:
+    """
+    Make an HTTP request with retry logic and proper error handling
+
+    Args:
+        url: The URL to request
+        headers: Extra request headers (the shared session sends a browser User-Agent)
+        retry_count: Current retry attempt number
+
+    Returns:
+        Optional[requests.Response]: Response object if successful, None otherwise
+    """
+    from requests import RequestException
+
+    try:
+        response = get_session().get(url, headers=headers, timeout=REQUESTS_TIMEOUT)
+        response.raise_for_status()
+        metrics.record_request(url, len(response.content))
+        return response
+    except RequestException as e:
+        metrics.record_request(url, ok=False)
+        if retry_count < MAX_RETRIES:
+            print(f"⚠️  Retrying {url} (attempt {retry_count + 1}/{MAX_RETRIES})")
+            metrics.incr('retries', urlparse(url).netloc)
+            time.sleep(RATE_LIMIT_DELAY * (retry_count + 1))
+            return make_request(url, headers, retry_count + 1)
+        print(f"❌ Error requesting {url}: {e}")
+        metrics.incr('failures', 'make_request')
+        return None
+
+
+def _single_flight(key: str) -> threading.Lock:
+    """The lock held while the page, image, transcode or history named by key is being produced"""
+    with _cache_lock:
+        return _inflight.setdefault(key, threading.Lock())
+
+
+def reset_caches() -> None:
+    """
+    Forget everything cached in this process, so the next lookups go back to
+    the on-disk cache (and its TTL) or the network
+
+    For long-running processes such as the pre-warm daemon; call it between
+    runs, never while sections are working.
+    """
+    with _cache_lock:
+        for registry in (_thumbnail_cache, _source_pages, _transcoded, _inflight, _featured):
+            registry.clear()
+
+
+def fetch_source_page(url: str) -> Tuple[Optional[bytes], Optional[str], bool]:
+    """
+    A listing or designer page, fetched at most once per SOURCE_PAGE_TTL in this process
+
+    Returns:
+        Tuple: The page's raw body (None if it couldn't be fetched), its
+        declared encoding, and whether it came from an earlier fetch
+    """
+    with _single_flight(f"page:{url}"):
+        with _cache_lock:
+            cached = _source_pages.get(url)
+        if cached and time.time() - cached[0] < SOURCE_PAGE_TTL:
+            metrics.cache_lookup('source_page', hit=True)
+            return cached[1], cached[2], True
+        metrics.cache_lookup('source_page', hit=False)
+
+        with tracing.span('fetch_links', url=url):
+            response = make_request(url)
+        if not response:
+            return None, None, False
+        with _cache_lock:
+            _source_pages[url] = (time.time(), response.content, response.encoding)
+        return response.content, response.encoding, False
+
+
+def absolute_url(href: str) -> str:
+    """Resolve a protocol- or site-relative link found on a Thangs page"""
+    if not href.startswith('http'):
+        if href.startswith('//'):
+            return 'https:' + href
+        if href.startswith('/'):
+            return 'https://thangs.com' + href
+    return href
+
+
+@tracing.traced('parse_links')
+def extract_model_links(html: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Extract '/3d-model/' links from a Thangs page
+
+    Args:
+        html: Page HTML
+        limit: Stop after this many model links (None for all)
+
+    Returns:
+        List[Dict[str, str]]: List of dictionaries containing URL and text for each model
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+
+    for a_tag in soup.find_all('a', href=True):
+        link = {
+            'url': absolute_url(a_tag['href']),
+            'text': a_tag.get_text(strip=True)
+        }
+
+        if not validate_url(link['url']):
+            continue
+
+        # Only include links that contain '/3d-model/'
+        if '/3d-model/' in link['url']:
+            links.append(link)
+
+        if limit and len(links) >= limit:
+            break
+
+    return links
+
+
+def page_links(body: bytes, encoding: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    The model links of a fetched listing or designer page
+
+    When the page embeds its state blob, the links come from it and every
+    listed model's metadata goes into the thumbnail caches, so resolving
+    those models fetches nothing (see newsletter.pagestate).
+    """
+    listing = parsing.extract_listing(body, encoding, limit)
+    if listing['models']:
+        seeded = seed_metadata(listing['models'])
+        metrics.incr('page_state', 'models', len(listing['models']))
+        print(f"🧩 Page state lists {len(listing['models'])} models; "
+              f"{seeded} thumbnails known without a model page fetch")
+    return listing['links']
+
+
+def fetch_listing_links(section: Dict) -> List[Dict[str, str]]:
+    """Fetch and extract model links from a section's single listing page"""
+    print("🔍 Fetching links from Thangs leaderboard...")
+
+    body, encoding, _ = fetch_source_page(section['listing_url'])
+    if body is None:
+        raise SectionError(f"Error fetching links from {section['listing_url']}")
+
+    links = page_links(body, encoding)
+    print(f"✅ Found {len(links)} model links")
+    return links
+
+
+def designer_links_file(section: Dict) -> str:
+    """The list of designer pages a 'designers' section reads: its links.txt unless it sets 'links_file'"""
+    return section_path(section, section.get('links_file', 'links.txt'))
+
+
+def read_source_urls(section: Dict) -> List[str]:
+    """Read and validate the designer page URLs listed in a section's links.txt"""
+    try:
+        links_file = designer_links_file(section)
+        if not os.path.exists(links_file):
+            raise FileNotFoundError("links.txt not found!")
+
+        with open(links_file, 'r', encoding='utf-8') as f:
+            source_urls = [line.strip() for line in f if line.strip()]
+        source_urls = [url for url in source_urls if validate_url(url)]
+
+        if not source_urls:
+            raise ValueError("No valid URLs found in links.txt")
+    except Exception as e:
+        raise SectionError(f"Error reading links.txt: {e}")
+
+    # Short links are resolved (once, then cached) so a page listed twice is fetched once
+    unique = canonical.unique_urls(source_urls)
+    if len(unique) < len(source_urls):
+        print(f"⏭️  Skipping {len(source_urls) - len(unique)} repeated pages in links.txt")
+    return unique
+
+
+def iter_designer_pages(section: Dict,
+                        history: Optional[featured.FeaturedHistory] = None) -> Iterator[List[Dict[str, str]]]:
+    """
+    Yield each designer page's candidate model links, page by page
+
+    Each page offers models_per_source * NOVELTY_CANDIDATES distinct models
+    in page order, with recently featured ones passed over (or moved behind
+    the rest) when there is a featured history.
+    """
+    per_source = section['models_per_source']
+    mode = featured.novelty_settings(section)['mode']
+    for source_url in read_source_urls(section):
+        print(f"Processing: {source_url}")
+        body, encoding, shared = fetch_source_page(source_url)
+        if body is None:
+            continue
+
+        # A card links to its model more than once
+        candidates = list(canonical.unique_links(
+            page_links(body, encoding, limit=per_source * NOVELTY_CANDIDATES)))
+        if history:
+            recent = history.recent_models([link['url'] for link in candidates])
+            candidates = featured.apply_novelty(candidates, recent, mode)
+        print(f"✅ Found {len(candidates)} candidate model links from {source_url}")
+        yield candidates
+
+        # Rate limiting (a page another section already fetched cost the server nothing)
+        if not shared:
+            time.sleep(RATE_LIMIT_DELAY)
+
+
+def iter_designer_links(section: Dict,
+                        history: Optional[featured.FeaturedHistory] = None) -> Iterator[Dict[str, str]]:
+    """
+    Yield the first few model links from each designer page in links.txt, page by page
+
+    Models already taken from an earlier page (designers share models) are skipped.
+    """
+    print("🔍 Fetching links from designer pages...")
+
+    total = 0
+    seen = set()
+    for candidates in iter_designer_pages(section, history):
+        page_links = [link for link in candidates if canonical.model_key(link['url']) not in seen]
+        page_links = page_links[:section['models_per_source']]
+        seen.update(canonical.model_key(link['url']) for link in page_links)
+        total += len(page_links)
+        yield from page_links
+
+    print(f"\n✅ Found total of {total} model links")
+
+
+def listing_candidates(section: Dict, date_str: str) -> List[Dict[str, str]]:
+    """
+    A listing section's model links in the order it would pick them
+
+    The whole ranking is stored as the listing's snapshot first; the order
+    then follows the section's 'selection' and novelty settings.
+    """
+    links = fetch_listing_links(section)
+    # Keep the whole ranking, not just what this run features
+    catalog.record_snapshot(section['listing_url'], date_str, [link['url'] for link in links])
+    if section.get('selection') == 'risers':
+        from newsletter.trends import order_links_by_trend
+        links = order_links_by_trend(links, section['listing_url'])
+    history = featured_history(section, date_str)
+    if history:
+        novelty = featured.novelty_settings(section)
+        recent = history.recent_models([link['url'] for link in links])
+        links = featured.apply_novelty(links, recent, novelty['mode'])
+        if recent:
+            print(f"🔁 {len(recent)} models were featured in the last {novelty['newsletters']} newsletters")
+    return links
+
+
+def collect_candidates(section: Dict, date_str: str, limit: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """
+    Every model a section could show, scored for newsletter.allocation
+
+    Scores come from each model's rank on its source page, boosted by
+    engagement already in the metadata cache (nothing extra is fetched).
+    Designer pages are interleaved, so their first picks rank alike.
+
+    Returns:
+        Tuple: Candidate links (with 'url', 'text' and 'score') in the
+        section's preference order, and the section's quota: limit, else
+        its 'quota' setting, else as many as it shows on its own
+    """
+    if section['source'] == 'designers':
+        print("🔍 Collecting candidates from designer pages...")
+        pages = list(iter_designer_pages(section, featured_history(section, date_str)))
+        ranked = [[(rank, link) for rank, link in enumerate(page)] for page in pages]
+        ranked = allocation.interleave(ranked)
+        quota = section['models_per_source'] * len(pages)
+    else:
+        ranked = list(enumerate(listing_candidates(section, date_str)))
+        quota = len(ranked)
+
+    candidates, seen = [], set()
+    for rank, link in ranked:
+        key = canonical.model_key(link['url'])
+        if key in seen:
+            continue
+        seen.add(key)
+        record = cache.get_metadata(canonical.thumbnail_key(link['url']))
+        candidates.append({'url': link['url'], 'text': link['text'],
+                           'score': allocation.rank_score(rank, metadata.popularity(record))})
+    return candidates, limit or section.get('quota') or quota
+
+
+def links_csv_name(section: Dict, date_str: str) -> str:
+    return f"{section['links_csv_prefix']}{date_str}.csv"
+
+
+def image_csv_name(section: Dict, date_str: str) -> str:
+    return f"{section['image_csv_prefix']}{date_str}.csv"
+
+
+def blob_name(section: Dict, date_str: str) -> str:
+    return f"{section['blob_prefix']}{date_str}.html"
+
+
+def save_links_to_files(section: Dict, links: List[Dict[str, str]], date_str: str,
+                        export_csv: bool = True) -> None:
+    """
+    Save links to the section's model links file and, optionally, its dated CSV
+
+    Args:
+        section: Section definition
+        links: List of dictionaries containing URL and text for each model
+        date_str: Date string for file naming
+        export_csv: Also write the dated links CSV
+    """
+    if export_csv:
+        with atomic_write(section_path(section, links_csv_name(section, date_str)), newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["URL", "Link Text"])
+            for link in links:
+                writer.writerow([link['url'], link['text']])
+
+    with atomic_write(section_path(section, section['model_links_file']), encoding='utf-8') as f:
+        for link in links:
+            f.write(f"{link['url']}\n")
+
+
+def discover_model_links(section: Dict, date_str: str, limit: Optional[int] = None,
+                         journal: Optional[Journal] = None, export_csv: bool = True,
+                         assigned: Optional[List[Dict]] = None) -> Iterator[Dict]:
+    """
+    Yield a section's model links as pipeline items as soon as they are found
+
+    Once discovery finishes (or limit is reached) the links are saved to the
+    section's link files. If the journal shows a previous run already finished
+    discovery, its links are replayed instead of crawling again.
+
+    Args:
+        section: Section definition
+        date_str: Date string for file naming
+        limit: Keep at most this many models (None for all)
+        journal: Run journal to record each discovered link in
+        export_csv: Also write the dated links CSV
+
+    Links to a model already yielded (by canonical.model_key) are dropped
+    before anything is fetched for them.
+
+    Yields:
+        Dict: Item with the model's position ('index'), 'url' and link 'text'
+    """
+    recorded = journal.links() if journal else None
+    if recorded is not None:
+        print(f"⏭️  Resuming with {len(recorded)} links discovered by the interrupted run")
+        source = recorded
+    elif assigned is not None:
+        print(f"🧮 Using the {len(assigned)} models allocated to this section")
+        source = assigned
+    elif section['source'] == 'designers':
+        source = iter_designer_links(section, featured_history(section, date_str))
+    else:
+        source = listing_candidates(section, date_str)
+
+    links = []
+    for link in canonical.unique_links(source):
+        if limit and len(links) >= limit:
+            break
+        links.append({'url': link['url'], 'text': link['text']})
+        if journal and recorded is None:
+            journal.record('link', link['url'], index=len(links) - 1, url=link['url'], text=link['text'])
+        yield {'index': len(links) - 1, 'url': link['url'], 'text': link['text']}
+
+    save_links_to_files(section, links, date_str, export_csv)
+    if journal:
+        journal.record('links_done', count=len(links))
+
+
+def featured_history(section: Dict, date_str: str) -> Optional[featured.FeaturedHistory]:
+    """The featured history a section's selection checks against, or None with novelty off"""
+    novelty = featured.novelty_settings(section)
+    if novelty['mode'] == 'off':
+        return None
+    key = (date_str, novelty['newsletters'])
+    with _single_flight(f"featured:{date_str}:{novelty['newsletters']}"):
+        with _cache_lock:
+            history = _featured.get(key)
+        if history is None:
+            history = featured.FeaturedHistory(*key)
+            with _cache_lock:
+                _featured[key] = history
+    return history
+
+
+def create_img_folder(section: Dict, date_str: str) -> str:
+    """Create dated img folder if it doesn't exist, returning its path relative to the section"""
+    folder_path = os.path.join('img', date_str)
+    os.makedirs(section_path(section, folder_path), exist_ok=True)
+    return folder_path
+
+
+def store_image(image_url: str) -> Optional[str]:
+    """
+    Download an image into the shared image store unless it is already there
+
+    Args:
+        image_url: Thumbnail URL
+
+    Returns:
+        Optional[str]: Path of the stored image, or None if the download failed
+    """
+    stored = cache.image_path(image_url)
+    with _single_flight(f"image:{stored}"):
+        if os.path.exists(stored):
+            metrics.cache_lookup('image_store', hit=True)
+            cache.touch_image(stored)
+            return stored
+        metrics.cache_lookup('image_store', hit=False)
+
+        nbytes = 0
+        # Only downloads are timed, not the store hits above
+        try:
+            with metrics.latency('download_image'), tracing.span('download_image', url=image_url):
+                response = get_session().get(image_url, stream=True, timeout=REQUESTS_TIMEOUT)
+                response.raise_for_status()
+
+                # Written under a temporary name so an interrupted download never looks complete
+                os.makedirs(os.path.dirname(stored), exist_ok=True)
+                with atomic_write(stored, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        if chunk:
+                            f.write(chunk)
+                            nbytes += len(chunk)
+        except Exception as e:
+            print(f"❌ Error downloading {image_url}: {e}")
+            metrics.record_request(image_url, nbytes, ok=False)
+            metrics.incr('failures', 'store_image')
+            return None
+        metrics.record_request(image_url, nbytes)
+        return stored
+
+
+def cached_metadata(url: str) -> Optional[Dict]:
+    """Metadata record already known for a model page, from this process or the disk cache"""
+    key = canonical.thumbnail_key(url)
+    with _cache_lock:
+        record = _thumbnail_cache.get(key)
+    if not record:
+        record = cache.get_metadata(key)
+    metrics.cache_lookup('thumbnail', hit=bool(record))
+    return record
+
+
+def cached_thumbnail(url: str) -> Optional[str]:
+    """Thumbnail URL already known for a model page, from this process or the disk cache"""
+    record = cached_metadata(url)
+    return record['thumbnail_url'] if record else None
+
+
+def parse_thumbnail_url(html: str) -> Optional[str]:
+    """Thumbnail URL of a model page: its og:image, else the first model image"""
+    return metadata.parse_model_page(html)['thumbnail_url']
+
+
+@metrics.timed('seed_page_state')
+def seed_metadata(models: Iterable[Dict]) -> int:
+    """
+    Put metadata read from a page's state blob into the thumbnail caches
+
+    A blob record fills in what the cached one lacks and replaces a stale
+    thumbnail URL; fields only a model page has (price, rating) are kept.
+
+    Args:
+        models: Listed models with 'url' and 'metadata' (see pagestate.parse_model)
+
+    Returns:
+        int: How many models' records were new or changed
+    """
+    seeded = 0
+    for model in models:
+        key = canonical.thumbnail_key(model['url'])
+        with _cache_lock:
+            known = _thumbnail_cache.get(key)
+        known = known or cache.get_metadata(key) or {}
+        found = {field: value for field, value in model['metadata'].items() if value is not None}
+        record = {**model['metadata'], **known, **found}
+        if record != known:
+            cache.put_thumbnail(key, record['thumbnail_url'], record)
+            seeded += 1
+        with _cache_lock:
+            _thumbnail_cache[key] = record
+    return seeded
+
+
+def resolve_model_page(url: str) -> Optional[Dict]:
+    """
+    Visit a model page and read its thumbnail and metadata in one parse
+
+    Returns:
+        Optional[Dict]: The page's metadata.ModelMetadata record, or None if
+        the page couldn't be fetched or has no thumbnail
+    """
+    key = canonical.thumbnail_key(url)
+    with _cache_lock:
+        if key in _thumbnail_cache:
+            return _thumbnail_cache[key]
+
+    # Sections sharing a model wait here for the one fetching it
+    with _single_flight(f"model:{key}"):
+        with _cache_lock:
+            if key in _thumbnail_cache:
+                return _thumbnail_cache[key]
+        record = cache.get_metadata(key)
+        if record:
+            with _cache_lock:
+                _thumbnail_cache[key] = record
+            return record
+
+        # Only the fetch and parse are timed, not the cache hits above
+        with metrics.latency('process_model_page'):
+            try:
+                with tracing.span('fetch_model_page', url=url):
+                    response = get_session().get(url, timeout=REQUESTS_TIMEOUT)
+                    response.raise_for_status()
+            except Exception as e:
+                print(f"❌ Error processing {url}: {e}")
+                metrics.record_request(url, ok=False)
+                metrics.incr('failures', 'process_model_page')
+                return None
+            metrics.record_request(url, len(response.content))
+
+            with tracing.span('parse_model_page'):
+                record = parsing.extract_metadata(response.content, response.encoding, url)
+        if not record['thumbnail_url']:
+            record = None
+
+        with _cache_lock:
+            _thumbnail_cache[key] = record
+        if record:
+            cache.put_thumbnail(key, record['thumbnail_url'], record)
+        return record
+
+
+def process_model_page(url: str) -> Optional[str]:
+    """Visit model page and extract thumbnail image"""
+    record = resolve_model_page(url)
+    return record['thumbnail_url'] if record else None
+
+
+def read_model_links(section: Dict) -> List[str]:
+    """Read the model URLs saved by the link stage"""
+    with open(section_path(section, section['model_links_file']), 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+@tracing.traced('transcode_image')
+def transcode_image(path: str, max_size=THUMBNAIL_MAX_SIZE) -> bool:
+    """
+    Scale an image down in place so it fits within max_size, keeping its format
+
+    Args:
+        path: Image file to transcode
+        max_size: (width, height) bounding box
+
+    Returns:
+        bool: True if the file was rewritten, False if it already fit or
+        couldn't be read (it is then left untouched)
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+
+    try:
+        with Image.open(path) as img:
+            if img.width <= max_size[0] and img.height <= max_size[1]:
+                return False
+            image_format = img.format
+            img.thumbnail(max_size)
+            if image_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            tmp_path = f"{path}.tmp"
+            img.save(tmp_path, format=image_format, quality=85)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        print(f"⚠️  Couldn't transcode {path}: {e}")
+        metrics.incr('failures', 'transcode_image')
+        return False
+
+
+def transcoded_image(image_url: str, max_size=THUMBNAIL_MAX_SIZE) -> Optional[Tuple[str, str]]:
+    """
+    A stored image scaled to fit max_size, transcoded once and kept in the image store
+
+    Every section (and tenant) showing the image copies this one file, so
+    it is only transcoded and hashed once per process, and only transcoded
+    once at all while the store keeps it.
+
+    Returns:
+        Optional[Tuple[str, str]]: Path of the transcoded copy and its
+        SHA-256, or None if the image couldn't be downloaded
+    """
+    target = cache.transcoded_path(image_url, max_size)
+    with _single_flight(f"transcode:{target}"):
+        with _cache_lock:
+            known = _transcoded.get(target)
+        if known and os.path.exists(target):
+            metrics.cache_lookup('transcode', hit=True)
+            return known
+
+        hit = os.path.exists(target)
+        metrics.cache_lookup('transcode', hit=hit)
+        if hit:
+            cache.touch_image(target)
+        else:
+            stored = store_image(image_url)
+            if not stored:
+                return None
+            # Transcoded under a temporary name so a half-done one is never reused
+            part = f"{target}.part"
+            shutil.copyfile(stored, part)
+            with _transcode_slots:
+                transcode_image(part, max_size)
+            os.replace(part, target)
+
+        known = (target, buildcache.file_digest(target))
+        with _cache_lock:
+            _transcoded[target] = known
+        return known
+
+
+def thumbnail_stages(section: Dict, img_folder: str, workers: Optional[Dict[str, int]] = None,
+                     journal: Optional[Journal] = None, baseline: Optional[Dict] = None) -> List[Stage]:
+    """
+    Build the resolve -> download -> transcode stages for a section
+
+    Args:
+        section: Section definition
+        img_folder: Dated img folder, relative to the section
+        workers: Per-stage worker counts overriding STAGE_WORKERS
+        journal: Run journal; units it already holds are skipped, new ones recorded
+        baseline: Earlier run whose images unchanged models reuse (see newsletter.delta)
+
+    Returns:
+        List[Stage]: Stages that turn link items into downloaded image items
+    """
+    workers = {**STAGE_WORKERS, **(workers or {})}
+
+    def resolve(item):
+        stored = journal and journal.get('image', canonical.model_key(item['url']))
+        if stored and os.path.exists(section_path(section, stored['image_path'])):
+            print(f"⏭️  Already stored {item['index'] + 1}: {stored['image_path']}")
+            item.update(thumbnail_url=stored['thumbnail_url'], image_path=stored['image_path'],
+                        metadata=stored.get('metadata'), done=True)
+            return item
+
+        if baseline:
+            reused = reusable_image(section, baseline, item['url'])
+            metrics.cache_lookup('delta', hit=bool(reused))
+            if reused:
+                item.update(thumbnail_url=reused['thumbnail_url'], metadata=reused['metadata'],
+                            image_path=reuse_image(section, reused, img_folder), sha256=reused['sha256'],
+                            size=reused['size'], resolved_at=reused['resolved_at'], done=True)
+                print(f"♻️  Unchanged since {baseline['date']} {item['index'] + 1}: {item['image_path']}")
+                return item
+
+        resolved = journal and journal.get('thumbnail', canonical.thumbnail_key(item['url']))
+        if resolved:
+            item.update(thumbnail_url=resolved['thumbnail_url'], metadata=resolved.get('metadata'))
+            return item
+
+        print(f"Processing {item['index'] + 1}: {item['url']}")
+        record = cached_metadata(item['url'])
+        if not record:
+            record = resolve_model_page(item['url'])
+            # Be nice to the server between model page requests
+            time.sleep(RATE_LIMIT_DELAY)
+        if not record:
+            print(f"⚠️  No thumbnail found for: {item['url']}")
+            metrics.incr('failures', 'no_thumbnail')
+            return None
+        if journal:
+            journal.record('thumbnail', canonical.thumbnail_key(item['url']), thumbnail_url=record['thumbnail_url'],
+                           metadata=record)
+        item.update(thumbnail_url=record['thumbnail_url'], metadata=record)
+        return item
+
+    def download(item):
+        if item.get('done'):
+            return item
+        # Into the shared image store; the section gets its copy once transcoded
+        if not store_image(item['thumbnail_url']):
+            print(f"❌ Failed to download: {item['thumbnail_url']}")
+            return None
+        return item
+
+    def transcode(item):
+        if item.get('done'):
+            # Hashed here, in parallel, for the catalog (reused images already are)
+            if not item.get('sha256') or item.get('size') is None:
+                path = section_path(section, item['image_path'])
+                item['sha256'] = buildcache.file_digest(path)
+                item['size'] = os.path.getsize(path)
+            return item
+
+        transcoded = transcoded_image(item['thumbnail_url'])
+        if not transcoded:
+            print(f"❌ Failed to download: {item['thumbnail_url']}")
+            return None
+        source, digest = transcoded
+        file_extension = os.path.splitext(urlparse(item['thumbnail_url']).path)[1]
+        item['image_path'] = os.path.join(img_folder, assets.asset_name(item['url'], digest, file_extension))
+        with open(source, 'rb') as src, atomic_write(section_path(section, item['image_path']), 'wb') as f:
+            shutil.copyfileobj(src, f)
+        item['sha256'] = digest
+        item['size'] = os.path.getsize(source)
+        print(f"✅ Downloaded: {item['image_path']}")
+        if journal:
+            journal.record('image', canonical.model_key(item['url']), thumbnail_url=item['thumbnail_url'],
+                           image_path=item['image_path'], metadata=item.get('metadata'))
+        return item
+
+    return [
+        Stage('resolve', resolve, workers['resolve']),
+        Stage('download', download, workers['download']),
+        Stage('transcode', transcode, workers['transcode']),
+    ]
+
+
+def build_thumbnails(section: Dict, date_str: str, source: Iterable[Dict],
+                     workers: Optional[Dict[str, int]] = None, journal: Optional[Journal] = None,
+                     export_csv: bool = True, baseline: Optional[Dict] = None) -> str:
+    """
+    Stream link items through the thumbnail pipeline and record the run in the catalog
+
+    Args:
+        section: Section definition
+        date_str: Date string for folder and file naming
+        source: Link items, e.g. from discover_model_links()
+        workers: Per-stage worker counts overriding STAGE_WORKERS
+        journal: Run journal to skip finished units with and record new ones in
+        export_csv: Also export the run's image manifest as a dated CSV
+        baseline: Earlier run whose images unchanged models reuse (see newsletter.delta)
+
+    Returns:
+        str: The dated img folder, relative to the section
+    """
+    print("\n📥 Downloading model thumbnails...")
+
+    img_folder = create_img_folder(section, date_str)
+    items = run_pipeline(source, thumbnail_stages(section, img_folder, workers, journal, baseline))
+    # Workers finish out of order; the manifest keeps the discovery order
+    items.sort(key=lambda item: item['index'])
+    items = apply_image_novelty(section, date_str, items)
+
+    # Written in one go once every image is in place, never row by row
+    run_id = catalog.record_run(section['name'], date_str, items)
+
+    print(f"\n✅ Downloads completed!")
+    print(f"📁 Images saved in: {img_folder}")
+    print(f"🗂️  Catalog run recorded: {section['name']} {date_str} ({len(items)} models)")
+    if export_csv:
+        csv_filename = image_csv_name(section, date_str)
+        catalog.export_manifest_csv(catalog.run_manifest(run_id), section_path(section, csv_filename))
+        print(f"📄 CSV file created: {csv_filename}")
+        fill_link_text(section, date_str, items)
+    return img_folder
+
+
+def fill_link_text(section: Dict, date_str: str, items: List[Dict]) -> None:
+    """Fill the empty Link Text cells of the dated links CSV (image-only links) with the models' titles"""
+    csv_path = section_path(section, links_csv_name(section, date_str))
+    titles = {item['url']: (item.get('metadata') or {}).get('title') for item in items}
+    if not os.path.exists(csv_path) or not any(titles.values()):
+        return
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    filled = 0
+    for row in rows[1:]:
+        if len(row) >= 2 and not row[1] and titles.get(row[0]):
+            row[1] = titles[row[0]]
+            filled += 1
+    if filled:
+        with atomic_write(csv_path, newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows)
+
+
+def apply_image_novelty(section: Dict, date_str: str, items: List[Dict]) -> List[Dict]:
+    """
+    Catch recently featured images that came back under a different model URL
+
+    Model URLs are checked during discovery; the image hashes are only known
+    once the pipeline has downloaded them.
+    """
+    history = featured_history(section, date_str)
+    if not history:
+        return items
+    recent = history.recent_images([item.get('sha256') for item in items])
+    if not recent:
+        return items
+
+    mode = featured.novelty_settings(section)['mode']
+    kept = featured.apply_novelty(items, recent, mode, key='sha256')
+    if mode == 'exclude':
+        for item in items:
+            if item.get('sha256') in recent:
+                os.remove(section_path(section, item['image_path']))
+    print(f"🔁 {len(recent)} images were featured in a recent newsletter"
+          f"{', dropped them' if mode == 'exclude' else ', moved them to the end'}")
+    return kept
+
+
+def download_thumbnails(section: Dict, date_str: str, workers: Optional[Dict[str, int]] = None,
+                        journal: Optional[Journal] = None, export_csv: bool = True) -> str:
+    """Download thumbnails for the models already saved in the section's link file"""
+    links = canonical.unique_links({'url': url, 'text': ''} for url in read_model_links(section))
+    items = ({'index': index, **link} for index, link in enumerate(links))
+    return build_thumbnails(section, date_str, items, workers, journal, export_csv)
+
+
+def read_image_manifest(csv_path: str) -> List[Dict[str, str]]:
+    """Read an image_links CSV into a list of image_path/original_link dicts"""
+    image_data = []
+    with open(csv_path, 'r') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            image_data.append({
+                'image_path': row['Image Path'],
+                'original_link': row['Original Link']
+            })
+    return image_data
+
+
+def find_image_manifest(section: Dict, date_str: str) -> Optional[str]:
+    """
+    Pick the image manifest CSV for date_str if it exists, otherwise the most
+    recent one written by this section. Only used for runs the catalog
+    doesn't know about; see load_manifest().
+    """
+    dated = section_path(section, image_csv_name(section, date_str))
+    if os.path.exists(dated):
+        return dated
+
+    prefix = section['image_csv_prefix']
+    csv_files = [
+        f for f in os.listdir(section['folder'])
+        if f.startswith(prefix) and f.endswith('.csv') and f[len(prefix):-4].isdigit()
+    ]
+    if not csv_files:
+        return None
+    return section_path(section, sorted(csv_files)[-1])
+
+
+def resolve_manifest(section: Dict, date_str: str) -> Optional[Tuple[str, List[Dict[str, str]]]]:
+    """
+    Image manifest rows to render for a date, with the date of the run they are from
+
+    The catalog's run for date_str wins, then a CSV for that date written
+    before the catalog existed, then whichever of the catalog's latest run
+    and the latest CSV is newer.
+
+    Args:
+        section: Section definition
+        date_str: Run date as YYYYMMDD
+
+    Returns:
+        Optional[Tuple[str, List[Dict[str, str]]]]: The manifest's run date
+        (the img folder its images live in) and its image_path/original_link
+        rows, or None if the section has never produced a manifest
+    """
+    run = catalog.get_run(section['name'], date_str)
+    if run:
+        return date_str, catalog.run_manifest(run['id'])
+
+    csv_path = find_image_manifest(section, date_str)
+    latest = catalog.get_run(section['name'])
+    csv_date = csv_path and os.path.basename(csv_path)[len(section['image_csv_prefix']):-4]
+    if latest and (not csv_path or (csv_date != date_str and latest['date'] >= csv_date)):
+        return latest['date'], catalog.run_manifest(latest['id'])
+    return (csv_date, read_image_manifest(csv_path)) if csv_path else None
+
+
+def load_manifest(section: Dict, date_str: str) -> Optional[List[Dict[str, str]]]:
+    """Image manifest rows to render for a date (see resolve_manifest), or None if there are none"""
+    resolved = resolve_manifest(section, date_str)
+    return resolved[1] if resolved else None
+
+
+def get_github_raw_url(section: Dict, image_path: str, date_str: str) -> str:
+    """Convert local image path to GitHub raw URL"""
+    filename = os.path.basename(image_path)
+
+    try:
+        # First decode the filename in case it's already URL-encoded
+        filename = unquote(filename)
+        # Double encode the filename - this is what GitHub expects
+        encoded_filename = quote(quote(filename, safe=''), safe='')
+    except Exception:
+        # Fallback to simple encoding if there's an error
+        encoded_filename = quote(filename, safe='')
+
+    return f"{GITHUB_RAW_BASE}/{section['name']}/img/{date_str}/{encoded_filename}"
+
+
+@tracing.traced('render')
+def render_section_body(section: Dict, image_data: List[Dict[str, str]], date_str: str,
+                        headline: Optional[str] = None, tagline: Optional[str] = None) -> str:
+    """
+    Render the tables that make up a section, without the surrounding document
+
+    Args:
+        section: Section definition
+        image_data: Image manifest rows (image_path/original_link dicts, with
+            'title', 'designer', 'price' and 'currency' for alt text and a
+            caption when the catalog has them)
+        date_str: Date of the img folder the images live in
+        headline: Large header line above the section title (defaults to
+            the section's 'headline', else DEFAULT_HEADLINE)
+        tagline: Line under the headline (likewise)
+
+    Returns:
+        str: HTML for the section's header, image rows and footer
+    """
+    headline = headline or section.get('headline', DEFAULT_HEADLINE)
+    tagline = tagline or section.get('tagline', DEFAULT_TAGLINE)
+    html_content = f"""<table width="100%" cellpadding="0" cellspacing="0" border="0" style="min-width: 100%;">
+    <tr>
+        <td align="center" style="padding: 20px 0;">
+            <span style="font-size:19px">{headline}</span><br />
+            {tagline}<br />
+            &nbsp;
+        </td>
+    </tr>
+    <tr>
+        <td align="center" style="padding-bottom: 20px;">
+            {section['title']}<br />
+            <span style="font-size:18px">
+                <a href="{section['header_url']}" target="_blank" style="color:#0000FF">
+                    {section['header_text']}
+                </a>
+            </span>
+        </td>
+    </tr>
+</table>
+"""
+
+    # Add model images in groups of three
+    for i in range(0, len(image_data), 3):
+        html_content += """<table width="100%" cellpadding="0" cellspacing="0" border="0" style="min-width: 100%;">
+    <tr>
+        <td align="center">
+            <table cellpadding="10" cellspacing="0" border="0">
+                <tr>"""
+
+        # Process up to three images per row
+        for j in range(3):
+            if i + j < len(image_data):
+                img = image_data[i + j]
+                github_url = get_github_raw_url(section, img['image_path'], date_str)
+                alt = escape(metadata.alt_text(img))
+                caption = metadata.caption(img)
+                html_content += f"""
+                    <td style="vertical-align: top;">
+                        <a href="{img['original_link']}" target="_blank" style="text-decoration: none;">
+                            <img src="{github_url}" alt="{alt}" width="300" height="400" style="display: block; width: 300px; height: 400px; object-fit: cover; object-position: center;" />
+                        </a>"""
+                if caption:
+                    html_content += f"""
+                        <div style="width: 300px; padding-top: 6px; font-size: 14px; color: #333333;">{escape(caption)}</div>"""
+                html_content += """
+                    </td>"""
+            else:
+                # Add empty cell to maintain structure
+                html_content += """
+                    <td width="300" style="vertical-align: top;">&nbsp;</td>"""
+
+        html_content += """
+                </tr>
+            </table>
+        </td>
+    </tr>
+</table>
+"""
+
+    html_content += f"""
+<table width="100%" cellpadding="0" cellspacing="0" border="0" style="min-width: 100%;">
+    <tr>
+        <td align="center" style="padding: 20px 0;">
+            <a href="{section['footer_url']}" target="_blank" style="font-size:18px; text-decoration: none;">
+                {section['footer_text']}
+            </a>
+        </td>
+    </tr>
+</table>
+"""
+    return html_content
+
+
+def render_showcase_html(section: Dict, image_data: List[Dict[str, str]], date_str: str) -> str:
+    """Render a section's HTML blob from its image manifest rows"""
+    return f"""
+<!DOCTYPE html>
+<html>
+<head>
+</head>
+<body>
+{render_section_body(section, image_data, date_str)}</body>
+</html>
+"""
+
+
+def generate_showcase_html(section: Dict, date_str: str,
+                           image_data: Optional[List[Dict[str, str]]] = None) -> Optional[str]:
+    """Generate HTML showcase of downloaded models"""
+    print("\n🎨 Generating HTML showcase...")
+
+    if image_data is None:
+        image_data = load_manifest(section, date_str)
+    if image_data is None:
+        print("❌ No image manifest found in the catalog or as a CSV!")
+        return None
+
+    html_content = render_showcase_html(section, image_data, date_str)
+
+    output_filename = blob_name(section, date_str)
+    with atomic_write(section_path(section, output_filename), encoding='utf-8') as f:
+        f.write(html_content)
+
+    print(f"✅ Generated HTML showcase: {output_filename}")
+    return output_filename
+
+
+def manifest_outputs(section: Dict, date_str: str, csv_filename: Optional[str] = None) -> List[str]:
+    """Every image the date's catalog run references plus the exported CSV, relative to the section folder"""
+    run = catalog.get_run(section['name'], date_str)
+    if not run:
+        return []
+    outputs = [row['image_path'] for row in catalog.run_manifest(run['id'])]
+    return outputs + [csv_filename] if csv_filename else outputs
+
+
+def run_section(name: str, date_str: Optional[str] = None, force: bool = False,
+                limit: Optional[int] = None, stage_workers: Optional[Dict[str, int]] = None,
+                resume: bool = False, export_csv: bool = True,
+                links: Optional[List[Dict]] = None, delta: bool = False) -> Optional[str]:
+    """
+    Run every stage of a section, skipping the ones whose inputs haven't changed
+
+    When the link list has to be fetched, discovery feeds the thumbnail
+    pipeline directly, so thumbnails start downloading with the first link.
+    Each finished unit of work is journaled, so an interrupted run can pick
+    up where it stopped.
+
+    Args:
+        name: Section folder name (see newsletter.sections.SECTIONS)
+        date_str: Run date as YYYYMMDD (defaults to today)
+        force: Rebuild every stage even if its fingerprint matches
+        limit: Keep at most this many models (None for all)
+        stage_workers: Per-stage worker counts overriding STAGE_WORKERS
+        resume: Skip the units of work an interrupted run for this date already finished
+        export_csv: Also export the links and image manifest as dated CSVs
+        links: Models allocated to the section (see newsletter.allocation),
+            shown instead of the ones its source would give
+        delta: Check the live source even on a same-day rerun, and only
+            process the models that changed since the last run (see newsletter.delta)
+
+    Returns:
+        Optional[str]: Filename of the generated HTML blob
+    """
+    section = get_section(name)
+    date_str = date_str or today_str()
+    print(f"🚀 Starting {section['label']} Generator\n")
+
+    journal = Journal(journal_path(section['folder'], date_str), resume=resume)
+    try:
+        return _run_section_stages(section, date_str, force, limit, stage_workers, journal, export_csv,
+                                   links, delta)
+    finally:
+        journal.close()
+
+
+def _run_section_stages(section: Dict, date_str: str, force: bool, limit: Optional[int],
+                        stage_workers: Optional[Dict[str, int]], journal: Journal,
+                        export_csv: bool, links: Optional[List[Dict]] = None,
+                        delta: bool = False) -> Optional[str]:
+    """The memoized stages of run_section(), recording progress in journal"""
+    folder = section['folder']
+    version = buildcache.code_version(*CODE_FILES)
+    config = SECTIONS[section['name']]
+    state = buildcache.load_state(folder)
+
+    # Stage 1: link list. The live page can only be checked by fetching it,
+    # so the list is keyed on the run date and reused for same-day reruns
+    # (a delta run always fetches it, and compares what it finds instead).
+    if section['source'] == 'designers':
+        sources = buildcache.file_digest(designer_links_file(section))
+    else:
+        sources = section['listing_url']
+    # Allocated links only join the key when there are any, so plain runs keep their fingerprints
+    allocated = [[link['url'] for link in links]] if links is not None else []
+    links_fp = buildcache.fingerprint('links', version, config, sources, date_str, limit, export_csv, *allocated)
+    links_csv = links_csv_name(section, date_str) if export_csv else None
+    image_csv = image_csv_name(section, date_str) if export_csv else None
+
+    def thumbnails_fingerprint():
+        # Stage 2: thumbnail manifest, keyed on the link list contents
+        return buildcache.fingerprint(
+            'thumbnails', version, config, date_str, export_csv,
+            buildcache.file_digest(section_path(section, section['model_links_file'])),
+        )
+
+    stage_start = time.perf_counter()
+    links_fresh = not force and not delta and buildcache.is_fresh(state, 'links', links_fp, folder)
+    metrics.cache_lookup('build_stage', hit=links_fresh)
+    if links_fresh:
+        print(f"⏭️  Link list unchanged, reusing {section['model_links_file']}")
+        thumbs_fp = thumbnails_fingerprint()
+        thumbs_fresh = (not force and buildcache.is_fresh(state, 'thumbnails', thumbs_fp, folder)
+                        and catalog.get_run(section['name'], date_str) is not None)
+        metrics.cache_lookup('build_stage', hit=thumbs_fresh)
+        if thumbs_fresh:
+            print(f"⏭️  Thumbnails unchanged, reusing the catalog run for {date_str}")
+        else:
+            download_thumbnails(section, date_str, stage_workers, journal, export_csv)
+            buildcache.record_stage(state, 'thumbnails', thumbs_fp,
+                                    manifest_outputs(section, date_str, image_csv), folder)
+            buildcache.save_state(folder, state)
+    elif delta:
+        _run_delta_stages(section, date_str, limit, stage_workers, journal, export_csv, links,
+                          None if force else state, thumbnails_fingerprint)
+        link_outputs = [section['model_links_file']] + ([links_csv] if links_csv else [])
+        buildcache.record_stage(state, 'links', links_fp, link_outputs, folder)
+        buildcache.record_stage(state, 'thumbnails', thumbnails_fingerprint(),
+                                manifest_outputs(section, date_str, image_csv), folder)
+        buildcache.save_state(folder, state)
+    else:
+        # Stream discovery straight into the thumbnail pipeline
+        build_thumbnails(section, date_str,
+                         discover_model_links(section, date_str, limit, journal, export_csv, links),
+                         stage_workers, journal, export_csv)
+        link_outputs = [section['model_links_file']] + ([links_csv] if links_csv else [])
+        buildcache.record_stage(state, 'links', links_fp, link_outputs, folder)
+        buildcache.record_stage(state, 'thumbnails', thumbnails_fingerprint(),
+                                manifest_outputs(section, date_str, image_csv), folder)
+        buildcache.save_state(folder, state)
+    metrics.add_time('stages', f"{section['name']}.links+thumbnails", time.perf_counter() - stage_start)
+
+    # Stage 3: rendered section, keyed on the manifest and the template code
+    with metrics.timer('stages', f"{section['name']}.render"):
+        image_data = load_manifest(section, date_str)
+        render_fp = buildcache.fingerprint('render', version, config, date_str, image_data)
+        output_filename = blob_name(section, date_str)
+        render_fresh = not force and buildcache.is_fresh(state, 'render', render_fp, folder)
+        metrics.cache_lookup('build_stage', hit=render_fresh)
+        if render_fresh:
+            print(f"⏭️  Section unchanged, keeping {output_filename}")
+        else:
+            output_filename = generate_showcase_html(section, date_str, image_data)
+            if output_filename:
+                buildcache.record_stage(state, 'render', render_fp, [output_filename], folder)
+                buildcache.save_state(folder, state)
+                journal.record('render', output=output_filename)
+
+    print("\n✨ Process completed successfully!")
+    return output_filename
+
+
+def _run_delta_stages(section: Dict, date_str: str, limit: Optional[int],
+                      stage_workers: Optional[Dict[str, int]], journal: Journal, export_csv: bool,
+                      links: Optional[List[Dict]], state: Optional[Dict], thumbnails_fingerprint) -> None:
+    """
+    Links and thumbnails of a delta run: discover the whole link list, then
+    process only what changed since the section's last run
+
+    Args:
+        state: Build state, or None to rebuild even if the list is unchanged
+        thumbnails_fingerprint: Callable giving the thumbnail stage's
+            fingerprint once the link list is saved
+    """
+    # The whole list is needed to tell whether anything changed
+    items = list(discover_model_links(section, date_str, limit, journal, export_csv, links))
+    run = catalog.get_run(section['name'], date_str)
+    unchanged = (state is not None and run is not None
+                 and buildcache.is_fresh(state, 'thumbnails', thumbnails_fingerprint(), section['folder']))
+    metrics.cache_lookup('build_stage', hit=unchanged)
+    if unchanged:
+        print(f"⏭️  Source unchanged since this date's last build, reusing the catalog run for {date_str}")
+        if export_csv:
+            # Rewriting the links CSV emptied the Link Text filled in from model titles
+            fill_link_text(section, date_str, catalog.run_images(run['id']))
+        return
+
+    baseline = load_baseline(section, date_str)
+    if baseline:
+        counts = diff_links(baseline, items)
+        print(f"🔀 Since {baseline['date']}: {counts['new']} new, {counts['unchanged']} unchanged, "
+              f"{counts['dropped']} dropped")
+    build_thumbnails(section, date_str, items, stage_workers, journal, export_csv, baseline)
+
+
+def parse_stage_workers(value: str) -> Dict[str, int]:
+    """Parse a 'resolve=4,download=8' style option into per-stage worker counts"""
+    workers = {}
+    for pair in value.split(','):
+        stage, _, count = pair.partition('=')
+        stage = stage.strip()
+        if stage not in STAGE_WORKERS or not count.strip().isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(
+                f"expected STAGE=N with STAGE one of {', '.join(STAGE_WORKERS)}, got '{pair}'")
+        workers[stage] = int(count)
+    return workers
+
+
+def section_main(name: str) -> None:
+    """Command-line entry point shared by the per-section generator scripts"""
+    parser = argparse.ArgumentParser(description=f"Generate the {SECTIONS[name]['label']} section")
+    parser.add_argument('--date', default=today_str(),
+                        help='Run date as YYYYMMDD, used for output filenames (default: today)')
+    parser.add_argument('--limit', type=int,
+                        help='Keep at most this many models')
+    parser.add_argument('--force', action='store_true',
+                        help='Rebuild every stage even if its inputs are unchanged')
+    parser.add_argument('--stage-workers', type=parse_stage_workers, metavar='STAGE=N,...',
+                        help=f"Worker threads per pipeline stage (default: "
+                             f"{','.join(f'{k}={v}' for k, v in STAGE_WORKERS.items())})")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted run for this date, skipping the work it finished")
+    parser.add_argument('--no-csv', action='store_true',
+                        help="Only record the run in the catalog, without exporting dated CSVs")
+    parser.add_argument('--delta', action='store_true',
+                        help="Only process the models that changed since the last run, reusing the rest")
+    parser.add_argument('--trace', metavar='FILE',
+                        help=f"Write a Chrome trace of the run to FILE (or set {tracing.TRACE_ENV})")
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help="Write cProfile stats and collapsed stacks to DIR (default: profiles/DATE)")
+    args = parser.parse_args()
+
+    try:
+        with tracing.tracing_to(tracing.trace_path(args.trace)), \
+                profiling.profiling_to(profiling.profile_dir(args.profile, args.date)), \
+                profiling.section(name), metrics.timer('sections', name):
+            run_section(name, date_str=args.date, force=args.force, limit=args.limit,
+                        stage_workers=args.stage_workers, resume=args.resume, export_csv=not args.no_csv,
+                        delta=args.delta)
+    except SectionError as e:
+        print(f"❌ {e}")
+        metrics.incr('failures', f"section.{name}")
+        sys.exit(1)
+    finally:
+        metrics.write_report(ROLLUP_DIR, args.date, name)
@@ -0,0 +1,104 @@
+"""
+Several newsletters (brands, regions, audience segments) built in one run.
+
+A tenants file is a JSON list of newsletter definitions, e.g.
+
+    [
+        {"name": "makers-eu", "headline": "Print This Weekend",
+         "sections": ["free-models",
+                      {"section": "premium-designs", "models_per_source": 2,
+                       "links_file": "eu_designers.txt"}]}
+    ]
+
+Each tenant's copy of a section is registered as a section of its own,
+named tenants/<tenant>/<section>, with its own folder, build state, catalog
+runs, CSVs, img/ tree and blob. A section entry may override any key of the
+base section's definition (see newsletter.sections). All the copies run in
+one process (generate_newsletter.py --tenants), so they share the HTTP
+session, the source page and thumbnail caches, the image store and the
+transcodes: a model that five tenants show is fetched, downloaded and
+transcoded once, then copied into each tenant's folder.
+"""
+import json
+import os
+import re
+from typing import Dict, List
+
+from newsletter import REPO_ROOT
+from newsletter.sections import SECTIONS
+
+TENANTS_DIR = os.path.join(REPO_ROOT, 'tenants')
+
+# Tenant names become folder names and part of the images' GitHub URLs
+TENANT_NAME = re.compile(r'^[a-z0-9][a-z0-9_-]*$')
+
+
+def tenant_folder(name: str) -> str:
+    """Where a tenant's sections and its rollup live"""
+    return os.path.join(TENANTS_DIR, name)
+
+
+def register_tenant(tenant: Dict, config_dir: str = REPO_ROOT) -> Dict:
+    """
+    Add a tenant's copies of its sections to newsletter.sections.SECTIONS
+
+    Args:
+        tenant: Definition with a 'name', its 'sections' (section names, or
+            dicts with a 'section' name and keys to override) and optionally
+            'headline' and 'tagline' for every section
+        config_dir: Folder a section's 'links_file' is relative to
+
+    Returns:
+        Dict: The definition with 'sections' replaced by the registered
+        section names, in order
+    """
+    name = tenant['name']
+    registered = []
+    for entry in tenant.get('sections') or []:
+        overrides = dict(entry) if isinstance(entry, dict) else {'section': entry}
+        base = overrides.pop('section', None)
+        if base not in SECTIONS or base.startswith('tenants/'):
+            raise ValueError(f"Tenant '{name}' lists unknown section '{base}'")
+        section_name = f"tenants/{name}/{base}"
+        if section_name in registered:
+            raise ValueError(f"Tenant '{name}' lists section '{base}' twice")
+
+        definition = {**SECTIONS[base], **overrides}
+        definition['label'] = overrides.get('label', f"{SECTIONS[base]['label']} ({name})")
+        for key in ('headline', 'tagline'):
+            if key in tenant and key not in overrides:
+                definition[key] = tenant[key]
+        if definition['source'] == 'designers':
+            # Read from the base section's folder unless the tenant brings its own list
+            definition['links_file'] = (os.path.join(config_dir, overrides['links_file']) if 'links_file' in overrides
+                                        else os.path.join(REPO_ROOT, base, SECTIONS[base].get('links_file', 'links.txt')))
+        SECTIONS[section_name] = definition
+        registered.append(section_name)
+
+    if not registered:
+        raise ValueError(f"Tenant '{name}' has no sections")
+    return {**tenant, 'sections': registered}
+
+
+def load_tenants(path: str) -> List[Dict]:
+    """
+    Load tenant definitions from a JSON file and register their sections
+
+    Args:
+        path: JSON file holding a list of tenants (see register_tenant)
+
+    Returns:
+        List[Dict]: The tenants, each with its registered section names
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tenants = json.load(f)
+
+    names = [tenant.get('name') for tenant in tenants]
+    if not all(names) or len(set(names)) != len(names):
+        raise ValueError(f"Every tenant in {path} needs a unique 'name'")
+    invalid = [name for name in names if not TENANT_NAME.match(name)]
+    if invalid:
+        raise ValueError(f"Tenant names must be lower-case folder names, got: {', '.join(invalid)}")
+
+    config_dir = os.path.dirname(os.path.abspath(path))
+    return [register_tenant(tenant, config_dir) for tenant in tenants]
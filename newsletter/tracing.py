@@ -0,0 +1,123 @@
+"""
+Span tracing in the Chrome trace event format.
+
+Wrap hot paths in span('name') (or decorate them with traced('name')) and,
+when tracing is enabled, each call becomes a complete event on the track of
+the thread that ran it, so sections, pipeline workers and the rollup each get
+their own row in chrome://tracing or https://ui.perfetto.dev. Tracing is off
+by default: span() then returns a shared no-op context manager and traced()
+costs one flag check per call.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+from newsletter.journal import atomic_write
+
+# Set to a file path to trace any entry point without its --trace option
+TRACE_ENV = 'NEWSLETTER_TRACE'
+
+_NULL_SPAN = nullcontext()
+
+_enabled = False
+_origin = 0.0
+_events: List[Dict] = []
+_threads: Dict[int, str] = {}
+
+
+def enable() -> None:
+    """Start recording spans, discarding any recorded before"""
+    global _enabled, _origin
+    _events.clear()
+    _threads.clear()
+    _origin = time.perf_counter()
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def _record(name: str, category: str, args: Dict):
+    thread = threading.current_thread()
+    _threads.setdefault(thread.ident, thread.name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        # list.append is atomic, so worker threads need no lock
+        _events.append({
+            'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': thread.ident,
+            'ts': (start - _origin) * 1e6, 'dur': (end - start) * 1e6, 'args': args,
+        })
+
+
+def span(name: str, category: str = 'newsletter', **args):
+    """
+    Time the enclosed block as one event, when tracing is enabled
+
+    Args:
+        name: Event name shown on the track
+        category: Event category, for filtering in the viewer
+        **args: Extra details shown when the event is selected (e.g. url=...)
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _record(name, category, args)
+
+
+def traced(name: str, category: str = 'newsletter'):
+    """Decorator recording every call of a function as a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _record(name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_trace(path: str) -> int:
+    """
+    Write the recorded spans as a Chrome trace JSON file
+
+    Returns:
+        int: Number of spans written
+    """
+    pid = os.getpid()
+    metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'newsletter'}}]
+    metadata += [
+        {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+        for tid, thread_name in _threads.items()
+    ]
+    events = sorted(_events, key=lambda event: event['ts'])
+    with atomic_write(path, encoding='utf-8') as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
+
+
+def trace_path(option: Optional[str]) -> Optional[str]:
+    """Trace file for an entry point: its --trace option, else the NEWSLETTER_TRACE variable"""
+    return option or os.environ.get(TRACE_ENV) or None
+
+
+@contextmanager
+def tracing_to(path: Optional[str]):
+    """Trace the enclosed block into path, or do nothing when path is None"""
+    if not path:
+        yield
+        return
+    enable()
+    try:
+        yield
+    finally:
+        count = write_trace(path)
+        print(f"🧵 Wrote {count} spans to {path} (open it in chrome://tracing or ui.perfetto.dev)")
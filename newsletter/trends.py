@@ -0,0 +1,150 @@
+"""
+Leaderboard trends across the catalog's ranking snapshots.
+
+Snapshots are laid out as one (snapshots x models) matrix of ranks, with NaN
+where a model wasn't listed, so rank deltas, velocity (least-squares rank
+change per day over a window) and "new this week" flags are computed for
+every model at once with array operations rather than per-model loops.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from newsletter import catalog
+
+DEFAULT_WINDOW_DAYS = 28  # history the velocity is fitted over
+NEW_DAYS = 7  # a model first listed this recently counts as new
+
+
+def parse_dates(date_strs: List[str]) -> np.ndarray:
+    """YYYYMMDD strings to a datetime64[D] array"""
+    return np.array([f"{d[:4]}-{d[4:6]}-{d[6:8]}" for d in date_strs], dtype='datetime64[D]')
+
+
+def rank_matrix(snapshots: List[Tuple[str, bytes]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lay snapshots out as a rank matrix
+
+    Args:
+        snapshots: (date, packed Thangs IDs) pairs in date order, as returned
+            by catalog.load_snapshots()
+
+    Returns:
+        Tuple: dates (datetime64[D], one per snapshot), ids (every Thangs ID
+        seen, sorted) and ranks (float, snapshots x ids, 1-based, NaN where
+        a model wasn't listed)
+    """
+    dates = parse_dates([date for date, _ in snapshots])
+    arrays = [np.frombuffer(blob, dtype=np.int64) for _, blob in snapshots]
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    if not lengths.sum():
+        return dates, np.empty(0, dtype=np.int64), np.full((len(arrays), 0), np.nan)
+
+    ids, columns = np.unique(np.concatenate(arrays), return_inverse=True)
+    rows = np.repeat(np.arange(len(arrays)), lengths)
+    # Position within its own snapshot: global index minus the snapshot's offset
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.arange(lengths.sum()) - offsets + 1
+
+    ranks = np.full((len(arrays), len(ids)), np.nan)
+    ranks[rows, columns] = positions
+    return dates, ids, ranks
+
+
+def trend_scores(dates: np.ndarray, ranks: np.ndarray, window_days: int = DEFAULT_WINDOW_DAYS,
+                 new_days: int = NEW_DAYS) -> Dict[str, np.ndarray]:
+    """
+    Score every model's movement, vectorized over the whole matrix
+
+    Args:
+        dates: Snapshot dates from rank_matrix()
+        ranks: Rank matrix from rank_matrix()
+        window_days: How far back the velocity fit looks
+        new_days: How recently a model must have first been listed to be new
+
+    Returns:
+        Dict[str, np.ndarray]: Per-model arrays: 'rank' (latest, NaN if not
+        listed), 'delta' (places climbed since the previous snapshot),
+        'velocity' (places climbed per day over the window), 'new' and
+        'first_seen'
+    """
+    n_snapshots, n_models = ranks.shape
+    latest = dates[-1]
+    present = ~np.isnan(ranks)
+
+    current = ranks[-1]
+    previous = ranks[-2] if n_snapshots > 1 else np.full(n_models, np.nan)
+    delta = previous - current
+
+    # Least-squares slope of rank against day, over the snapshots in the window
+    days = (dates - latest).astype(np.float64)
+    mask = present & (days >= -window_days)[:, None]
+    x = np.where(mask, days[:, None], 0.0)
+    y = np.where(mask, ranks, 0.0)
+    n = mask.sum(axis=0)
+    sx, sy = x.sum(axis=0), y.sum(axis=0)
+    sxx, sxy = (x * x).sum(axis=0), (x * y).sum(axis=0)
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(denominator > 0, (n * sxy - sx * sy) / denominator, np.nan)
+    # A falling rank number means the model is climbing; subtracting from 0.0
+    # rather than negating keeps flat lines at +0.0
+    velocity = 0.0 - slope
+
+    first_seen = dates[present.argmax(axis=0)]
+    cutoff = latest - np.timedelta64(new_days, 'D')
+    # Without history from before the cutoff, every model would look new
+    new = (first_seen > cutoff) & (dates[0] <= cutoff)
+
+    return {'rank': current, 'delta': delta, 'velocity': velocity, 'new': new, 'first_seen': first_seen}
+
+
+def leaderboard_trends(source: str, window_days: int = DEFAULT_WINDOW_DAYS,
+                       new_days: int = NEW_DAYS) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load a listing's snapshots from the catalog and score them
+
+    Returns:
+        Optional[Dict[str, np.ndarray]]: trend_scores() plus 'ids', or None
+        if the listing has no snapshots yet
+    """
+    snapshots = catalog.load_snapshots(source)
+    if not snapshots:
+        return None
+    dates, ids, ranks = rank_matrix(snapshots)
+    trends = trend_scores(dates, ranks, window_days, new_days)
+    trends['ids'] = ids
+    return trends
+
+
+def riser_order(trends: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Indices of the currently listed models, fastest risers first
+
+    Ties (and models with a single data point) fall back to new models
+    first, then the current rank.
+    """
+    listed = np.flatnonzero(~np.isnan(trends['rank']))
+    velocity = np.nan_to_num(trends['velocity'][listed], nan=0.0)
+    order = np.lexsort((trends['rank'][listed], ~trends['new'][listed], -velocity))
+    return listed[order]
+
+
+def order_links_by_trend(links: List[Dict[str, str]], source: str) -> List[Dict[str, str]]:
+    """
+    Reorder a listing's links so the fastest risers come first
+
+    Links without a numeric model ID, or not in the latest snapshot, keep
+    their relative order after the ranked ones.
+    """
+    trends = leaderboard_trends(source)
+    if trends is None:
+        return links
+
+    position = {int(trends['ids'][index]): n for n, index in enumerate(riser_order(trends))}
+    last = len(position)
+    keyed = [
+        (position.get(catalog.parse_model_url(link['url'])['thangs_id'], last), n, link)
+        for n, link in enumerate(links)
+    ]
+    return [link for _, _, link in sorted(keyed, key=lambda entry: entry[:2])]
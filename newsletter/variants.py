@@ -0,0 +1,218 @@
+"""
+Render many newsletter variants (A/B subjects, campaigns) in one pass.
+
+The section data is loaded and rendered once. Each rendered section is then
+compiled into static chunks separated by slots (every href plus the header
+copy), and every unique link is pre-split into its base URL, non-UTM query
+and fragment. Producing a variant is just building its UTM query string
+once, decorating the pre-split links with it and joining chunks and slot
+values - no section is re-rendered and no URL is re-parsed per variant.
+"""
+import html
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from newsletter.sections import DEFAULT_SECTIONS, get_section
+from newsletter.showcase import (
+    DEFAULT_HEADLINE,
+    DEFAULT_TAGLINE,
+    render_section_body,
+    resolve_manifest,
+)
+
+# Slot keys for the header copy; they can never collide with a URL
+HEADLINE_SLOT = '\x00headline\x00'
+TAGLINE_SLOT = '\x00tagline\x00'
+
+SLOT_PATTERN = re.compile('href="([^"]*)"|(\x00headline\x00|\x00tagline\x00)')
+
+
+def load_variants(path: str) -> List[Dict]:
+    """
+    Load variant definitions from a JSON file
+
+    Each variant is a dict with a unique 'name' and any of: 'subject',
+    'headline', 'tagline', 'sections' (order and subset of section names)
+    and 'utm' (query parameters appended to every link). The subject,
+    headline and tagline are plain text and are HTML-escaped when rendered.
+
+    Args:
+        path: Path to a JSON file holding a list of variants
+
+    Returns:
+        List[Dict]: The variant definitions
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        variants = json.load(f)
+
+    names = [variant.get('name') for variant in variants]
+    if not all(names) or len(set(names)) != len(names):
+        raise ValueError(f"Every variant in {path} needs a unique 'name'")
+    return variants
+
+
+def load_section_data(section_names: List[str], date_str: str) -> Dict[str, Tuple[str, List[Dict[str, str]]]]:
+    """
+    Read each section's image manifest once, skipping sections that have none
+
+    Returns:
+        Dict[str, Tuple[str, List[Dict[str, str]]]]: Section name -> the
+        manifest's run date (an earlier one when date_str has no run; its
+        images live in that date's img folder) and its rows
+    """
+    section_data = {}
+    for name in section_names:
+        resolved = resolve_manifest(get_section(name), date_str)
+        if resolved is None:
+            print(f"⚠️  No image manifest found for {name}, leaving it out")
+            continue
+        section_data[name] = resolved
+    return section_data
+
+
+def compile_section(section: Dict, image_data: List[Dict[str, str]], date_str: str) -> Tuple[List[str], List[str]]:
+    """
+    Render a section once and split it into static chunks and slots
+
+    Args:
+        section: Section definition
+        image_data: Image manifest rows for the section
+        date_str: Date of the img folder the images live in
+
+    Returns:
+        Tuple[List[str], List[str]]: chunks and slot keys, with
+        len(chunks) == len(slots) + 1. A slot key is either a link URL or
+        one of the header copy slots.
+    """
+    section_html = render_section_body(section, image_data, date_str,
+                                       headline=HEADLINE_SLOT, tagline=TAGLINE_SLOT)
+    chunks, slots = [], []
+    position = 0
+    for match in SLOT_PATTERN.finditer(section_html):
+        if match.group(1) is not None:
+            # Keep the attribute itself static, only the URL is a slot
+            chunks.append(section_html[position:match.start(1)])
+            slots.append(match.group(1))
+            position = match.end(1)
+        else:
+            chunks.append(section_html[position:match.start()])
+            slots.append(match.group(2))
+            position = match.end()
+    chunks.append(section_html[position:])
+    return chunks, slots
+
+
+def prepare_links(urls) -> Dict[str, Tuple[str, str, str]]:
+    """
+    Pre-split every unique link so decorating it later is plain concatenation
+
+    Existing utm_* parameters are dropped here, so a variant's tags replace
+    them rather than being appended twice.
+
+    Returns:
+        Dict[str, Tuple[str, str, str]]: URL -> (base, query without UTM tags, '#fragment')
+    """
+    prepared = {}
+    for url in set(urls):
+        parts = urlsplit(url)
+        base = url.split('#', 1)[0].split('?', 1)[0]
+        query = '&'.join(
+            pair for pair in parts.query.split('&')
+            if pair and not pair.startswith('utm_')
+        )
+        prepared[url] = (base, query, f"#{parts.fragment}" if parts.fragment else '')
+    return prepared
+
+
+def decorate_links(prepared: Dict[str, Tuple[str, str, str]], utm: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Apply one variant's UTM tags to every prepared link in a single batch"""
+    if not utm:
+        return {url: url for url in prepared}
+    utm_query = urlencode(utm)
+    return {
+        url: f"{base}?{query}&{utm_query}{fragment}" if query else f"{base}?{utm_query}{fragment}"
+        for url, (base, query, fragment) in prepared.items()
+    }
+
+
+def fill_slots(chunks: List[str], slots: List[str], values: Dict[str, str]) -> str:
+    """Interleave static chunks with the values for their slots"""
+    parts = [''] * (len(chunks) + len(slots))
+    parts[0::2] = chunks
+    parts[1::2] = [values[slot] for slot in slots]
+    return ''.join(parts)
+
+
+def render_variants(variants: List[Dict], date_str: str,
+                    section_names: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Render every variant from a single load of the section data
+
+    Args:
+        variants: Variant definitions (see load_variants)
+        date_str: Run date as YYYYMMDD
+        section_names: Sections to load (defaults to every section any
+            variant asks for, or the weekly send's sections)
+
+    Returns:
+        Dict[str, str]: Variant name -> complete HTML document
+    """
+    if section_names is None:
+        section_names = []
+        for variant in variants:
+            for name in variant.get('sections', DEFAULT_SECTIONS):
+                if name not in section_names:
+                    section_names.append(name)
+
+    section_data = load_section_data(section_names, date_str)
+    compiled = {
+        name: compile_section(get_section(name), image_data, manifest_date)
+        for name, (manifest_date, image_data) in section_data.items()
+    }
+    prepared = prepare_links(
+        slot for _, slots in compiled.values() for slot in slots
+        if slot not in (HEADLINE_SLOT, TAGLINE_SLOT)
+    )
+
+    rendered = {}
+    for variant in variants:
+        values = decorate_links(prepared, variant.get('utm'))
+        # Campaign copy is text; the sections' own copy is markup from sections.py
+        headline = html.escape(variant['headline']) if variant.get('headline') else None
+        tagline = html.escape(variant['tagline']) if variant.get('tagline') else None
+
+        parts = []
+        for name in variant.get('sections', section_names):
+            if name not in compiled:
+                continue
+            # Same precedence as render_section_body: the variant's copy, the section's, the default
+            section = get_section(name)
+            values[HEADLINE_SLOT] = headline or section.get('headline', DEFAULT_HEADLINE)
+            values[TAGLINE_SLOT] = tagline or section.get('tagline', DEFAULT_TAGLINE)
+            parts.append(fill_slots(*compiled[name], values))
+        body = ''.join(parts)
+        rendered[variant['name']] = f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>{html.escape(variant.get('subject', 'Thangs Newsletter'))}</title>
+</head>
+<body>
+{body}</body>
+</html>
+"""
+    return rendered
+
+
+def write_variants(rendered: Dict[str, str], output_dir: str) -> List[str]:
+    """Write each rendered variant to <output_dir>/<name>.html"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, document in rendered.items():
+        path = os.path.join(output_dir, f"{name}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(document)
+        paths.append(path)
+    return paths
@@ -0,0 +1,265 @@
+"""
+The deep crawl as queue jobs, so any number of worker processes (on one
+machine or several) share one crawl.
+
+One machine's politeness budget caps how fast newsletter.crawl can page
+through whole categories. Here the crawl is split into the stages of
+newsletter.jobqueue jobs, and every worker leases whatever is ready:
+
+- fetch: GET a listing page or a model page (at the worker's own --rate)
+  and queue a parse job carrying the compressed body
+- parse: read a listing page's model links, queue the next page's fetch
+  and, with thumbnails on, a fetch of each model page (or, when the
+  page's state blob gives the thumbnails, a transcode of each; see
+  newsletter.pagestate); or read a model page's metadata and queue a
+  transcode of its thumbnail
+- transcode: download a thumbnail into the image store and scale it, so
+  the next newsletter build finds it done
+
+Job keys are the page or image URLs, so a model linked from ten listings is
+fetched once, and a job re-run after a lost lease changes nothing. Workers
+never write the catalog: each job's result stays in the queue, and the
+process that seeded the crawl collects them into the catalog (models,
+leaderboard snapshots) and the thumbnail cache once the queue has drained.
+The image store is per machine unless cache.IMAGE_STORE is on shared storage,
+so transcode jobs are best left to workers whose store the builds read.
+"""
+import base64
+import hashlib
+import os
+import socket
+import time
+import zlib
+from itertools import count
+from typing import Callable, Dict, Iterable, List
+
+from newsletter import cache, canonical
+from newsletter.pagestate import listing_models
+from newsletter.crawl import (BATCH_SIZE, DEFAULT_MAX_PAGES, DEFAULT_RATE, ModelLinkParser, ModelRecord,
+                              listing_page_url, store_records)
+from newsletter.jobqueue import LEASE_SECONDS, MAX_ATTEMPTS
+from newsletter.prewarm import RateLimiter
+
+JOB_KINDS = ('fetch', 'parse', 'transcode')
+POLL_INTERVAL = 2  # seconds an idle worker waits before asking again
+PROGRESS_EVERY = 100  # jobs between a worker's progress lines
+
+
+def queue_path(date_str: str) -> str:
+    """Default queue file of the crawl for a date; each crawl needs its own, since finished jobs are never redone"""
+    return os.path.join(cache.CACHE_DIR, f"crawl_queue-{date_str}.sqlite3")
+
+
+class JobError(Exception):
+    """A job that failed and should be retried"""
+
+
+def job_key(kind: str, payload: Dict) -> str:
+    """The idempotency key of a job: its kind and the page (or model, or image) it is about"""
+    if payload.get('as') == 'model':
+        return f"{kind}:model:{canonical.thumbnail_key(payload['url'])}"
+    return f"{kind}:{payload['url']}"
+
+
+def _pack(text: str) -> str:
+    return base64.b64encode(zlib.compress(text.encode('utf-8'))).decode('ascii')
+
+
+def _unpack(body: str) -> str:
+    return zlib.decompress(base64.b64decode(body)).decode('utf-8')
+
+
+def _digest(urls: List[str]) -> str:
+    return hashlib.sha1('\n'.join(urls).encode('utf-8')).hexdigest()
+
+
+def enqueue_crawl(queue, urls: Iterable[str], max_pages: int = DEFAULT_MAX_PAGES,
+                  thumbnails: bool = False) -> int:
+    """
+    Seed a crawl: queue the first page of every listing or designer page
+
+    Returns:
+        int: How many were new to the queue
+    """
+    added = 0
+    for url in urls:
+        payload = {'url': url, 'as': 'listing', 'source': url, 'page': 1, 'max_pages': max_pages,
+                   'thumbnails': thumbnails, 'previous': None}
+        added += queue.put('fetch', job_key('fetch', payload), payload)
+    return added
+
+
+def run_fetch(queue, payload: Dict, limiter: RateLimiter) -> Dict:
+    from newsletter.showcase import make_request
+
+    limiter.wait()
+    response = make_request(payload['url'])
+    if not response:
+        raise JobError(f"couldn't fetch {payload['url']}")
+    parse = {**payload, 'body': _pack(response.text)}
+    queue.put('parse', job_key('parse', parse), parse)
+    return {'status': response.status_code, 'bytes': len(response.content)}
+
+
+def run_parse(queue, payload: Dict, limiter: RateLimiter) -> Dict:
+    html = _unpack(payload['body'])
+    if payload['as'] == 'model':
+        from newsletter.metadata import parse_model_page
+
+        record = parse_model_page(html, payload['url'])
+        if not record['thumbnail_url']:
+            return {'url': payload['url'], 'metadata': None}
+        transcode = {'url': record['thumbnail_url']}
+        queue.put('transcode', job_key('transcode', transcode), transcode)
+        return {'url': payload['url'], 'metadata': record}
+
+    # The page's state blob, when it has one, also gives every model's thumbnail
+    state = listing_models(html)
+    if state:
+        records = [ModelRecord(model['url'], model['metadata']['title'] or '', model['thangs_id']) for model in state]
+    else:
+        parser = ModelLinkParser()
+        parser.feed(html)
+        parser.close()
+        records = parser.records
+    urls = [record.url for record in records]
+    digest = _digest(urls)
+    # Past the end (or on a listing that ignores the page parameter) a page repeats the previous one
+    repeated = digest == payload['previous']
+    last = not urls or repeated or payload['page'] >= payload['max_pages']
+    if not last:
+        page = payload['page'] + 1
+        fetch = {**payload, 'url': listing_page_url(payload['source'], page), 'page': page, 'previous': digest}
+        del fetch['body']
+        queue.put('fetch', job_key('fetch', fetch), fetch)
+    if repeated:
+        records, state = [], None
+    if payload['thumbnails']:
+        for model in state or []:
+            transcode = {'url': model['metadata']['thumbnail_url']}
+            queue.put('transcode', job_key('transcode', transcode), transcode)
+        for record in records if not state else []:
+            fetch = {'url': record.url, 'as': 'model'}
+            queue.put('fetch', job_key('fetch', fetch), fetch)
+    return {'source': payload['source'], 'page': payload['page'], 'last': last,
+            'models': [[record.url, record.text, record.thangs_id] for record in records],
+            'page_state': [[model['url'], model['metadata']] for model in state or []]}
+
+
+def run_transcode(queue, payload: Dict, limiter: RateLimiter) -> Dict:
+    from newsletter.showcase import transcoded_image
+
+    transcoded = transcoded_image(payload['url'])
+    if not transcoded:
+        raise JobError(f"couldn't download {payload['url']}")
+    path, digest = transcoded
+    return {'sha256': digest, 'size': os.path.getsize(path)}
+
+
+HANDLERS: Dict[str, Callable[..., Dict]] = {'fetch': run_fetch, 'parse': run_parse, 'transcode': run_transcode}
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(queue, kinds: Iterable[str] = JOB_KINDS, rate: float = DEFAULT_RATE,
+               lease_seconds: float = LEASE_SECONDS, wait: bool = False) -> Dict[str, int]:
+    """
+    Lease and run jobs until the queue has drained
+
+    Args:
+        queue: A newsletter.jobqueue backend
+        kinds: Job kinds this worker takes
+        rate: Most fetches per minute from this worker
+        lease_seconds: How long a job may run before another worker may take it over
+        wait: Keep polling an empty queue instead of exiting, for workers
+            started before the crawl is seeded
+
+    Returns:
+        Dict[str, int]: Counts of jobs 'done' and 'failed'
+    """
+    kinds, owner, limiter = list(kinds), worker_name(), RateLimiter(rate)
+    stats = {'done': 0, 'failed': 0}
+    while True:
+        job = queue.lease(kinds, owner, lease_seconds)
+        if job is None:
+            counts = queue.counts()
+            if not wait and not counts['queued'] and not counts['leased']:
+                return stats
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        try:
+            result = HANDLERS[job.kind](queue, job.payload, limiter)
+        except Exception as e:
+            state = queue.fail(job, str(e))
+            stats['failed'] += 1
+            print(f"⚠️  {job.key}: {e} (attempt {job.attempts}, {state})")
+            continue
+        queue.complete(job, result)
+        stats['done'] += 1
+        if stats['done'] % PROGRESS_EVERY == 0:
+            print(f"📦 {owner}: {stats['done']} jobs done")
+
+
+def iter_results(queue, url: str, stats: Dict[str, int]) -> Iterable[ModelRecord]:
+    """The crawled records of one listing, page by page, from its parse jobs' results"""
+    for page in count(1):
+        result = queue.result(job_key('parse', {'url': listing_page_url(url, page)}))
+        if result is None:
+            return
+        stats['pages'] += 1
+        for model_url, text, thangs_id in result['models']:
+            yield ModelRecord(model_url, text, thangs_id)
+        if result['last']:
+            return
+
+
+def collect_crawl(queue, urls: Iterable[str], date_str: str, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Write a drained crawl's results to the catalog and the thumbnail cache
+
+    Returns:
+        Dict[str, int]: Totals of 'pages', 'models', 'batches' and model page 'metadata' records
+    """
+    totals = {'pages': 0, 'models': 0, 'batches': 0, 'metadata': 0}
+    for url in urls:
+        stats = {'pages': 0, 'models': 0, 'batches': 0}
+        store_records(url, date_str, iter_results(queue, url, stats), batch_size, stats)
+        print(f"✅ {url}: {stats['models']} models from {stats['pages']} pages")
+        for key in stats:
+            totals[key] += stats[key]
+
+    from newsletter.showcase import seed_metadata
+
+    for _, result in queue.results('parse'):
+        if result.get('metadata') and 'url' in result:
+            totals['metadata'] += seed_metadata([result])
+        elif result.get('page_state'):
+            totals['metadata'] += seed_metadata({'url': url, 'metadata': record} for url, record in result['page_state'])
+    return totals
+
+
+def run_queued_crawl(queue, urls: List[str], date_str: str, max_pages: int = DEFAULT_MAX_PAGES,
+                     rate: float = DEFAULT_RATE, batch_size: int = BATCH_SIZE, thumbnails: bool = False,
+                     lease_seconds: float = LEASE_SECONDS) -> Dict[str, int]:
+    """
+    Seed a crawl, work on it alongside any other workers until it drains, then collect it
+
+    Returns:
+        Dict[str, int]: Totals as from collect_crawl
+    """
+    start = time.perf_counter()
+    added = enqueue_crawl(queue, urls, max_pages, thumbnails)
+    print(f"📥 Queued {added} of {len(urls)} URLs (others are already in the queue)")
+    stats = run_worker(queue, rate=rate, lease_seconds=lease_seconds)
+    print(f"🧵 This worker ran {stats['done']} jobs ({stats['failed']} failed attempts)")
+
+    totals = collect_crawl(queue, urls, date_str, batch_size)
+    dead = queue.counts()['dead']
+    if dead:
+        print(f"⚠️  {dead} jobs failed {MAX_ATTEMPTS} times and were given up; their pages are missing")
+    metadata = f", {totals['metadata']} model records" if totals['metadata'] else ''
+    print(f"⏱️  Crawled {totals['models']} models{metadata} in {time.perf_counter() - start:.1f}s")
+    return totals
@@ -0,0 +1,35 @@
+"""
+Preview the sections and the combined showcase in a browser, re-rendering
+as soon as a template, the section config or a manifest changes.
+"""
+import argparse
+
+from newsletter.preview import DEFAULT_PORT, serve
+from newsletter.sections import DEFAULT_SECTIONS, SECTIONS
+from newsletter.showcase import today_str
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a live local preview of the newsletter")
+    parser.add_argument('--sections', default=','.join(DEFAULT_SECTIONS),
+                        help=f"Comma-separated sections to preview (default: {','.join(DEFAULT_SECTIONS)}; "
+                             f"available: {', '.join(SECTIONS)})")
+    parser.add_argument('--date', default=today_str(),
+                        help="Run date as YYYYMMDD (default: today, falling back to each section's latest data)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    args = parser.parse_args(argv)
+
+    args.sections = [name.strip() for name in args.sections.split(',') if name.strip()]
+    unknown = [name for name in args.sections if name not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    serve(args.sections, args.date, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
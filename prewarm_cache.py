@@ -0,0 +1,41 @@
+"""
+Keep the model page and image caches warm during the week, so generating
+the newsletter on send day is mostly cache hits.
+"""
+import argparse
+
+from newsletter.prewarm import DEFAULT_INTERVAL, DEFAULT_RATE, run_prewarm
+from newsletter.sections import DEFAULT_SECTIONS, SECTIONS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Poll the sections' pages and pre-download new models into the caches")
+    parser.add_argument('--sections', default=','.join(DEFAULT_SECTIONS),
+                        help=f"Comma-separated sections to poll (default: {','.join(DEFAULT_SECTIONS)}; "
+                             f"available: {', '.join(SECTIONS)})")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL / 60,
+                        help=f"Minutes between polls (default: {DEFAULT_INTERVAL // 60})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f"Maximum requests per minute (default: {DEFAULT_RATE})")
+    parser.add_argument('--once', action='store_true', help='Run a single pass and exit')
+    args = parser.parse_args(argv)
+
+    args.sections = [name.strip() for name in args.sections.split(',') if name.strip()]
+    unknown = [name for name in args.sections if name not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+    if args.rate <= 0 or args.interval <= 0:
+        parser.error("--rate and --interval must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print(f"🔥 Pre-warming {', '.join(args.sections)} every {args.interval:g} minutes "
+          f"at up to {args.rate:g} requests per minute")
+    run_prewarm(args.sections, interval=args.interval * 60, rate=args.rate, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
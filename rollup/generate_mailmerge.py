@@ -0,0 +1,69 @@
+"""
+Render a personalized copy of the day's combined showcase for every
+recipient in a CSV, streaming them into mailmerge/YYYYMMDD/shard-NNNNN.jsonl.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsletter import mailmerge
+
+def main():
+    """Main function to run the mail merge"""
+    rollup_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Personalize the combined showcase per recipient")
+    parser.add_argument('--recipients', help="CSV with an 'email' column and optional first_name, greeting, segment, sections, token, subject")
+    parser.add_argument('--date', default=datetime.now().strftime('%Y%m%d'),
+                        help='Date of the combined showcase to personalize (default: today)')
+    parser.add_argument('--campaign', help='Campaign name tracking tokens are derived from (default: the date)')
+    parser.add_argument('--segments', help='JSON file mapping segment names to lists of sections')
+    parser.add_argument('--shard-size', type=int, default=mailmerge.SHARD_SIZE,
+                        help=f'Recipients per output shard (default: {mailmerge.SHARD_SIZE})')
+    parser.add_argument('--benchmark', type=int, metavar='N',
+                        help='Render N synthetic recipients to a scratch folder and report emails per second')
+    args = parser.parse_args()
+
+    rollup_path = os.path.join(rollup_dir, f"combined_showcase_{args.date}.html")
+    if not os.path.exists(rollup_path):
+        print(f"❌ No combined showcase found for {args.date}, run generate_html_blob_rollup.py first")
+        sys.exit(1)
+
+    compiled = mailmerge.compile_rollup(rollup_path)
+    print(f"📝 Compiled {len(compiled['sections'])} sections from {os.path.basename(rollup_path)}")
+
+    if args.benchmark:
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            stats = mailmerge.benchmark(compiled, args.benchmark, scratch_dir)
+        print(f"\n⏱️  Rendered {stats['emails']} emails ({stats['bytes'] / 1e6:.1f} MB) in {stats['seconds']:.2f}s")
+        print(f"🚀 Throughput: {stats['emails_per_second']:.0f} emails/second")
+        return
+
+    if not args.recipients:
+        parser.error('--recipients is required unless --benchmark is given')
+
+    segments = None
+    if args.segments:
+        with open(args.segments, 'r', encoding='utf-8') as f:
+            segments = json.load(f)
+
+    output_dir = os.path.join(rollup_dir, 'mailmerge', args.date)
+    stats = mailmerge.write_shards(
+        compiled,
+        mailmerge.read_recipients(args.recipients),
+        output_dir,
+        args.campaign or args.date,
+        segments=segments,
+        shard_size=args.shard_size,
+    )
+
+    print(f"\n✅ Rendered {stats['emails']} emails into {stats['shards']} shards in {os.path.relpath(output_dir, rollup_dir)}")
+    print(f"⏱️  {stats['emails'] / stats['seconds'] if stats['seconds'] else 0:.0f} emails/second")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Render every newsletter variant in variants.json from one load of the
+section data, writing them to variants/YYYYMMDD/<name>.html.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsletter.variants import load_variants, render_variants, write_variants
+
+def main():
+    """Main function to render the variants"""
+    rollup_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Render every newsletter variant in one pass")
+    parser.add_argument('--config', default=os.path.join(rollup_dir, 'variants.json'),
+                        help='JSON file listing the variants (default: rollup/variants.json)')
+    parser.add_argument('--date', default=datetime.now().strftime('%Y%m%d'),
+                        help='Run date as YYYYMMDD (default: today)')
+    args = parser.parse_args()
+
+    variants = load_variants(args.config)
+    print(f"📝 Rendering {len(variants)} variants for {args.date}")
+
+    start = time.perf_counter()
+    rendered = render_variants(variants, args.date)
+    output_dir = os.path.join(rollup_dir, 'variants', args.date)
+    paths = write_variants(rendered, output_dir)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for path in paths:
+        print(f"✅ Generated variant: {os.path.relpath(path, rollup_dir)}")
+    print(f"\n✨ Rendered {len(paths)} variants in {elapsed_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()
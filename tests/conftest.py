@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsletter import jobqueue  # noqa: E402
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def queue(request, tmp_path, monkeypatch):
+    """Each queue backend, with failed jobs retried straight away"""
+    monkeypatch.setattr(jobqueue, 'RETRY_DELAY', 0)
+    if request.param == 'sqlite':
+        backend = jobqueue.SQLiteQueue(str(tmp_path / 'queue.sqlite3'), max_attempts=3)
+    else:
+        backend = jobqueue.RedisQueue(jobqueue.MemoryRedis(), max_attempts=3)
+    yield backend
+    backend.close()
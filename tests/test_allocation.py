@@ -0,0 +1,74 @@
+from newsletter.allocation import allocate, allocation_summary, interleave, rank_score, top_candidates
+
+
+def model(thangs_id, score, designer='Fixture'):
+    return {'url': f"https://thangs.com/designer/{designer}/3d-model/Model-{thangs_id}", 'score': score}
+
+
+def ids(candidates):
+    return [int(candidate['url'].rsplit('-', 1)[1]) for candidate in candidates]
+
+
+def test_each_model_goes_to_the_section_valuing_it_most():
+    streams = {
+        'a': [model(1, 0.5), model(2, 0.4), model(3, 0.3)],
+        'b': [model(1, 0.9), model(4, 0.2)],
+    }
+    assigned = allocate(streams, {'a': 2, 'b': 2})
+    assert ids(assigned['b']) == [1, 4]
+    assert ids(assigned['a']) == [2, 3]
+
+
+def test_a_section_falls_through_to_its_next_candidate():
+    streams = {
+        'a': [model(1, 1.0), model(2, 0.9)],
+        'b': [model(1, 0.8), model(2, 0.7), model(3, 0.1)],
+    }
+    assigned = allocate(streams, {'a': 2, 'b': 1})
+    assert ids(assigned['a']) == [1, 2]
+    assert ids(assigned['b']) == [3]
+
+
+def test_quotas_are_never_exceeded():
+    streams = {'a': [model(n, 1.0 / (n + 1)) for n in range(20)], 'b': [model(n, 0.5) for n in range(20, 25)]}
+    assigned = allocate(streams, {'a': 3, 'b': 0})
+    assert ids(assigned['a']) == [0, 1, 2]
+    assert assigned['b'] == []
+
+
+def test_earlier_sections_win_ties():
+    streams = {'a': [model(1, 0.5)], 'b': [model(1, 0.5)]}
+    assigned = allocate(streams, {'a': 1, 'b': 1})
+    assert ids(assigned['a']) == [1]
+    assert assigned['b'] == []
+
+
+def test_url_spellings_of_one_model_count_once():
+    streams = {'a': [model(7, 0.9, designer='One')], 'b': [model(7, 0.8, designer='Other'), model(8, 0.1)]}
+    assigned = allocate(streams, {'a': 1, 'b': 1})
+    assert ids(assigned['b']) == [8]
+
+
+def test_top_candidates_keeps_the_best_k_once_each_in_order():
+    candidates = [model(1, 0.2), model(2, 0.9), model(1, 1.0), model(3, 0.9), model(4, 0.5)]
+    kept = top_candidates(candidates, 3)
+    # Ties keep the section's own order; a model listed again is ignored
+    assert ids(candidate for _, _, candidate in kept) == [2, 3, 4]
+    assert top_candidates(candidates, 0) == []
+
+
+def test_rank_score_prefers_rank_then_popularity():
+    assert rank_score(0) > rank_score(1) > rank_score(5)
+    assert rank_score(1, popularity=1000) > rank_score(1)
+    assert rank_score(0, popularity=-5) == rank_score(0)
+
+
+def test_interleave_alternates_pages():
+    assert interleave([[1, 2, 3], [4], [5, 6]]) == [1, 4, 5, 2, 6, 3]
+
+
+def test_allocation_summary_counts_shared_models():
+    streams = {'a': [model(1, 0.5), model(2, 0.4)], 'b': [model(1, 0.9)]}
+    assert allocation_summary(streams, allocate(streams, {'a': 2, 'b': 1})) == (
+        "1 models were candidates in more than one section; 2 models placed, each once")
+    assert allocation_summary({'a': [model(1, 0.5)]}, {'a': []}) is None
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from newsletter import cache, delta
+
+URL = 'https://thangs.com/designer/Fixture/3d-model/Vase-42'
+
+
+@pytest.fixture
+def section(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'get_metadata', lambda key: None)
+    (tmp_path / 'img' / '20250501').mkdir(parents=True)
+    (tmp_path / 'img' / '20250501' / '42-abc.jpg').write_bytes(b'jpeg')
+    return {'name': 'fixture', 'folder': str(tmp_path)}
+
+
+def baseline(**stored):
+    record = {'url': URL, 'thumbnail_url': 'https://cdn.thangs.com/42.jpg',
+              'image_path': 'img/20250501/42-abc.jpg', 'resolved_at': time.time(), **stored}
+    return {'snapshot': {'42', '7'}, 'images': {'42': record}}
+
+
+def test_diff_links_counts_against_the_snapshot():
+    links = [{'url': URL}, {'url': 'https://thangs.com/3d-model/Vase-42?utm_source=x'},
+             {'url': 'https://thangs.com/3d-model/New-99'}]
+    assert delta.diff_links(baseline(), links) == {'new': 1, 'unchanged': 1, 'dropped': 1}
+
+
+def test_unchanged_model_reuses_its_image(section):
+    assert delta.reusable_image(section, baseline(), URL)['image_path'] == 'img/20250501/42-abc.jpg'
+
+
+@pytest.mark.parametrize('url, stored', [
+    ('https://thangs.com/3d-model/Other-7', {}),
+    (URL + '?image=3', {}),
+    (URL, {'resolved_at': time.time() - cache.THUMBNAIL_TTL - 1}),
+    (URL, {'thumbnail_url': None}),
+    (URL, {'image_path': 'img/20250501/missing.jpg'}),
+])
+def test_stale_or_missing_images_are_processed_again(section, url, stored):
+    assert delta.reusable_image(section, baseline(**stored), url) is None
+
+
+def test_changed_thumbnail_is_processed_again(section, monkeypatch):
+    monkeypatch.setattr(cache, 'get_metadata', lambda key: {'thumbnail_url': 'https://cdn.thangs.com/new.jpg'})
+    assert delta.reusable_image(section, baseline(), URL) is None
+    assert delta.reusable_image(section, None, URL) is None
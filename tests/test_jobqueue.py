@@ -0,0 +1,106 @@
+from newsletter.jobqueue import open_queue, retry_delay
+
+EXPIRED = -1  # lease seconds that run out at once
+
+
+def test_put_is_idempotent(queue):
+    assert queue.put('fetch', 'fetch:a', {'url': 'a'})
+    assert not queue.put('fetch', 'fetch:a', {'url': 'other'})
+    job = queue.lease(['fetch'], 'w1')
+    assert job.payload == {'url': 'a'}
+    assert queue.lease(['fetch'], 'w2') is None
+    assert queue.counts() == {'queued': 0, 'leased': 1, 'done': 0, 'dead': 0}
+
+
+def test_put_after_done_is_a_no_op(queue):
+    queue.put('fetch', 'fetch:a', {'url': 'a'})
+    queue.complete(queue.lease(['fetch'], 'w1'), {'ok': True})
+    assert not queue.put('fetch', 'fetch:a', {'url': 'a'})
+    assert queue.lease(['fetch'], 'w1') is None
+
+
+def test_lease_only_takes_the_asked_kinds(queue):
+    queue.put('fetch', 'fetch:a', {})
+    queue.put('parse', 'parse:a', {})
+    job = queue.lease(['parse'], 'w1')
+    assert (job.kind, job.key, job.attempts, job.owner) == ('parse', 'parse:a', 1, 'w1')
+    assert queue.lease(['parse'], 'w1') is None
+
+
+def test_complete_stores_the_result(queue):
+    queue.put('parse', 'parse:a', {'body': 'x'})
+    job = queue.lease(['parse'], 'w1')
+    assert queue.complete(job, {'models': [1, 2]})
+    assert not queue.complete(job, {'models': []})
+    assert queue.result('parse:a') == {'models': [1, 2]}
+    assert list(queue.results('parse')) == [('parse:a', {'models': [1, 2]})]
+    assert queue.result('parse:missing') is None
+    assert queue.counts() == {'queued': 0, 'leased': 0, 'done': 1, 'dead': 0}
+
+
+def test_expired_lease_is_offered_again(queue):
+    queue.put('fetch', 'fetch:a', {})
+    first = queue.lease(['fetch'], 'w1', seconds=EXPIRED)
+    second = queue.lease(['fetch'], 'w2')
+    assert second.key == first.key
+    assert (second.attempts, second.owner) == (2, 'w2')
+
+
+def test_late_complete_after_lease_expired_is_not_rerun(queue):
+    queue.put('fetch', 'fetch:a', {})
+    job = queue.lease(['fetch'], 'w1', seconds=EXPIRED)
+    # Any lease puts expired jobs back in the ready set (Redis); SQLite leases them directly
+    assert queue.lease(['parse'], 'w2') is None
+    assert queue.complete(job, {'late': True})
+    assert queue.lease(['fetch'], 'w2') is None
+    assert queue.result('fetch:a') == {'late': True}
+    assert queue.counts() == {'queued': 0, 'leased': 0, 'done': 1, 'dead': 0}
+
+
+def test_first_complete_wins(queue):
+    queue.put('fetch', 'fetch:a', {})
+    first = queue.lease(['fetch'], 'w1', seconds=EXPIRED)
+    second = queue.lease(['fetch'], 'w2')
+    assert queue.complete(second, {'by': 'w2'})
+    assert not queue.complete(first, {'by': 'w1'})
+    assert queue.result('fetch:a') == {'by': 'w2'}
+
+
+def test_failed_job_is_retried_then_dead(queue):
+    queue.put('fetch', 'fetch:a', {})
+    for attempt in (1, 2):
+        job = queue.lease(['fetch'], 'w1')
+        assert job.attempts == attempt
+        assert queue.fail(job, 'boom') == 'queued'
+    job = queue.lease(['fetch'], 'w1')
+    assert queue.fail(job, 'boom') == 'dead'
+    assert queue.lease(['fetch'], 'w1') is None
+    assert queue.counts() == {'queued': 0, 'leased': 0, 'done': 0, 'dead': 1}
+
+
+def test_fail_after_the_lease_was_handed_on_changes_nothing(queue):
+    queue.put('fetch', 'fetch:a', {})
+    first = queue.lease(['fetch'], 'w1', seconds=EXPIRED)
+    second = queue.lease(['fetch'], 'w2')
+    queue.fail(first, 'too late')
+    assert queue.complete(second, {'ok': True})
+    assert queue.result('fetch:a') == {'ok': True}
+
+
+def test_expired_leases_are_dead_after_max_attempts(queue):
+    queue.put('fetch', 'fetch:a', {})
+    for _ in range(3):
+        assert queue.lease(['fetch'], 'w1', seconds=EXPIRED) is not None
+    assert queue.lease(['fetch'], 'w1') is None
+    assert queue.counts()['dead'] == 1
+
+
+def test_retry_delay_doubles():
+    assert [retry_delay(attempts) for attempts in (1, 2, 3)] == [30, 60, 120]
+
+
+def test_open_queue_picks_the_backend(tmp_path):
+    assert type(open_queue('memory://')).__name__ == 'RedisQueue'
+    sqlite = open_queue(f"sqlite:///{tmp_path / 'q.sqlite3'}")
+    assert type(sqlite).__name__ == 'SQLiteQueue'
+    sqlite.close()
@@ -0,0 +1,22 @@
+from newsletter.variants import HEADLINE_SLOT, decorate_links, fill_slots, prepare_links
+
+
+def test_links_are_split_once_and_lose_old_utm_tags():
+    prepared = prepare_links(['https://x.test/a?utm_source=old&id=3#top', 'https://x.test/b'])
+    assert prepared == {'https://x.test/a?utm_source=old&id=3#top': ('https://x.test/a', 'id=3', '#top'),
+                        'https://x.test/b': ('https://x.test/b', '', '')}
+
+
+def test_decorate_links_keeps_query_and_fragment():
+    prepared = prepare_links(['https://x.test/a?id=3#top', 'https://x.test/b'])
+    decorated = decorate_links(prepared, {'utm_source': 'mail', 'utm_campaign': 'a b'})
+    assert decorated == {'https://x.test/a?id=3#top': 'https://x.test/a?id=3&utm_source=mail&utm_campaign=a+b#top',
+                         'https://x.test/b': 'https://x.test/b?utm_source=mail&utm_campaign=a+b'}
+    assert decorate_links(prepared, None) == {url: url for url in prepared}
+
+
+def test_fill_slots_interleaves_chunks_and_values():
+    chunks = ['<a href="', '">', '</a><b>', '</b>']
+    slots = ['https://x.test/a', HEADLINE_SLOT, 'https://x.test/a']
+    values = {'https://x.test/a': 'A', HEADLINE_SLOT: 'Hi'}
+    assert fill_slots(chunks, slots, values) == '<a href="A">Hi</a><b>A</b>'